@@ -0,0 +1,87 @@
+# Benchmark: compare the orm write path (session.add + unit-of-work) with the BulkWriter (executemany)
+# Usage (from folder code/): python ../additional_scripts/benchmark_bulk_writer.py [number_of_jobads ...]
+
+# Imports
+import os
+import sys
+import random
+import tempfile
+from timeit import default_timer as timer
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+import information_extraction.models  # registers all orm-models (needed for the relationships)
+from orm_handling.models import JobAds, ClassifyUnits, input_schema
+from orm_handling.bulk_writer import BulkWriter
+
+# Settings
+sizes = [10000, 100000]     # number of jobads
+paragraphs_per_ad = 5       # number of classify units per jobad
+fetch_size = 500            # jobads per batch (like fetch_size in config.yaml)
+
+
+# Generates a new database with the given number of jobads and an empty classify_units table
+def prepare_db(db_path, nr_ads):
+    # jobads in the same database as the output (like without --output_path)
+    engine = create_engine('sqlite:///' + db_path).execution_options(schema_translate_map={input_schema: None})
+    # jobads columns are untyped in models.py --> create table like in the input data
+    with engine.begin() as conn:
+        conn.exec_driver_sql('CREATE TABLE jobads (id INTEGER PRIMARY KEY, postingID TEXT, jahrgang TEXT, '
+                             'language TEXT, content TEXT)')
+    ClassifyUnits.__table__.create(engine)
+    rows = [{'id': i, 'postingID': str(i), 'jahrgang': '2018', 'language': 'de',
+             'content': '\n\n'.join('Paragraph %d of jobad %d.' % (p, i) for p in range(paragraphs_per_ad))}
+            for i in range(1, nr_ads + 1)]
+    with engine.begin() as conn:
+        conn.execute(JobAds.__table__.insert(), rows)
+    return engine
+
+
+# Classify all jobads (fake classes) and write the results with the chosen mode
+def run(engine, mode):
+    session = sessionmaker(bind=engine)()
+    writer = BulkWriter()
+    last_id = 0
+    start = timer()
+    while True:
+        jobads = session.query(JobAds).filter(JobAds.id > last_id).order_by(JobAds.id).limit(fetch_size).all()
+        if not jobads:
+            break
+        with session.no_autoflush:
+            for jobad in jobads:
+                # fresh db without classify units --> skip the lazy load of children (only measure the writes)
+                set_committed_value(jobad, 'children', list())
+                for para in jobad.content.split('\n\n'):
+                    jobad.children.append(ClassifyUnits(classID=random.randint(1, 6), paragraph=para,
+                                                        featureunits=list(), featurevector=list()))
+                if mode == 'orm':
+                    session.add(jobad)
+                else:
+                    writer.collect(jobad, 'cu')
+        if mode == 'bulk':
+            writer.flush(session)
+        session.commit()
+        last_id = jobads[-1].id
+    runtime = timer() - start
+    session.close()
+    return runtime
+
+
+def main():
+    nr_list = [int(arg) for arg in sys.argv[1:]] or sizes
+    for nr_ads in nr_list:
+        results = dict()
+        for mode in ('orm', 'bulk'):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                engine = prepare_db(os.path.join(tmp_dir, 'benchmark.db'), nr_ads)
+                results[mode] = run(engine, mode)
+                engine.dispose()
+            print(f'{nr_ads} JobAds ({nr_ads * paragraphs_per_ad} ClassifyUnits) - {mode}: {results[mode]:.2f}s '
+                  f'({nr_ads * paragraphs_per_ad / results[mode]:.0f} rows/s)')
+        print(f'Speedup bulk vs. orm: {results["orm"] / results["bulk"]:.2f}x\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# Benchmark: annotation of known entities with the former dict lookup (linear scan over all keys for each token,
+# keyed by hash(entity[0])) and with the EntityLexicon (one pass of its EntityAutomaton over the lemmata)
+# Usage (from folder code/): python ../additional_scripts/benchmark_entity_lexicon.py [number_of_entries]
+
+# Imports
+import os
+import sys
+import random
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+from information_extraction.models import MatchedEntity, TextToken
+from information_extraction.prepare_resources.entity_lexicon import EntityLexicon
+from information_extraction.prepare_resources.convert_entities import normalize_entities
+from information_extraction.prepare_extractionunits import convert_extractionunits
+
+# Settings
+nr_entries = 50000          # size of the competence list
+nr_sentences = 2000         # annotated sentences
+tokens_per_sentence = 15
+old_sample = 20             # sentences annotated with the former linear scan (too slow for all)
+syllables = ['ka', 'te', 'mi', 'no', 'ru', 'sa', 'lo', 'be', 'di', 'fu', 'ge', 'ho', 'ja', 'ke', 'ma', 'pe']
+
+
+# Random lemma of 2-4 syllables
+def lemma():
+    return ''.join(random.choice(syllables) for _ in range(random.randint(2, 4)))
+
+
+# Competence list: single words and multi words (many of them with the same first lemma, e.g. 'kenntnis in ...')
+def make_entries():
+    heads = [lemma() for _ in range(500)]
+    entries = list()
+    for _ in range(nr_entries):
+        if random.random() < 0.6:
+            entries.append([lemma()])
+        else:
+            entries.append([random.choice(heads)] + [lemma() for _ in range(random.randint(1, 2))])
+    return entries
+
+
+# Former resource loading: the last entity of a key wins (multi words were keyed by their first character)
+def build_dict(entries):
+    entities = dict()
+    for entity in entries:
+        ie = MatchedEntity(start_lemma=entity[0], is_single_word=len(entity) == 1, ie_type='COMPETENCES', label=set())
+        key = entity
+        if not ie.is_single_word:
+            ie.set_lemma_array(entity)
+            key = ' '.join(entity).strip()
+        entities[hash(key[0])] = ie
+    return entities
+
+
+def build_lexicon(entries):
+    entities = EntityLexicon()
+    for entity in entries:
+        ie = MatchedEntity(start_lemma=entity[0], is_single_word=len(entity) == 1, ie_type='COMPETENCES', label=set())
+        if not ie.is_single_word:
+            ie.set_lemma_array(entity)
+        entities.add(entity, ie)
+    return entities
+
+
+# Former __annotate_entities
+def annotate_dict(token, known_entities):
+    for i in range(len(token)):
+        lemma = normalize_entities(token[i].lemma)
+        matched_entities = [value for key, value in known_entities.items() if hash(lemma) == key]
+        for known_entity in matched_entities:
+            if known_entity.is_single_word:
+                token[i].set_ie_token(True)
+                continue
+            matches = False
+            for j in range(len(known_entity.lemma_array)):
+                if len(token) <= i + j:
+                    matches = False
+                    break
+                matches = hash(known_entity.lemma_array[j]) == (hash(normalize_entities(token[i + j].lemma)))
+                if not matches:
+                    break
+            if matches:
+                token[i].set_ie_token(True)
+                token[i].tokensToCompleteInformationEntity = len(known_entity.lemma_array) - 1
+    return token
+
+
+# Sentences with lemmata of the competence list (also multi words) and unknown lemmata
+def make_sentences(entries):
+    sentences = list()
+    for _ in range(nr_sentences):
+        lemmata = list()
+        while len(lemmata) < tokens_per_sentence:
+            lemmata.extend(random.choice(entries) if random.random() < 0.3 else [lemma()])
+        sentences.append(lemmata[:tokens_per_sentence])
+    return sentences
+
+
+def to_tokens(lemmata):
+    return [TextToken(lemma, lemma, 'NN') for lemma in lemmata]
+
+
+def main():
+    global nr_entries
+    if len(sys.argv) > 1:
+        nr_entries = int(sys.argv[1])
+    random.seed(1)
+    entries = make_entries()
+    sentences = make_sentences(entries)
+    print(f'{nr_entries} entries, {sum(len(e) > 1 for e in entries)} multi words, '
+          f'{len(set(tuple(e) for e in entries))} unique')
+
+    start = timer()
+    old = build_dict(entries)
+    print(f'dict:          built in {timer() - start:.2f}s, {len(old)} entries kept')
+    start = timer()
+    lexicon = build_lexicon(entries)
+    print(f'EntityLexicon: built in {timer() - start:.2f}s, {len(lexicon)} entries kept')
+
+    # former lookup: only a sample of the sentences
+    token_arrays = [to_tokens(lemmata) for lemmata in sentences[:old_sample]]
+    start = timer()
+    for token in token_arrays:
+        annotate_dict(token, old)
+    old_time = (timer() - start) / (old_sample * tokens_per_sentence)
+
+    convert_extractionunits.known_entities = lexicon
+    annotate = convert_extractionunits.__dict__['__annotate_entities']
+    token_arrays = [to_tokens(lemmata) for lemmata in sentences]
+    start = timer()
+    for token in token_arrays:
+        annotate(token, [normalize_entities(t.lemma) for t in token])
+    new_time = (timer() - start) / (nr_sentences * tokens_per_sentence)
+
+    print(f'dict:          {old_time * 1e6:10.1f} us per token')
+    print(f'EntityLexicon: {new_time * 1e6:10.1f} us per token ({old_time / new_time:.0f}x faster), '
+          f'{sum(t.ie_token for token in token_arrays for t in token)} tokens annotated as known entity')
+
+
+if __name__ == "__main__":
+    main()
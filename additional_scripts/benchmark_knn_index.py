@@ -0,0 +1,95 @@
+# Benchmark: approximate knn search with the LSHKNN (random-projection LSH index) against the exact SparseKNN on
+# synthetic tfidf vectors (paragraphs of a few topics/classes, each a variation of one of many prototype paragraphs,
+# as the recurring paragraphs of job ads): recall@k of the neighbors, agreement of the predicted
+# classes and latency for several index settings (lsh_tables, lsh_bits, lsh_probes)
+# Usage (from folder code/): python ../additional_scripts/benchmark_knn_index.py [number_of_traindata]
+
+# Imports
+import os
+import sys
+from timeit import default_timer as timer
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfTransformer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+from training.knnclassifier.sparse_knn import SparseKNN
+from training.knnclassifier.lsh_knn import LSHKNN
+
+# Settings
+nr_train = 50000            # size of the traindata
+nr_queries = 2000
+nr_features = 20000
+nr_classes = 6
+nr_prototypes = 5000        # different paragraphs
+words_per_document = 40
+topic_share = 0.5           # share of the words of a paragraph drawn from the vocabulary of its class
+noise = 0.3                 # share of the words of a document replaced (variation of its prototype)
+label_noise = 0.2           # share of the documents with a random class (wrong annotations)
+n_neighbors = 5
+settings = [(8, 12, 0), (16, 12, 0), (16, 12, 2), (32, 12, 2), (16, 10, 2), (32, 14, 4)]
+
+
+# Paragraphs: words of the class vocabulary and common words (zipf)
+def make_words(rng, classes):
+    n = len(classes)
+    topic_words = rng.zipf(1.3, (n, words_per_document)) % (nr_features // (2 * nr_classes))
+    topic_words += (nr_features // 2) + (classes[:, None] - 1) * (nr_features // (2 * nr_classes))
+    common_words = rng.zipf(1.3, (n, words_per_document)) % (nr_features // 2)
+    return np.where(rng.random_sample((n, words_per_document)) < topic_share, topic_words, common_words)
+
+
+# Documents: variations of the prototypes, weighted with tfidf and L2-normalized
+def make_documents(rng, n, prototypes, transformer=None):
+    prototype_classes, prototype_words = prototypes
+    chosen = rng.randint(0, len(prototype_classes), n)
+    classes = np.where(rng.random_sample(n) < label_noise, rng.randint(1, nr_classes + 1, n),
+                       prototype_classes[chosen])
+    words = np.where(rng.random_sample((n, words_per_document)) < noise, make_words(rng, prototype_classes[chosen]),
+                     prototype_words[chosen])
+    counts = csr_matrix((np.ones(words.size), (np.repeat(np.arange(n), words_per_document), words.ravel())),
+                        shape=(n, nr_features))
+    counts.sum_duplicates()
+    if transformer is None:
+        transformer = TfidfTransformer().fit(counts)
+    return transformer.transform(counts), np.array([f'{c}\n' for c in classes]), transformer
+
+
+def main():
+    global nr_train
+    if len(sys.argv) > 1:
+        nr_train = int(sys.argv[1])
+    rng = np.random.RandomState(1)
+    prototype_classes = rng.randint(1, nr_classes + 1, nr_prototypes)
+    prototypes = (prototype_classes, make_words(rng, prototype_classes))
+    train, labels, transformer = make_documents(rng, nr_train, prototypes)
+    queries, _, _ = make_documents(rng, nr_queries, prototypes, transformer)
+    print(f'{nr_train} traindata ({nr_prototypes} prototypes), {nr_queries} queries, {nr_features} features, '
+          f'k = {n_neighbors}')
+
+    exact = SparseKNN(n_neighbors=n_neighbors).fit(train, labels)
+    start = timer()
+    expected = exact.kneighbors(queries, return_distance=False)
+    exact_time = (timer() - start) / nr_queries
+    expected_classes = exact.predict(queries)
+    print(f'exact (SparseKNN):              {exact_time * 1e3:8.3f} ms per query')
+
+    for lsh_tables, lsh_bits, lsh_probes in settings:
+        start = timer()
+        lsh = LSHKNN(n_neighbors=n_neighbors, lsh_tables=lsh_tables, lsh_bits=lsh_bits, lsh_probes=lsh_probes)
+        lsh.fit(train, labels)
+        build_time = timer() - start
+        start = timer()
+        found = lsh.kneighbors(queries, return_distance=False)
+        lsh_time = (timer() - start) / nr_queries
+        # recall@k: share of the exact neighbors that are found
+        recall = np.mean([len(np.intersect1d(f, e)) / n_neighbors for f, e in zip(found, expected)])
+        agreement = np.mean(lsh.predict(queries) == expected_classes)
+        print(f'lsh (tables {lsh_tables:2}, bits {lsh_bits:2}, probes {lsh_probes}): {lsh_time * 1e3:8.3f} ms per query '
+              f'({exact_time / lsh_time:5.1f}x), {lsh.candidates_ / (nr_queries * nr_train):6.1%} of the traindata '
+              f'scanned, recall@{n_neighbors} {recall:.3f}, class agreement {agreement:.3f}, '
+              f'index built in {build_time:.2f}s')
+
+
+if __name__ == "__main__":
+    main()
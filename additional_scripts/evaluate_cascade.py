@@ -0,0 +1,100 @@
+# Evaluation: classification of the same JobAds with the full pipeline (featureunits, tfidf and knn for every
+# ClassifyUnit) and with the cascade mode (knn only if the regex result is not final): share of the ClassifyUnits
+# classified by the regex classifier alone, agreement of the classes and runtime. Nothing is written to the database.
+# Usage (from folder code/, after a classification run with the same config.yaml):
+#   python ../additional_scripts/evaluate_cascade.py --input_path <input.db> [--limit number_of_jobads]
+
+# Imports
+import os
+import sys
+import argparse
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+import logger
+import configuration
+import database
+import training
+from orm_handling import orm
+from classification import prepare_classifyunits, predict_classes
+
+
+# Full pipeline (as classification.classify without cascade mode)
+def classify_full(jobads, model):
+    for jobad in jobads:
+        prepare_classifyunits.generate_classifyunits(jobad, model)
+    cus, vectorized_cus = prepare_classifyunits.vectorize_batch(jobads, model)
+    predict_classes.start_batch_prediction(cus, vectorized_cus, model)
+    return cus
+
+
+# Cascade mode
+def classify_cascade(jobads, model):
+    for jobad in jobads:
+        prepare_classifyunits.generate_classifyunits(jobad, model, featureunits=False)
+    all_cus = [cu for jobad in jobads for cu in jobad.children]
+    cus, reg_predicted = predict_classes.start_regex_prediction(all_cus, model)
+    predict_classes.start_batch_prediction(cus, prepare_classifyunits.vectorize_cus(cus, model), model, reg_predicted)
+    return all_cus
+
+
+# Classifies a batch in memory (loaded again for each pipeline, nothing is written)
+def run(classify, model, last_id):
+    jobads = orm.load_batch('cu', database.session, last_id)
+    with database.session.no_autoflush:
+        start = timer()
+        cus = classify(jobads, model)
+        runtime = timer() - start
+    result = ([cu.paragraph for cu in cus], [cu.classID for cu in cus], runtime, jobads[-1].id if jobads else None,
+              len(jobads))
+    database.session.expunge_all()
+    database.session.rollback()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='compare the cascade mode with the full classification pipeline')
+    parser.add_argument('--input_path', required=True)
+    parser.add_argument('--limit', type=int, default=1000)
+    args = parser.parse_args()
+
+    logger.main()
+    configuration.set_config({'input_path': args.input_path, 'db_mode': 'overwrite'})
+    database.set_train_conn()
+    database.set_input_conn()
+    model = training.initialize_model()
+
+    nr_jobads, agree, full_time, cascade_time = 0, 0, 0.0, 0.0
+    disagreements = list()
+    last_id = None
+    while nr_jobads < args.limit:
+        paragraphs, full_classes, runtime, until_id, batch_size = run(classify_full, model, last_id)
+        if until_id is None:
+            break
+        full_time += runtime
+        cascade_paragraphs, cascade_classes, runtime, _, _ = run(classify_cascade, model, last_id)
+        cascade_time += runtime
+        assert paragraphs == cascade_paragraphs
+        for paragraph, full_class, cascade_class in zip(paragraphs, full_classes, cascade_classes):
+            if full_class == cascade_class:
+                agree += 1
+            else:
+                disagreements.append((full_class, cascade_class, paragraph))
+        nr_jobads += batch_size
+        last_id = until_id
+    orm.handle_td_changes(model)
+
+    counter = predict_classes.cascade_counter
+    nr_cus = counter['cus']
+    print(f'{nr_cus} ClassifyUnits of {nr_jobads} JobAds')
+    print(f'classified by the regex classifier alone: {counter["short_circuited"]} '
+          f'({counter["short_circuited"] / max(nr_cus, 1):.1%})')
+    print(f'agreement with the full pipeline: {agree} ({agree / max(nr_cus, 1):.1%})')
+    print(f'runtime full pipeline: {full_time:.2f}s, cascade mode: {cascade_time:.2f}s '
+          f'({full_time / max(cascade_time, 1e-9):.2f}x)')
+    for full_class, cascade_class, paragraph in disagreements[:10]:
+        print(f'  full {full_class}, cascade {cascade_class}: {paragraph[:80]}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Migration: convert the pickled token_array/lemma_array values of an existing output database to the compact
+# string encoding (see code/orm_handling/token_encoding.py). Not migrated databases can still be read, but every
+# value has to be unpickled. The migration is done in chunks and can be repeated (migrated rows are skipped).
+# Usage (from folder code/): python ../additional_scripts/migrate_token_arrays.py path/to/db [--vacuum]
+
+# Imports
+import os
+import sys
+import pickle
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+from orm_handling.token_encoding import encode_tokens, encode_lemmata
+
+# Settings
+chunk_size = 5000       # rows per transaction
+columns = [('extraction_units', 'token_array', encode_tokens),
+           ('extracted_entities', 'lemma_array', encode_lemmata),
+           ('matched_entities', 'lemma_array', encode_lemmata)]
+
+
+# Converts all pickled values of one column, returns the number of converted rows
+def migrate_column(engine, table, column, encode):
+    converted = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            # only pickled values are stored as blob
+            rows = conn.exec_driver_sql(f'SELECT id, {column} FROM {table} WHERE id > ? AND typeof({column}) = '
+                                        f'\'blob\' ORDER BY id LIMIT ?', (last_id, chunk_size)).fetchall()
+            if not rows:
+                break
+            # information_extraction.models has to be importable for unpickling TextToken objects
+            values = [(encode(pickle.loads(value)), row_id) for row_id, value in rows]
+            conn.exec_driver_sql(f'UPDATE {table} SET {column} = ? WHERE id = ?', values)
+        converted += len(rows)
+        last_id = rows[-1][0]
+    return converted
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: python ../additional_scripts/migrate_token_arrays.py path/to/db [--vacuum]')
+        sys.exit(1)
+    db_path = sys.argv[1]
+    engine = create_engine('sqlite:///' + db_path)
+    with engine.connect() as conn:
+        tables = {row[0] for row in conn.exec_driver_sql('SELECT name FROM sqlite_master WHERE type = \'table\'')}
+    for table, column, encode in columns:
+        if table not in tables:
+            continue
+        print(f'{table}.{column}: {migrate_column(engine, table, column, encode)} rows converted')
+    # give the freed pages back to the file system
+    if '--vacuum' in sys.argv:
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.exec_driver_sql('VACUUM')
+    engine.dispose()
+    print(f'Size of {db_path}: {os.path.getsize(db_path) / 1024 / 1024:.1f} MB')
+
+
+if __name__ == "__main__":
+    main()
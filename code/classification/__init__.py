@@ -8,10 +8,13 @@ from . import prepare_classifyunits
 from . import predict_classes
 import database
 from orm_handling import orm
+from orm_handling.pipeline import BatchPipeline, write_parallel
 from training.train_models import Model
 import configuration
+from . import parallel
 import sys
 import logger
+from timeit import default_timer as timer
 
 
 # ## Function
@@ -33,7 +36,10 @@ def classify(model: Model) -> None:
         query_limit = orm.get_length('ad')  # Therefore the length of the table is extracted and set as query_limit.
 
     start_pos = configuration.config_obj.get_c_start_pos()  # start_pos: Row Number where to start query
-    current_pos = start_pos  # set row number for query
+    last_id = orm.get_start_id('ad', start_pos)  # cursor for keyset pagination: id of the last processed JobAd
+    config_hash = configuration.config_obj.get_config_hash('cu')  # stored with each checkpoint
+    model_fingerprint = model.get_fingerprint()
+    last_id = orm.resume_stage('cu', config_hash, model_fingerprint, last_id)  # with --resume: continue after checkpoint
     counter = 0  # set counter in fetch_size steps
     jobad_counter = 1  # set jobad counter for each jobad
 
@@ -42,49 +48,100 @@ def classify(model: Model) -> None:
     logger.log_clf.info(f'The query_limit is set to {query_limit}.\
             The start_pos is {start_pos}.')
 
-    # process jobads as long as the conditions are met
-    while True:
-        # STEP 1: Load the Input data: JobAds in JobAds Class.
-        jobads = orm.get_jobads(current_pos)
-
-        # Break if no more JobAds are found or query_limit is reached/exceeded.
-        if len(jobads) == 0:
+    workers = configuration.config_obj.get_workers()  # number of worker processes (--workers)
+    cascade = configuration.config_obj.get_c_cascade()  # cascade mode: knn only if the regex result is not final
+    if workers > 1:
+        # STEP 1 - 3 in worker processes (one id range of JobAds per task), the results are written here
+        __classify_parallel(model, last_id, query_limit, config_hash, model_fingerprint, workers)
+    else:
+        # process jobads as long as the conditions are met
+        # STEP 1: Load the Input data: JobAds in JobAds Class (streamed batch by batch, processed batches leave the session).
+        # With prefetch the next batch is loaded and the previous one is written by threads while this batch is processed.
+        pipeline = BatchPipeline('cu', last_id, config_hash, model_fingerprint)
+        for jobads in pipeline:
+
+            # Break if query_limit is reached/exceeded.
+            if counter >= query_limit:
+                logger.log_clf.info(f'Query_limit reached. Stop processing.')
+                break
+
+            logger.log_clf.info(
+                f'New chunk of jobads loaded. Start processing --> generate_classifyunits and start_batch_prediction.')
+            # iterate over each jobad
+            # no autoflush while processing: lazy loads must not flush the pending cus of the batch (written at once in pass_output)
+            with database.session.no_autoflush:
+                for jobad in jobads:
+                    # STEP 2: Generate classify_units and feature_units for each JobAd.
+                    prepare_classifyunits.generate_classifyunits(jobad, model, featureunits=not cascade)
+                    # Update progress in progress bar
+                    __progress(jobad_counter, query_limit,
+                               status=f" of {query_limit} JobAds classified. Current JobAd {jobad_counter}.")
+                    jobad_counter += 1
+                # STEP 3: Predict Classes for all CUs of the batch (one tfidf transform and one knn prediction).
+                if cascade:
+                    # regex first: featureunits, featurevectors and knn only for the cus without final regex class
+                    cus, reg_predicted = predict_classes.start_regex_prediction(
+                        [cu for jobad in jobads for cu in jobad.children], model)
+                    predict_classes.start_batch_prediction(cus, prepare_classifyunits.vectorize_cus(cus, model),
+                                                           model, reg_predicted)
+                else:
+                    cus, vectorized_cus = prepare_classifyunits.vectorize_batch(jobads, model)
+                    predict_classes.start_batch_prediction(cus, vectorized_cus, model)
+
+            rss = logger.track_memory()  # sample memory usage while the whole batch is in memory
+            # Commit generated classify units with paragraphs and classes to table (together with the checkpoint)
+            last_id = pipeline.submit(jobads)  # update cursor
+            counter += len(jobads)      # update counter
+
+            logger.log_clf.info(
+                f'Batch is passed to the output. Continue with next batch after JobAd id: {last_id}. '
+                f'Current RSS: {rss:.1f} MB.')
+        else:
             logger.log_clf.info(f'No more JobAds in batch. Stop processing.')
-            break
-        if counter >= query_limit:
-            logger.log_clf.info(f'Query_limit reached. Stop processing.')
-            break
-
-        logger.log_clf.info(
-            f'New chunk of jobads loaded. Start processing --> generate_classifyunits and start_prediction.')
-        # iterate over each jobad
-        for jobad in jobads:
-            # STEP 2: Generate classify_units, feature_units and feature_vectors for each JobAd.
-            prepare_classifyunits.generate_classifyunits(jobad, model)
-            # STEP 3: Predict Classes for CUs in JobAds. 
-            predict_classes.start_prediction(jobad, model)
-            # add obj (with predicted paragraphs) to current session --> to be written in db
-            orm.create_output(database.session, jobad, 'cu')
-            # Update progress in progress bar
-            __progress(jobad_counter, query_limit,
-                       status=f" of {query_limit} JobAds classified. Current JobAd {jobad_counter}.")
-            jobad_counter += 1
-
-        # Commit generated classify units with paragraphs and classes to table
-        orm.pass_output(database.session)
-        counter += len(jobads)      # update counter
-        current_pos += len(jobads)  # update current position
-
-        logger.log_clf.info(
-            f'session is cleaned and every obj of current batch is flushed: {database.session._is_clean()}.\
-            Continue with next batch from current row position: {current_pos}.')
+        pipeline.close()  # wait for the last batches to be written
+        if cascade:
+            __log_cascade(predict_classes.cascade_counter)
 
     orm.handle_td_changes(model)  # Reset traindata changes (used as filler)
+    orm.finish_stage(['cu'])  # optional ANALYZE/VACUUM of the output db
     orm.close_session(database.session)  # Close session
     print()
     logger.log_clf.info(f'Classification done. Return to main-level.')
 
 
+# Classification with worker processes: the workers classify id ranges of JobAds, the main process writes the results
+def __classify_parallel(model: Model, last_id: int, query_limit: int, config_hash: str, model_fingerprint: str,
+                        workers: int) -> None:
+    # prepare the output table and split the jobads into id ranges (fetch_size jobads per range)
+    orm.prepare_output('cu')
+    orm.pass_output(database.session)
+    id_ranges = orm.get_id_ranges('cu', last_id, query_limit)
+    orm.pass_output(database.session)  # no open transaction while forking
+    logger.log_clf.info(f'{len(id_ranges)} id ranges of JobAds are classified by {workers} worker processes.')
+
+    jobad_counter = 0
+    start = timer()
+    pool = parallel.get_pool(model, workers)
+    # results are written in the order of the id ranges (together with the checkpoint)
+    for until_id, nr_jobads, nr_rows in write_parallel('cu', pool, parallel.classify_range, id_ranges, config_hash,
+                                                       model_fingerprint):
+        jobad_counter += nr_jobads
+        __progress(jobad_counter, query_limit,
+                   status=f" of {query_limit} JobAds classified. Last JobAd {until_id}.")
+        logger.log_clf.info(f'{nr_jobads} JobAds up to id {until_id} classified, {nr_rows} ClassifyUnits written.')
+    runtime = timer() - start
+    logger.log_clf.info(f'{jobad_counter} JobAds classified by {workers} worker processes in {runtime:.2f}s '
+                        f'({jobad_counter / max(runtime, 1e-9):.1f} JobAds/s).')
+
+
+# Share of the cus classified by the regex classifier alone (cascade mode, the workers log the share of each range)
+def __log_cascade(counter: dict) -> None:
+    share = counter['short_circuited'] / max(counter['cus'], 1)
+    logger.log_clf.info(f'Cascade mode: {counter["short_circuited"]} of {counter["cus"]} ClassifyUnits ({share:.1%}) '
+                        f'classified by the regex classifier alone (without featureunits and knn).')
+    print(f'\nCascade mode: {share:.1%} of the ClassifyUnits classified by the regex classifier alone.')
+
+
 # Progress Bar to keep track of already processed JobAds
 def __progress(count: int, total: int, status: str):
     bar_len = 20
@@ -0,0 +1,92 @@
+""" Script contains the functions for the multi-process classification (--workers N).
+    * The main process splits the JobAds into id ranges (orm.get_id_ranges) and is the only writer.
+    * Each worker process classifies whole id ranges: it loads the JobAds of a range with its own connection,
+      generates and predicts the ClassifyUnits and returns the collected rows (BulkWriter) to the main process.
+    * The model is passed to the workers once. With the start method fork (Linux) it is not copied, but shared
+      copy-on-write with the main process (see orm_handling.pipeline.get_process_pool). """
+
+# ## Imports
+import multiprocessing.pool
+import configuration
+import database
+from orm_handling import orm
+from orm_handling.bulk_writer import BulkWriter
+from orm_handling.pipeline import get_process_pool
+from training.train_models import Model
+from . import prepare_classifyunits
+from . import predict_classes
+import logger
+
+# ## Set Variables
+worker_model = None     # model of the worker process (set by init_worker)
+
+
+# ## Functions
+def get_pool(model: Model, workers: int) -> multiprocessing.pool.Pool:
+    """ Function starts the worker processes and passes the model (shared copy-on-write with fork).
+
+    Parameters
+    ----------
+    model: Model
+        Class Model contains tfidf_vectorizer, knn_clf, regex_clf and traindata-information
+    workers: int
+        Number of worker processes
+
+    Returns
+    -------
+    pool: Pool
+        process pool with initialized workers """
+    return get_process_pool(workers, init_worker, (model, configuration.config_obj))
+
+
+def init_worker(model: Model, config_obj: object, copied: bool) -> None:
+    """ Initializer of each worker process: set the model and the configurations and create an own connection to the
+    input data (connections of the main process must not be used after fork). The model is passed in both cases
+    (shared or copied), so copied is not needed here. """
+
+    # Set global
+    global worker_model
+
+    worker_model = model
+    configuration.config_obj = config_obj
+    database.set_input_conn()
+
+
+def classify_range(id_range: tuple) -> tuple:
+    """ Function classifies all JobAds of an id range in a worker process.
+
+    Parameters
+    ----------
+    id_range: tuple
+        (id of the last JobAd before the range, id of the last JobAd in the range, number of JobAds)
+
+    Returns
+    -------
+    result: tuple
+        (id of the last JobAd in the range, number of processed JobAds, rows of the ClassifyUnits as plain tuples) """
+
+    start_id, until_id, nr_jobads = id_range
+    writer = BulkWriter()
+    jobads = orm.load_batch('cu', database.session, start_id, until_id)
+    cascade = configuration.config_obj.get_c_cascade()
+    with database.session.no_autoflush:
+        for jobad in jobads:
+            prepare_classifyunits.generate_classifyunits(jobad, worker_model, featureunits=not cascade)
+        # one tfidf transform and one knn prediction for all cus of the range
+        if cascade:
+            # regex first: featureunits, featurevectors and knn only for the cus without final regex class
+            all_cus = [cu for jobad in jobads for cu in jobad.children]
+            cus, reg_predicted = predict_classes.start_regex_prediction(all_cus, worker_model)
+            predict_classes.start_batch_prediction(cus, prepare_classifyunits.vectorize_cus(cus, worker_model),
+                                                   worker_model, reg_predicted)
+            logger.log_clf.info(f'Cascade mode: {len(all_cus) - len(cus)} of {len(all_cus)} ClassifyUnits of the '
+                                f'JobAds up to id {until_id} classified by the regex classifier alone.')
+        else:
+            cus, vectorized_cus = prepare_classifyunits.vectorize_batch(jobads, worker_model)
+            predict_classes.start_batch_prediction(cus, vectorized_cus, worker_model)
+        for jobad in jobads:
+            writer.collect(jobad, 'cu')
+    # nothing is written by the workers
+    database.session.expunge_all()
+    database.session.rollback()
+    return until_id, len(jobads), writer.to_tuples()
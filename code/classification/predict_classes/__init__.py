@@ -1,41 +1,92 @@
 """ Script manages the prediction of classes via knn- and reg-classifier and comparing/merging of results. At the end a final class is set for cu. """
 
 # ## Imports
+from scipy.sparse import csr_matrix
 from training.train_models import Model
 from . import knn_predictor
 from . import regex_predictor
 from . import result_merger
 
+# ## Set Variables
+# cascade mode: number of predicted cus and of cus classified by the regex classifier alone (no knn)
+cascade_counter = {'cus': 0, 'short_circuited': 0}
+
 
 # ## Functions
-def start_prediction(jobad: object, model: Model) -> None:
-    """ Function manages the prediction of the classes for each cu.
-        a. use the knn to predict classes
+def start_regex_prediction(cus: list, model: Model) -> 'tuple[list, list]':
+    """ Function is the first step of the cascade mode: the regex classes of all cus of a batch are predicted. If the
+    regex prediction is final (merge returns the same class for every knn class, see result_merger.decide), the class
+    is set and the cu needs no featureunits, featurevector and knn prediction.
+
+    Parameters
+    ----------
+    cus: list
+        classifyunits of the batch (featureunits are not generated yet)
+    model: Model
+        Class Model contains tfidf_vectorizer, knn_clf, regex_clf (further information about class in orm_handling/models.py)
+        and traindata-information
+
+    Returns
+    -------
+    remaining_cus: list
+        classifyunits which need the knn prediction (see start_batch_prediction)
+    remaining_reg: list
+        the predicted regex classes of the remaining_cus """
+
+    reg_predicted = regex_predictor.gen_classes_batch([cu.paragraph for cu in cus], model.get_regex_clf())
+
+    remaining_cus, remaining_reg = list(), list()
+    for cu, reg in zip(cus, reg_predicted):
+        predicted = result_merger.decide(reg)
+        if predicted is None:
+            remaining_cus.append(cu)
+            remaining_reg.append(reg)
+        else:
+            # Set class (regex prediction is final)
+            cu.set_classID(predicted)
+            cu.set_featureunits(None)
+            cu.set_featurevector(None)
+
+    cascade_counter['cus'] += len(cus)
+    cascade_counter['short_circuited'] += len(cus) - len(remaining_cus)
+    return remaining_cus, remaining_reg
+
+
+def start_batch_prediction(cus: list, vectorized_cus: csr_matrix, model: Model, reg_predicted: list = None) -> None:
+    """ Function manages the prediction of the classes for all cus of a batch (one knn prediction for the whole
+    batch).
+        a. use the knn to predict the classes of all cus
         b. use regex to predict classes
-        c. compare both predictions and merge them together
+        c. compare both predictions and merge them together (for all cus at once)
 
     Parameters
     ----------
-    jobad: object
-        jobad is an object of the class JobAds and contains all given variables 
+    cus: list
+        classifyunits of the batch
+    vectorized_cus: csr_matrix
+        featurevectors of the cus (row i belongs to cus[i])
     model: Model
         Class Model contains tfidf_vectorizer, knn_clf, regex_clf (further information about class in orm_handling/models.py)
-        and traindata-information """
+        and traindata-information
+    reg_predicted: list
+        regex classes of the cus, if they are already predicted (cascade mode, see start_regex_prediction) """
 
-    # Iterate over each classifyunit
-    for cu in jobad.children:
+    if not cus:
+        return
 
-        # a. KNN PREDICTION: predict classes with knn
-        knn_predicted = knn_predictor.gen_classes(cu.featurevector, model.model_knn)
+    # a. KNN PREDICTION: predict classes with knn (one row per cu)
+    knn_predicted = knn_predictor.gen_classes_batch(vectorized_cus, model.model_knn)
 
-        # b. REGEX PREDICTION: predict classes with regex
-        reg_predicted = regex_predictor.gen_classes(cu.paragraph, model.get_regex_clf())
+    # b. REGEX PREDICTION: predict classes with regex
+    if reg_predicted is None:
+        reg_predicted = regex_predictor.gen_classes_batch([cu.paragraph for cu in cus], model.get_regex_clf())
 
-        # c. MERGE: compare the prediction from knn and regex
-        if reg_predicted:  # if regex pattern suggested a prediction
-            predicted = result_merger.merge(reg_predicted, knn_predicted)  # compare knn and regex results
-        else:  # no regex class was predicted, use knn
-            predicted = knn_predicted
+    # c. MERGE: compare the predictions from knn and regex (knn is used, if regex did not suggest a class)
+    predicted = result_merger.merge_batch(reg_predicted, knn_predicted)
 
-        # Set class
-        cu.set_classID(predicted)
+    # Set classes
+    for cu, class_id in zip(cus, predicted.tolist()):
+        cu.set_classID(class_id)
+        # featureunits are not stored in db --> drop them to free memory
+        cu.set_featureunits(None)
+        cu.set_featurevector(None)
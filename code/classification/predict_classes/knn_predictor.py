@@ -1,29 +1,31 @@
 """ Script contains the prediction of classes via knn_classifier. """
 
 # ## Imports
+import numpy as np
 from scipy.sparse.csr import csr_matrix
 from sklearn.neighbors import KNeighborsClassifier 
 
 # Functions
-def gen_classes(vectorized_cu: csr_matrix, clf: KNeighborsClassifier) -> int:
-    """ Function to predict the class for a cu.
-    
+def gen_classes_batch(vectorized_cus: csr_matrix, clf: KNeighborsClassifier) -> np.ndarray:
+    """ Function to predict the classes for several cus with one prediction.
+
     Parameters
     ----------
-    vectorized_cu: csr_matrix
-        The transformed cu.
+    vectorized_cus: csr_matrix
+        The transformed cus (one row per cu).
 
     clf: sklearn.neighbors.KNeighborsClassifier
         The saved model. Type: KNeighborsClassifier
-        
+
     Returns
     -------
-    predicted: int
-        The predicted class. """
+    predicted: np.ndarray
+        The predicted class of each row. """
 
-    # use given classifier to predict a class for the vectorized_cu
-    predicted = clf.predict(vectorized_cu)
-    # extract class number from array and clean it
-    predicted = int(predicted[0].replace('\n', ''))
+    # use given classifier to predict the classes of all rows
+    predicted = clf.predict(vectorized_cus)
+    # clean each predicted label once and scatter the class numbers back to the rows
+    labels, inverse = np.unique(predicted, return_inverse=True)
+    class_nrs = np.array([int(str(label).replace('\n', '')) for label in labels], dtype=np.int64)
 
-    return predicted
\ No newline at end of file
+    return class_nrs[inverse]
\ No newline at end of file
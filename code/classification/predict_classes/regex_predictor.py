@@ -1,47 +1,23 @@
 """ Script contains the prediction of classes via regex_classifier. """
 # ## Imports
-import re
-import pandas as pd
+from training.regexclassifier.regex_classifier import RegexClassifier
 
 # ## Functions
-def gen_classes(para: str, regex_clf: pd.DataFrame()) -> list:
-    """ Function to predict the class for a cu via regex_classifier
-    
+def gen_classes_batch(paras: list, regex_clf: RegexClassifier) -> list:
+    """ Function to predict the classes for several cus via regex_classifier (each paragraph is lowercased and
+    escaped once for all patterns).
+
     Parameters
     ----------
-    para: str
-        The content of a ClassifyUnit only slightly preprocessed.
+    paras: list
+        The contents of the ClassifyUnits.
+
+    regex_clf: RegexClassifier
+        The compiled regex pattern (grouped by class).
 
-    regex_clf: pd.DataFrame()
-        The regex pattern + classes stored in DataFrame.
-        
     Returns
     -------
     predicted: list
-        The predicted class(es). """
-
-    # Initiate predicted list for each paragraph
-    predicted = list()
-
-    def __compare_matches(class_nr, pattern):
-        # check if pattern is in para
-        match_result = re.match(pattern, re.escape(para.lower()))
-        # captures() saves multiple matches if more than one is found
-        try:
-            match_result.captures(1)
-        except AttributeError:
-            pass
-        # return None or int(class_nr)
-        if match_result == None:
-            return None
-        else:
-            return int(class_nr)
+        The predicted classes (set) for each paragraph. """
 
-    # check if pattern from regex_clf are in para and return class(es)
-    predicted = [__compare_matches(class_nr, pattern) for class_nr, pattern in zip(regex_clf['class_nr'], regex_clf['pattern'])]
-    # remove None from list
-    predicted = list(filter(None, predicted))
-    # remove duplicates from list
-    predicted = list(dict.fromkeys(predicted))
-    # return list predicted classes for current paragraph
-    return predicted
\ No newline at end of file
+    return regex_clf.predict_batch(paras)
@@ -1,5 +1,8 @@
 """ Script contains the result_merger step. Both predictions (knn and reg) for one cu are compared. """
 
+# ## Imports
+import numpy as np
+
 # Define Variables -> a paragraph can contain different class-elements (e.g. 1 and 3)
 # --> class 5 is set if paragraph gets sorted in classes 1 and 3 (or 5)
 # --> class 6 is set if paragraph gets sorted in classes 2 and 4 (or 6)
@@ -38,6 +41,69 @@ def merge(reg: list, knn: int) -> int:
     else:
         return knn
     
+def merge_batch(reg: list, knn: np.ndarray) -> np.ndarray:
+    """ Function to compare and merge the predictions of knn and reg for several cus (same result as merge for
+    each cu, but evaluated on arrays).
+
+    Parameters
+    ----------
+    reg: list
+        The predicted class(es) (list or set) from regex_classifier for each cu (empty: no regex class).
+    knn: np.ndarray
+        The predicted class from knn_classifier for each cu.
+
+    Returns
+    -------
+    predicted: np.ndarray
+        Final predicted class for each cu. """
+
+    knn = np.asarray(knn, dtype=np.int64)
+    # the merge rules do not depend on the order of the regex classes (sets are sorted to index them)
+    reg = [r if isinstance(r, list) else sorted(r) for r in reg]
+    # number of regex classes and the first two of them (-1 if there is none)
+    reg_len = np.array([len(r) for r in reg], dtype=np.int64)
+    reg_0 = np.array([r[0] if len(r) > 0 else -1 for r in reg], dtype=np.int64)
+    reg_1 = np.array([r[1] if len(r) > 1 else -1 for r in reg], dtype=np.int64)
+
+    # one regex class: compare it with knn, two regex classes: compare them with each other
+    other = np.where(reg_len == 1, knn, reg_1)
+    in_5 = np.isin(reg_0, set_5) & np.isin(other, set_5)
+    in_6 = np.isin(reg_0, set_6) & np.isin(other, set_6)
+    default = np.where(reg_len == 1, reg_0, knn)
+    subset = np.where(in_5, 5, np.where(in_6, 6, default))
+
+    return np.select([(reg_len == 1) & (reg_0 == knn), (reg_len == 1) | (reg_len == 2)], [reg_0, subset], knn)
+
+
+def decide(reg: set) -> int:
+    """ Function checks if the regex prediction is final, i.e. merge returns the same class for every knn class.
+        --> one regex class which is not part of a subset (4, ...) or is the class of its subset (5 or 6)
+        --> two regex classes which are part of one subset
+
+    Parameters
+    ----------
+    reg: set
+        The predicted class(es) (list or set) from regex_classifier.
+
+    Returns
+    -------
+    predicted: int
+        Final predicted class for a cu or None, if the knn prediction is needed. """
+
+    if len(reg) == 1:
+        reg_class = next(iter(reg))
+        # another class of the same subset would change the result to the class of the subset
+        if all(reg_class not in subset or reg_class == subset_class
+               for subset, subset_class in ((set_5, 5), (set_6, 6))):
+            return reg_class
+    elif len(reg) == 2:
+        if set(reg).issubset(set(set_5)):
+            return 5
+        elif set(reg).issubset(set(set_6)):
+            return 6
+    return None
+
+
 def __if_subset(check:list, default):
     if set(check).issubset((set(set_5))):
         return 5
@@ -1,6 +1,7 @@
 """ Script to split jobads into paragraphs (or use traindata paragraphs) and generate classifyunits (fus, fvs) for each paragraphs."""
 
 # ## Imports
+from scipy.sparse import csr_matrix
 from orm_handling.models import ClassifyUnits, ClassifyUnits_Train
 from training.train_models import Model
 from . import classify_units
@@ -10,8 +11,8 @@ import logger
 
 
 # ## Functions
-# ### Main-Function for ClassifyUnit generation (+ featureunits and featurevectors)
-def generate_classifyunits(jobad: object, model: Model) -> None:
+# ### Main-Function for ClassifyUnit generation (+ featureunits)
+def generate_classifyunits(jobad: object, model: Model, featureunits: bool = True) -> None:
     """ Function manages the preparation for the textclassification. Therefore classifyunits are needed and will be
     generated in this step. Following steps are used: 
         --> Each Jobad is splitted into paragraphs and each paragraph is a paragraph of the Class ClassifyUnit.
@@ -27,7 +28,10 @@ def generate_classifyunits(jobad: object, model: Model) -> None:
         jobad is an object of the class JobAds and contains all given variables 
     model: Model
         Class Model consists of tfidf_vectorizer, knn_model (further information about class in orm_handling/models.py) 
-        and traindata-information """
+        and traindata-information
+    featureunits: bool
+        If False, the featureunits are not generated here (cascade mode: only for the cus which need the knn
+        prediction, see vectorize_cus) """
 
     # Split the jobad texts (content) and receive a list of paragraphs for each jobad + remove whitespaces
     list_paragraphs = classify_units.get_paragraphs(jobad)
@@ -35,6 +39,11 @@ def generate_classifyunits(jobad: object, model: Model) -> None:
     # Clean each paragraph and merge ListItems and WhatBelongsTogether
     list_paragraphs = classify_units.clean_paragraphs(list_paragraphs)
 
+    # Existing children of the jobad by paragraph (for the duplicate check)
+    children_by_paragraph = dict()
+    for child in jobad.children:
+        children_by_paragraph.setdefault(child.paragraph, list()).append(child)
+
     # Iterate over each paragraph in list_paragraphs for one jobad
     for para in list_paragraphs:
         """ Remove all non-alphanumerical characters from para and return fus. 
@@ -43,28 +52,80 @@ def generate_classifyunits(jobad: object, model: Model) -> None:
         fus = feature_units.convert_featureunits.replace(para)
 
         # Check if fus is an empty list or if child does not exists
-        if not(any(para == v.paragraph for v in jobad.children)) and fus:
+        if para not in children_by_paragraph and fus:
             # Add cleaned paragraph, default classID, featureunits and featurevectors to classify unit
             cu = ClassifyUnits(classID=0, paragraph=para, featureunits=list(), featurevector=list())
             # set the list of token without non-alphanumerical characters as prototype-fus
             cu.set_featureunits(fus)
             # Connect the cu (classifyunit) as a child to its parent (jobad)
             jobad.children.append(cu)
+            children_by_paragraph[para] = [cu]
         #if paragraph is already processed in a classifyunit --> store it again at the same place (to avoid duplicates) (happens in append mode)
-        elif (any(para == v.paragraph for v in jobad.children)) and fus:
-            for child in jobad.children:
-                if child.paragraph == para:
-                    child.set_featureunits(fus)
+        elif para in children_by_paragraph and fus:
+            for child in children_by_paragraph[para]:
+                child.set_featureunits(fus)
         elif not fus:
             logger.log_clf.warning(f'Feature_unit of JobAd {jobad.id} is empty. Continue with next paragraph.')
             pass
 
-    # Iterate over each jobad and make featureunits and featurevectors vor each cu
+    if not featureunits:
+        return
+
+    # Iterate over each jobad and make featureunits vor each cu
     for cu in jobad.children:
         # Generate featureunits
         feature_units.get_featureunits(cu)
-        # Generate featurevectors
-        feature_vectors.get_featurevectors(cu, model)
+
+
+# Generate the featurevectors of all ClassifyUnits of a batch of JobAds
+def vectorize_batch(jobads: list, model: Model) -> 'tuple[list, csr_matrix]':
+    """ Function stacks the featureunits of all cus of the given jobads (generated with generate_classifyunits) and
+    vectorizes them with one transform.
+
+    Parameters
+    ----------
+    jobads: list
+        objects of the class JobAds with generated classifyunits
+    model: Model
+        Class Model consists of tfidf_vectorizer, knn_model (further information about class in orm_handling/models.py)
+        and traindata-information
+
+    Returns
+    -------
+    cus: list
+        classifyunits of all jobads
+    vectorized_cus: csr_matrix
+        featurevectors of the cus (row i belongs to cus[i]) """
+
+    cus = [cu for jobad in jobads for cu in jobad.children]
+    if not cus:
+        return cus, None
+    return cus, feature_vectors.get_featurevectors_batch(cus, model)
+
+
+# Generate the featureunits and featurevectors of the given ClassifyUnits (cascade mode)
+def vectorize_cus(cus: list, model: Model) -> csr_matrix:
+    """ Function generates the featureunits of the given cus (generated with featureunits=False) and vectorizes
+    them with one transform.
+
+    Parameters
+    ----------
+    cus: list
+        classifyunits which need the knn prediction
+    model: Model
+        Class Model consists of tfidf_vectorizer, knn_model (further information about class in orm_handling/models.py)
+        and traindata-information
+
+    Returns
+    -------
+    vectorized_cus: csr_matrix
+        featurevectors of the cus (row i belongs to cus[i]), None if there is no cu """
+
+    if not cus:
+        return None
+    for cu in cus:
+        feature_units.get_featureunits(cu)
+    return feature_vectors.get_featurevectors_batch(cus, model)
 
 
 # Generate ClassifyUnits_Train (and fus) for Trainingdata JobAds
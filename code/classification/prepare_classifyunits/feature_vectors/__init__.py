@@ -1,21 +1,24 @@
 # ## Imports
+from scipy.sparse import csr_matrix
 from training.train_models import Model
 from . import convert_featurevectors
 
 # ## Function
-def get_featurevectors(cu: object, model: Model) -> None:
-    """ Function to vectorize the fus of a classifyunit.
+def get_featurevectors_batch(cus: list, model: Model) -> csr_matrix:
+    """ Function to vectorize the fus of several classifyunits at once (e.g. all cus of a fetch batch).
 
     Parameters
     ----------
-    cu: object
-        object of Class ClassifyUnits: contains content and featureunits
+    cus: list
+        objects of Class ClassifyUnits: contain content and featureunits
     model: Model
-        Class Model consists of tfidf_vectorizer, knn_model (further information about class in orm_handling/models.py) 
-        and traindata-information """
-    
-    # Pass fus and vectorizer to vectorization
-    vectorized_cu = convert_featurevectors.gen_tfidf_cu(cu.featureunits, model.vectorizer)
+        Class Model consists of tfidf_vectorizer, knn_model (further information about class in orm_handling/models.py)
+        and traindata-information
 
-    # Set returned vector 
-    cu.set_featurevector(vectorized_cu)
+    Returns
+    -------
+    vectorized_cus: csr_matrix
+        one row per cu (same order as cus) """
+
+    # Pass fus of all cus and vectorizer to vectorization
+    return convert_featurevectors.gen_tfidf_batch([cu.featureunits for cu in cus], model.vectorizer)
@@ -7,30 +7,30 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 vectorizer= str()
 
 # ## Function
-def gen_tfidf_cu(fus: list, vectorizer: TfidfVectorizer) -> csr_matrix:  
-    """ Function to vectorize the fus of a classifyunit.
+def gen_tfidf_batch(fus_list: list, vectorizer: TfidfVectorizer) -> csr_matrix:
+    """ Function to vectorize the fus of several classifyunits with one transform (one row per cu).
 
     Parameters
     ----------
-    fus: list
-        list of featureunits of one cu
+    fus_list: list
+        list with the featureunits of each cu
     vectorizer: TfidfVectorizer
         vectorizer object contains the fitted vocab of Trainingdata
-    
+
     Raises
     ------
     AttributeError
-        If vectorizer is empty, AttributeError is raised 
-        
+        If vectorizer is empty, AttributeError is raised
+
     Returns
     -------
-    vectorized_cu: csr_matrix
-        transformed classifyunit """
+    vectorized_cus: csr_matrix
+        transformed classifyunits (row i belongs to fus_list[i]) """
 
     try:
-        # transform fus from cu
-        vectorized_cu = vectorizer.transform([" ".join(fus)])
-        return vectorized_cu
+        # transform fus from all cus
+        vectorized_cus = vectorizer.transform([" ".join(fus) for fus in fus_list])
+        return vectorized_cus
     except AttributeError:
         print(f'Error: Vectorizer is empty or not working. Check tfidf_model and start again.')
         sys.exit()
\ No newline at end of file
@@ -10,7 +10,7 @@ config_obj = None
 # ## Function
 def set_config(method_args: dict) -> None:
     """ Function manages the Settings for Configuration-object.
-            a. gets values from ArgumentParser (input_path and db_mode)
+            a. gets values from ArgumentParser (input_path, db_mode, resume, output_path and workers)
             b. gets values from configuration file 
         --> Setters are used to check if values are valid. """
 
@@ -20,20 +20,26 @@ def set_config(method_args: dict) -> None:
     # ArgParser Settings
     input_path = method_args['input_path']      # extract input_path from argparser
     db_mode = method_args['db_mode']            # extract new db_mode from argparser
-    config_obj = Configurations(input_path,
-                                db_mode)        # instantiate config_obj and pass vars input_path and db_mode from argparser
+    resume = method_args.get('resume', False)   # extract resume flag from argparser
+    output_path = method_args.get('output_path')  # extract output_path from argparser (None: write into input_path)
+    workers = method_args.get('workers', 1)     # extract number of worker processes from argparser
+    config_obj = Configurations(input_path, db_mode, resume, output_path,
+                                workers)  # instantiate config_obj and pass vars input_path, db_mode, resume, output_path and workers from argparser
     config_obj.set_input_path()
     config_obj.set_mode()
+    config_obj.set_workers()
 
     # Configuration-File Settings
     config_obj.set_fetch_size()                 # check and set data-handling values
     config_obj.set_query_limit()
     config_obj.set_start_pos()
+    config_obj.set_database_config()            # check and set database handling values
 
     # Classification
     config_obj.set_fus_config()                 # check and set specific training and processing values
     config_obj.set_knn_config()
     config_obj.set_tfidf_config()
+    config_obj.set_cascade()
 
     config_obj.set_knn_path()                   # check and set classification paths
     config_obj.set_tfidf_path()
@@ -45,6 +51,8 @@ def set_config(method_args: dict) -> None:
     config_obj.set_ie_type()    # check and set ie config values
     config_obj.set_expand_coordinates()
     config_obj.set_search_type()
+    config_obj.set_spacy_config()
+    config_obj.set_annotation_cache_config()
 
     config_obj.set_competence_paths()   # check and set ie paths
     config_obj.set_tool_paths()
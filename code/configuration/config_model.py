@@ -1,8 +1,12 @@
 # ## Imports
 import ruamel.yaml
+import hashlib
+import json
+import copy
 from pathlib import Path
 import os
 import logger
+from database import connection
 
 
 # Configuration Class
@@ -10,7 +14,11 @@ class Configurations:
     """ Class to get the parameters set in config.yaml and check if they are valid. 
         --> If not, set default values. """
 
-    def __init__(self, arg_input_path, arg_db_mode):
+    # default values of ie_config/spacy (also used by the Information Extraction, if no configuration is set)
+    spacy_defaults = {'model': 'de_core_news_sm', 'disable': ['ner'], 'senter': False, 'batch_size': 64, 'n_process': 1,
+                      'reuse_doc': True}
+
+    def __init__(self, arg_input_path, arg_db_mode, arg_resume=False, arg_output_path=None, arg_workers=1):
 
         # Get global_path (relative for all other needed files) from input_file
         global_path = extract_globalpath(arg_input_path)
@@ -24,6 +32,7 @@ class Configurations:
             c_query_limit = cfg['classification']['query_limit']
             c_fetch_size = cfg['classification']['fetch_size']
             c_start_pos = cfg['classification']['start_pos']
+            c_cascade = cfg['classification'].get('cascade')   # optional: knn only if the regex result is not final
             # model paths
             tfidf_path = os.path.join(global_path, 'resources', cfg['classification']['models']['tfidf_path'])
             knn_path = os.path.join(global_path, 'resources', cfg['classification']['models']['knn_path'])
@@ -43,6 +52,8 @@ class Configurations:
             expand_coordinates = cfg['ie_config']['expand_coordinates']
             search_type = cfg['ie_config']['search']
             ie_type = cfg['ie_config']['type']
+            spacy_config = cfg['ie_config'].get('spacy')   # optional: spaCy pipeline and batching
+            annotation_cache_config = cfg['ie_config'].get('annotation_cache')   # optional: cache of the annotations
 
             # competence paths
             global_comp = [global_path, 'resources','information_extraction','competences']         # subfolder for competences
@@ -62,12 +73,16 @@ class Configurations:
             possible_comps = os.path.join(*global_comps, cfg['resources']['possible_comp_path'])
             splitted_comps = os.path.join(*global_comps, cfg['resources']['splitted_comp_path'])
 
+            # database config (optional section)
+            database_config = cfg.get('database')
+
         # Set default values
         # classification
         self.fus_config = fus_config
         self.c_query_limit = c_query_limit
         self.c_fetch_size = c_fetch_size
         self.c_start_pos = c_start_pos
+        self.c_cascade = c_cascade
         self.tfidf_path = tfidf_path
         self.knn_path = knn_path
         self.tfidf_config = tfidf_config
@@ -83,6 +98,8 @@ class Configurations:
         self.expand_coordinates = expand_coordinates
         self.search_type = search_type
         self.ie_type = ie_type
+        self.spacy_config = spacy_config
+        self.annotation_cache_config = annotation_cache_config
         self.competence_path = competence_path
         self.no_competence_path = no_competence_path
         self.modifier_path = modifier_path
@@ -93,9 +110,15 @@ class Configurations:
         self.possible_comps = possible_comps
         self.splitted_comps = splitted_comps
 
+        # database
+        self.database_config = database_config
+
         # Values passed by ArgumentParser
         self.db_mode = arg_db_mode
         self.input_path = arg_input_path
+        self.resume = arg_resume
+        self.output_path = arg_output_path
+        self.workers = arg_workers
 
     # Setter
     def set_traindata_path(self):
@@ -110,6 +133,13 @@ class Configurations:
         knn_path = Configurations.__check_path(self.knn_path)
         self.knn_path = knn_path
 
+    def set_workers(self):
+        workers = Configurations.__check_type(self.workers, 1, int)
+        # 0 or negative: use all cores
+        if workers < 1:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+
     def set_input_path(self):
         input_path = Configurations.__check_path(self.input_path)
         self.input_path = input_path
@@ -140,6 +170,11 @@ class Configurations:
         self.c_start_pos = c_start_pos
         self.ie_start_pos = ie_start_pos
 
+    def set_cascade(self):
+        # the results are the same with and without cascade mode (not part of the config hash)
+        c_cascade = Configurations.__check_type(self.c_cascade, False, bool)
+        self.c_cascade = c_cascade
+
     def set_mode(self):
         db_mode = Configurations.__check_strings(self.db_mode, 'overwrite', ('append', 'overwrite'))
         self.db_mode = db_mode
@@ -178,8 +213,67 @@ class Configurations:
         knn_config = Configurations.__check_strings_for_dict(knn_config, 'algorithm', 'auto',
                                                              ('auto', 'ball_tree', 'kd_tree', 'brute'))
         knn_config = Configurations.__check_type_for_dict(knn_config, 'leaf_size', 30, int)
+        # knn engine: sklearn's KNeighborsClassifier, SparseKNN (chunked sparse products, memory_mb per chunk)
+        # or LSHKNN (approximate, SparseKNN with a random-projection LSH index)
+        knn_config = Configurations.__check_strings_for_dict(knn_config, 'engine', 'sklearn',
+                                                             ('sklearn', 'sparse', 'lsh'))
+        knn_config = Configurations.__check_type_for_dict(knn_config, 'memory_mb', 64, int)
+        # LSH index: more tables and probes --> higher recall, more bits --> fewer candidates (lower latency)
+        knn_config = Configurations.__check_type_for_dict(knn_config, 'lsh_tables', 16, int)
+        knn_config = Configurations.__check_type_for_dict(knn_config, 'lsh_bits', 12, int)
+        knn_config = Configurations.__check_type_for_dict(knn_config, 'lsh_probes', 0, int)
         self.knn_config = knn_config
 
+    def set_database_config(self):
+        database_config = self.database_config
+        if database_config is None:
+            database_config = dict()
+        # Check-functions to avoid error raises because of missing or wrong inputs
+        database_config = Configurations.__check_type_for_dict(database_config, 'bulk_write', False, bool)
+        # exact name of a connection profile (unknown profiles would raise a KeyError in create_connection)
+        if database_config.get('profile') not in connection.profiles:
+            if 'profile' in database_config and logger.log_main is not None:
+                logger.log_main.warning(f'Unknown database profile {database_config["profile"]}. '
+                                        f'Profile safe is used instead.')
+            database_config['profile'] = 'safe'
+        database_config = Configurations.__check_type_for_dict(database_config, 'analyze', False, bool)
+        database_config = Configurations.__check_type_for_dict(database_config, 'vacuum', False, bool)
+        database_config = Configurations.__check_type_for_dict(database_config, 'prefetch', False, bool)
+        database_config = Configurations.__check_type_for_dict(database_config, 'queue_size', 2, int)
+        if database_config['queue_size'] < 1:
+            database_config['queue_size'] = 2
+        self.database_config = database_config
+
+    def set_spacy_config(self):
+        spacy_config = self.spacy_config
+        if spacy_config is None:
+            spacy_config = dict()
+        # Check-functions to avoid error raises because of missing or wrong inputs
+        for key, default_val in Configurations.spacy_defaults.items():
+            spacy_config = Configurations.__check_type_for_dict(spacy_config, key, copy.deepcopy(default_val),
+                                                                type(default_val))
+        if spacy_config['batch_size'] < 1:
+            spacy_config['batch_size'] = 64
+        # 0 or negative: use all cores
+        if spacy_config['n_process'] < 1:
+            spacy_config['n_process'] = os.cpu_count() or 1
+        self.spacy_config = spacy_config
+
+    def set_annotation_cache_config(self):
+        cache_config = self.annotation_cache_config
+        if cache_config is None:
+            cache_config = dict()
+        # Check-functions to avoid error raises because of missing or wrong inputs
+        cache_config = Configurations.__check_type_for_dict(cache_config, 'enabled', False, bool)
+        cache_config = Configurations.__check_type_for_dict(cache_config, 'path', 'sqlite/annotation_cache.db', str)
+        cache_config = Configurations.__check_type_for_dict(cache_config, 'max_entries', 100000, int)
+        cache_config = Configurations.__check_strings_for_dict(cache_config, 'eviction', 'lru', ('lru', 'lfu'))
+        if cache_config['max_entries'] < 1:
+            cache_config['max_entries'] = 100000
+        # path relative to quenfo_py_data
+        cache_config['path'] = os.path.join(extract_globalpath(self.input_path), cache_config['path'])
+        self.annotation_cache_config = cache_config
+
     def set_expand_coordinates(self):
         expand_coordinates = Configurations.__check_type(self.expand_coordinates, True, bool)
         self.expand_coordinates = expand_coordinates
@@ -244,6 +338,12 @@ class Configurations:
     def get_input_path(self) -> str:
         return self.input_path
 
+    def get_output_path(self) -> str:
+        return self.output_path
+
+    def get_workers(self) -> int:
+        return self.workers
+
     def get_stopwords_path(self) -> str:
         return self.stopwords_path
 
@@ -259,6 +359,9 @@ class Configurations:
     def get_c_start_pos(self) -> int:
         return self.c_start_pos
 
+    def get_c_cascade(self) -> bool:
+        return self.c_cascade
+
     def get_mode(self) -> str:
         return self.db_mode
 
@@ -271,6 +374,22 @@ class Configurations:
     def get_knn_config(self) -> dict:
         return self.knn_config
 
+    def get_database_config(self) -> dict:
+        return self.database_config
+
+    def get_resume(self) -> bool:
+        return self.resume
+
+    def get_config_hash(self, table_type: str) -> str:
+        """ Hash over all configuration values which change the results of a stage (stored with the checkpoints).
+        Paging values (query_limit, fetch_size, start_pos) are not included. """
+        if table_type == 'cu':
+            values = [self.fus_config, self.tfidf_config, self.knn_config]
+        else:
+            spacy_values = {key: self.spacy_config[key] for key in ('model', 'disable', 'senter', 'reuse_doc')}
+            values = [self.ie_type, self.search_type, self.expand_coordinates, spacy_values]
+        return hashlib.md5(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
     def get_ie_start_pos(self) -> int:
         return self.ie_start_pos
 
@@ -289,6 +408,12 @@ class Configurations:
     def get_ie_type(self) -> dict:
         return self.ie_type
 
+    def get_spacy_config(self) -> dict:
+        return self.spacy_config
+
+    def get_annotation_cache_config(self) -> dict:
+        return self.annotation_cache_config
+
     def get_competences_path(self) -> str:
         return self.competence_path
 
@@ -353,7 +478,7 @@ class Configurations:
         return str_to_check
 
     def __check_strings_for_dict(current_dict, key, default_str, choices):
-        str_to_check = current_dict[key]
+        str_to_check = current_dict.get(key)
         try:
             if [s for s in choices if str(str_to_check) in s] == []:
                 raise KeyError
@@ -3,12 +3,15 @@
 # ## Imports
 from . import connection
 import configuration
+import logger
+from pathlib import Path
 
 # ## Set Variables
 session = None
 session2 = None
 engine = None
 engine2 = None
+input_attached = False  # True if the input database is attached to the output database (--output_path)
 
 
 # ## Functions
@@ -16,14 +19,25 @@ engine2 = None
 def set_input_conn() -> None:
     """ Function to manage database-connection for input-data.
             a. Set session and engine global
-            b. Get input-path from configuration object
-            c. Create a connection via input_path and fill session and engine """
+            b. Get input-path (and output-path) from configuration object
+            c. Create a connection via input_path and fill session and engine. If an output_path is given, the
+               connection is created via output_path and the input database is attached read-only. """
     # Set globals
-    global session, engine
-    # Get input-path from configuration
+    global session, engine, input_attached
+    # Get input-path and output-path from configuration
     input_path = configuration.config_obj.get_input_path()
-    # Get instantiated session object and engine for Input_data
-    session, engine = connection.create_connection(input_path)
+    output_path = configuration.config_obj.get_output_path()
+    # Get instantiated session object and engine for Input_data (with the connection profile from config)
+    profile = configuration.config_obj.get_database_config()['profile']
+    # same file as input --> nothing to attach
+    if output_path is None or Path(output_path).resolve() == Path(input_path).resolve():
+        session, engine = connection.create_connection(input_path, profile)
+        input_attached = False
+    else:
+        session, engine = connection.create_connection(output_path, profile, attach_path=input_path)
+        input_attached = True
+        logger.log_main.info(f'Results are written to {output_path}, input data {input_path} is attached read-only.')
+    logger.log_main.info(f'Connection profile "{profile}" active for input data: {connection.get_pragmas(engine)}')
 
 
 # Traindata-Connection
@@ -37,4 +51,6 @@ def set_train_conn() -> None:
     # Get traindata-path from configuration
     traindata_path = configuration.config_obj.get_traindata_path()
     # Get instantiated session2 object and engine2 for Traindata_data
-    session2, engine2 = connection.create_connection(traindata_path)
+    profile = configuration.config_obj.get_database_config()['profile']
+    session2, engine2 = connection.create_connection(traindata_path, profile)
+    logger.log_main.info(f'Connection profile "{profile}" active for traindata: {connection.get_pragmas(engine2)}')
@@ -1,21 +1,45 @@
 """ Script to create a connection to sqlite dbs depending on database-path. """
 
 # ## Imports
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.orm.session import Session
 from sqlalchemy.orm import sessionmaker
 from typing import Union
+from pathlib import Path
+from orm_handling.models import input_schema
+
+# ## Set Variables
+""" Connection profiles (PRAGMAs which are set on every new sqlite connection):
+        a. safe         --> sqlite defaults (rollback journal, full sync, small cache). The journal_mode is not set:
+                            WAL is persistent, it would change the database files (and create -wal/-shm files).
+        b. throughput   --> WAL with relaxed sync, big page cache and memory mapped reads
+        c. bulk-load    --> no sync at all, for (re)creating output tables in one go. A crash can corrupt the db!
+    page_size only takes effect for new (empty) database files. """
+profiles = {
+    'safe': {'synchronous': 'FULL', 'cache_size': -2000, 'mmap_size': 0, 'temp_store': 'DEFAULT', 'page_size': 4096},
+    'throughput': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'cache_size': -65536, 'mmap_size': 268435456,
+                   'temp_store': 'MEMORY', 'page_size': 4096},
+    'bulk-load': {'journal_mode': 'WAL', 'synchronous': 'OFF', 'cache_size': -262144, 'mmap_size': 1073741824,
+                  'temp_store': 'MEMORY', 'page_size': 8192},
+}
+
 
 # ## Function
-def create_connection(database_path: str) -> Union[Session, Engine]:
+def create_connection(database_path: str, profile: str = 'safe', attach_path: str = None) -> Union[Session, Engine]:
     """ Function creates engine via database_path and binds engine to receive a session.
-    
+    If attach_path is set, the database is attached to every connection as input_schema (read-only and immutable),
+    so the input table can be read in the same queries (e.g. anti-joins) while results are written to database_path.
+
     Parameters
     ----------
     database_path: str
         String contains the Path of the database.
-    
+    profile: str
+        Name of the connection profile (key of profiles), the PRAGMAs are applied on each connect.
+    attach_path: str
+        String contains the Path of the input database (None: input tables are in database_path).
+
     Returns
     -------
     session: Session
@@ -23,11 +47,59 @@ def create_connection(database_path: str) -> Union[Session, Engine]:
     engine: Engine
         engine object """
 
-    # Create engine with path
-    engine = create_engine('sqlite:///' + database_path, echo=False)
+    pragmas = dict(profiles[profile])
+    # page_size can only be changed before the first table is written
+    if Path(database_path).exists() and Path(database_path).stat().st_size > 0:
+        pragmas.pop('page_size')
+
+    # Create engine with path (uri filenames are needed to open the attached database read-only)
+    engine = create_engine('sqlite:///' + database_path, echo=False,
+                           connect_args={'uri': True} if attach_path is not None else {})
     engine.execution_options(stream_results=True)
+
+    # Set PRAGMAs for every new dbapi-connection of the engine (page_size has to be set before journal_mode)
+    @event.listens_for(engine, 'connect')
+    def __set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if 'page_size' in pragmas:
+            cursor.execute(f'PRAGMA page_size = {pragmas["page_size"]}')
+        for key, value in pragmas.items():
+            if key != 'page_size':
+                cursor.execute(f'PRAGMA {key} = {value}')
+        # immutable: sqlite does not lock or check the input file for changes (it must not be changed during the run)
+        if attach_path is not None:
+            cursor.execute(f'ATTACH DATABASE ? AS {input_schema}',
+                           (Path(attach_path).resolve().as_uri() + '?mode=ro&immutable=1',))
+        cursor.close()
+
+    # input table in the same database --> remove the schema, else write the output tables explicitly to the main
+    # database (the input database can contain output tables of older runs)
+    if attach_path is None:
+        engine = engine.execution_options(schema_translate_map={input_schema: None})
+    else:
+        engine = engine.execution_options(schema_translate_map={None: 'main'})
+
     # Bind engine to receive a session
     Session = sessionmaker(bind=engine)
     # Instantiate a session object
     session = Session()
     return session, engine
+
+
+def get_pragmas(engine: Engine) -> dict:
+    """ Function reads the active PRAGMA values of a connection (used for logging).
+
+    Parameters
+    ----------
+    engine: Engine
+        engine object
+
+    Returns
+    -------
+    active_pragmas: dict
+        dictionary with PRAGMA names as keys and the current values as values """
+
+    with engine.connect() as conn:
+        keys = dict.fromkeys(key for pragmas in profiles.values() for key in pragmas)
+        active_pragmas = {key: conn.exec_driver_sql(f'PRAGMA {key}').scalar() for key in keys}
+    return active_pragmas
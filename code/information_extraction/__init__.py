@@ -9,8 +9,12 @@ import configuration
 import database
 import logger
 from information_extraction.extraction import extract_entities
-from information_extraction.prepare_extractionunits import generate_extraction_units
+from information_extraction.prepare_extractionunits import generate_extraction_units, convert_extractionunits
+from information_extraction import prepare_resources
 from orm_handling import orm
+from orm_handling.pipeline import BatchPipeline, write_parallel
+from information_extraction import parallel
+from timeit import default_timer as timer
 
 
 # ## Functions
@@ -19,14 +23,13 @@ from orm_handling.models import ClassifyUnits
 
 def extract():
     """Main-Function for Information Extraction.
-        * Step 1: Set Connection to DB and load ClassifyUnits from DB -> get_classify_units
+        * Step 1: Set Connection to DB and load ClassifyUnits from DB -> BatchPipeline('eu')
         * Step 2: For each CU generate ExtractionUnits (sentences) -> generate_extractionunits
-        * Step 3: Load EUs from DB -> get_extraction_units
-        * Step 4: For each EU extract entities -> extract_entities"""
+        * Step 3: Load EUs from DB -> BatchPipeline('e')
+        * Step 4: For each EU extract entities -> extract_entities
+        Both loops store a checkpoint with each committed batch, so an interrupted run can be resumed (--resume)."""
 
     # ## Set Variables
-    all_extractions = list()  # list with all found extractions
-
     query_limit = configuration.config_obj.get_ie_query_limit()  # query_limit: Number of ClassifyUnits to process
     search_type = configuration.config_obj.get_search_type()
     if query_limit == -1:  # if query_limit is -1, the whole table will be processed.
@@ -34,10 +37,12 @@ def extract():
         ClassifyUnits.classID == search_type).all())    # Therefore the length of the table is extracted and set as query_limit.
 
     start_pos = configuration.config_obj.get_ie_start_pos()  # start_pos: Row Number where to start query
-    current_pos = start_pos  # set row number for query
+    last_id = orm.get_start_id('cu', start_pos)  # cursor for keyset pagination: id of the last processed ClassifyUnit
+    config_hash = configuration.config_obj.get_config_hash('eu')  # stored with each checkpoint
+    resources_fingerprint = prepare_resources.get_fingerprint()
+    last_id = orm.resume_stage('eu', config_hash, resources_fingerprint, last_id)  # with --resume: continue after checkpoint
     counter = 0  # set counter in fetch_size steps
     cu_counter = 1  # set cu counter for each cu
-    eu_counter = 1  # set eu counter for each eu
 
     ie_mode = set_ie_mode(configuration.config_obj.get_ie_type())
 
@@ -48,14 +53,11 @@ def extract():
     logger.log_ie.info(f'Generation of ExtractionUnits starts.')
 
     # process cus as long as the conditions are met
-    while True:
-        # Step 1: Load the Input data: ClassifyUnits in ClassifyUnits Class.
-        classify_units = orm.get_classify_units(current_pos)
+    # Step 1: Load the Input data: ClassifyUnits in ClassifyUnits Class (with prefetch: next batch loaded by a thread).
+    pipeline = BatchPipeline('eu', last_id, config_hash, resources_fingerprint)
+    for classify_units in pipeline:
 
-        # Break if no more ClassifyUnits are found or query_limit is reached/exceeded.
-        if len(classify_units) == 0:
-            logger.log_ie.info(f'No more ClassifyUnits in batch. Stop processing.')
-            break
+        # Break if query_limit is reached/exceeded.
         if counter >= query_limit:
             logger.log_ie.info(f'Query_limit reached. Stop processing.')
             break
@@ -63,51 +65,62 @@ def extract():
         logger.log_ie.info(
             f'New chunk of ClassifyUnits loaded. Start processing --> generate_extractionunits.')
 
+        # annotate the paragraphs of the whole batch at once (nlp.pipe and annotation cache)
+        start = timer()
+        annotated = convert_extractionunits.annotate_paragraphs([cu.paragraph for cu in classify_units])
+        logger.log_ie.info(f'{len(annotated)} paragraphs annotated in {timer() - start:.2f}s.')
+
         # iterate over each cu
-        for cu in classify_units:
-            # Step 2: Generate EUs -> sentences
-            generate_extraction_units(cu, ie_mode)
-            # add obj to current session --> to be written in db
-            orm.create_output(database.session, cu, 'eu')
-            # Update progress in progress bar
-            __progress(cu_counter, query_limit,
-                       status=f" of {query_limit} ClassifyUnits separated. "
-                              f"Current ClassifyUnit {cu_counter}.")
-            cu_counter += 1
-
-        # Commit generated extraction units to table
-        orm.pass_output(database.session)
+        # no autoflush while processing: lazy loads must not flush the pending eus of the batch (written at once in pass_output)
+        with database.session.no_autoflush:
+            for cu, sentences in zip(classify_units, annotated):
+                # Step 2: Generate EUs -> sentences
+                generate_extraction_units(cu, ie_mode, sentences)
+                # Update progress in progress bar
+                __progress(cu_counter, query_limit,
+                           status=f" of {query_limit} ClassifyUnits separated. "
+                                  f"Current ClassifyUnit {cu_counter}.")
+                cu_counter += 1
+
+        rss = logger.track_memory()  # sample memory usage while the whole batch is in memory
+        # Commit generated extraction units to table (together with the checkpoint)
+        last_id = pipeline.submit(classify_units)  # update cursor
         counter += len(classify_units)  # update counter
-        current_pos += len(classify_units)  # update current position
 
         logger.log_ie.info(
-            f'session is cleaned and every obj of current batch is flushed: {database.session._is_clean()}.\
-                Continue with next batch from current row position: {current_pos}.')
+            f'Batch is passed to the output. Continue with next batch after ClassifyUnit id: {last_id}. '
+            f'Current RSS: {rss:.1f} MB.')
+    else:
+        logger.log_ie.info(f'No more ClassifyUnits in batch. Stop processing.')
+    pipeline.close()  # wait for the last batches to be written
+    stats = convert_extractionunits.annotation_stats
+    logger.log_ie.info(f'Sentences annotated: {stats["reused"]} from the parsed paragraphs, '
+                       f'{stats["parsed"]} parsed on their own (changed by normalization or reuse_doc false), '
+                       f'{stats["cached"]} from the annotation cache ({stats["cached_paragraphs"]} cached '
+                       f'paragraphs).')
+    cache_stats = convert_extractionunits.close_annotation_cache()
+    if cache_stats is not None:
+        logger.log_ie.info(f'Annotation cache: hit rate {cache_stats["hit_rate"]:.1%} ({cache_stats["hits"]} hits, '
+                           f'{cache_stats["misses"]} misses), {cache_stats["stores"]} entries stored, '
+                           f'{cache_stats["evictions"]} evicted.')
 
     print()
 
-    # Step 3: Load EUs from DB
-    extraction_units = orm.get_extraction_units()
-
-    logger.log_ie.info(f'{len(extraction_units)} ExtractionUnits load from db.\n\nExtraction starts.')
-    print(f'{len(extraction_units)} ExtractionUnits load from db.\n\nExtraction starts.')
-
-    # iterate over each eu
-    for eu in extraction_units:
-        # Step 4: Extraction
-        extractions = extract_entities(eu, ie_mode)
-        all_extractions.extend(extractions)  # collect all extractions
-        # add obj to current session --> to be written in db
-        orm.create_output(database.session, eu, 'e')
-        # Update progress in progress bar
-        __progress(eu_counter, len(extraction_units), status=f" of {len(extraction_units)} ExtractionUnits processed. "
-                                                             f"Current ExtractionUnit {eu_counter}.")
-        eu_counter += 1
-
-    # Commit generated extractions to table
-    orm.pass_output(database.session)
+    # Step 3: Load EUs from DB (batch by batch)
+    eu_length = orm.get_length('eu')
+    last_eu_id = orm.resume_stage('e', config_hash, resources_fingerprint, None)  # cursor: id of the last processed eu
 
-    logger.log_ie.info(f'{len(all_extractions)} extracted entities from {ie_mode} were found.')
+    logger.log_ie.info(f'{eu_length} ExtractionUnits in db.\n\nExtraction starts.')
+    print(f'{eu_length} ExtractionUnits in db.\n\nExtraction starts.')
+
+    workers = configuration.config_obj.get_workers()  # number of worker processes (--workers)
+    if workers > 1:
+        # Step 4 in worker processes (id ranges of eus, eus of a cu are not split), the results are written here
+        __extract_parallel(ie_mode, last_eu_id, eu_length, config_hash, resources_fingerprint, workers)
+    else:
+        # Step 4 batch by batch in this process
+        __extract_serial(ie_mode, last_eu_id, eu_length, config_hash, resources_fingerprint)
+    orm.finish_stage(['eu', 'e'])  # optional ANALYZE/VACUUM of the output db
     orm.close_session(database.session)  # Close session
     print()
     logger.log_ie.info(f'InformationExtraction done. Return to main-level.')
@@ -136,6 +149,62 @@ def set_ie_mode(ie_types: dict) -> str:
     return ie_mode
 
 
+# Extraction in the main process: the eus are loaded, processed and written batch by batch (BatchPipeline)
+def __extract_serial(ie_mode: str, last_eu_id: int, eu_length: int, config_hash: str,
+                     resources_fingerprint: str) -> None:
+    all_extractions = list()  # list with all found extractions
+    eu_counter = 1  # set eu counter for each eu
+    pipeline = BatchPipeline('e', last_eu_id, config_hash, resources_fingerprint)
+    for extraction_units in pipeline:
+
+        # iterate over each eu
+        # no autoflush while processing: extractions are written at once in pass_output
+        with database.session.no_autoflush:
+            for eu in extraction_units:
+                # Step 4: Extraction
+                extractions = extract_entities(eu, ie_mode)
+                all_extractions.extend(extractions)  # collect all extractions
+                # Update progress in progress bar
+                __progress(eu_counter, eu_length, status=f" of {eu_length} ExtractionUnits processed. "
+                                                         f"Current ExtractionUnit {eu_counter}.")
+                eu_counter += 1
+
+        logger.track_memory()  # sample memory usage while the whole batch is in memory
+        # Commit generated extractions to table (together with the checkpoint)
+        pipeline.submit(extraction_units)
+    logger.log_ie.info(f'No more ExtractionUnits in batch. Stop processing.')
+    pipeline.close()  # wait for the last batches to be written
+
+    logger.log_ie.info(f'{len(all_extractions)} extracted entities from {ie_mode} were found.')
+
+
+# Extraction with worker processes: the workers extract the entities of id ranges of eus, the main process writes them
+def __extract_parallel(ie_mode: str, last_eu_id: int, eu_length: int, config_hash: str, resources_fingerprint: str,
+                       workers: int) -> None:
+    # prepare the output table and split the eus into id ranges (about fetch_size eus per range)
+    orm.prepare_output('e')
+    orm.pass_output(database.session)
+    id_ranges = orm.get_id_ranges('e', last_eu_id, eu_length)
+    orm.pass_output(database.session)  # no open transaction while forking
+    logger.log_ie.info(f'{len(id_ranges)} id ranges of ExtractionUnits are processed by {workers} worker processes.')
+
+    eu_counter = 0
+    entity_counter = 0
+    start = timer()
+    pool = parallel.get_pool(ie_mode, workers)
+    # results are written in the order of the id ranges (together with the checkpoint)
+    for until_id, nr_eus, nr_rows in write_parallel('e', pool, parallel.extract_range, id_ranges, config_hash,
+                                                    resources_fingerprint):
+        eu_counter += nr_eus
+        entity_counter += nr_rows
+        __progress(eu_counter, eu_length, status=f" of {eu_length} ExtractionUnits processed. "
+                                                 f"Last ExtractionUnit {until_id}.")
+    runtime = timer() - start
+    logger.log_ie.info(f'{entity_counter} extracted entities from {ie_mode} were written. {eu_counter} ExtractionUnits '
+                       f'processed by {workers} worker processes in {runtime:.2f}s '
+                       f'({eu_counter / max(runtime, 1e-9):.1f} ExtractionUnits/s).')
+
+
 # Progress Bar to keep track of already processed objects from class
 def __progress(count: int, total: int, status: str):
     bar_len = 20
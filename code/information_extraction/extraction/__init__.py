@@ -33,8 +33,8 @@ def extract_entities(extraction_unit: ExtractionUnits, ie_mode: str) -> 'list[In
     extractions = remove_known_entities(extractions, ie_mode)
 
     # Step 3: evaluation of pattern and extraction and select best ones
-    evaluate_pattern(extractions)
-    evaluate_seeds(extractions)
+    used_pattern = evaluate_pattern(extractions)
+    evaluate_seeds(extractions, used_pattern)
     extractions = select_best_extractions(extractions)
 
     return extractions
@@ -20,53 +20,28 @@ def remove_modifier(extraction: ExtractedEntity) -> None:
                 None"""
 
     # set variables
-    lemma_list = extraction.lemma_array     # list with all lemmas
-    to_delete = list()  # return list
-    skip = 0
-    required = -1
-    modifier = get_modifier()   # dict with modifier loaded from resource file
+    lemma_list = list(extraction.lemma_array or list())     # list with all lemmas (single words have none)
+    normalized = [normalize_entities(lemma) for lemma in lemma_list]
+    to_delete = set()   # positions of the modifier lemmas
+    modifier = get_modifier()   # EntityLexicon with modifier loaded from resource file
 
     # iterate over each lemma
-    for t in range(len(lemma_list)):
-        if t + skip >= len(lemma_list):
-            break
-        # normalize lemma
-        lemma = normalize_entities(lemma_list[t + skip])
-        # find all occurrences of lemma in modifier list
-        matched_modifier = [value for key, value in modifier.items() if hash(lemma) == key]
-        if matched_modifier:
-            required = -1
-            match = False
-            # iterate over each occurrence
-            for m in matched_modifier:
-                # compare length of list with all lemmas
-                if len(m.lemma_array) > len(lemma_list):
-                    continue
-                for i in range(len(m.lemma_array)):
-                    mod_lemma = m.lemma_array[i]
-                    try:
-                        # compare modifier lemma and extraction lemma
-                        match = hash(mod_lemma) == hash(normalize_entities(lemma_list[t + skip + i]))
-                    except IndexError:
-                        match = False
-                    if not match:
-                        break
-                if match:
-                    if len(m.lemma_array) > required:
-                        required = len(m.lemma_array) - 1
-            # if modifier is multi token
-            if required > -1:
-                to_delete.append(lemma)
-                for j in range(required):
-                    to_delete.append(lemma_list[t + skip + j])
-                skip += required
-    lemma_list.remove(to_delete)
-    extraction.set_lemma_array(lemma_list)
-
-    # set default
-    to_delete = list()
-    skip = 0
-    required = -1
+    t = 0
+    while t < len(normalized):
+        required = 0
+        # find all occurrences of lemma in modifier list and use the longest matching modifier
+        for m in modifier.get(normalized[t]):
+            mod_lemmata = m.lemma_array if m.lemma_array else [m.start_lemma]
+            # compare modifier lemmas and extraction lemmas
+            if normalized[t:t + len(mod_lemmata)] == list(mod_lemmata):
+                required = max(required, len(mod_lemmata))
+        if required:
+            to_delete.update(range(t, t + required))
+            t += required
+        else:
+            t += 1
+    if to_delete:
+        extraction.set_lemma_array([lemma for i, lemma in enumerate(lemma_list) if i not in to_delete])
 
 
 def is_all_upper(string: str) -> bool:
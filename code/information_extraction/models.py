@@ -34,6 +34,10 @@ class Token:
     def set_no_token(self, no_token):
         self.no_token = no_token
 
+    # Getter
+    def get_token(self) -> str:
+        return self.token
+
     # string representation of a Token object
     def string_representation(self) -> str:
         return self.token
@@ -0,0 +1,80 @@
+""" Script contains the functions for the multi-process extraction (--workers N).
+    * The main process splits the ExtractionUnits into id ranges (orm.get_id_ranges). ExtractionUnits of the same
+      ClassifyUnit are always in the same range. The main process is the only writer.
+    * Each worker process extracts the entities of whole id ranges: it loads the ExtractionUnits of a range with its
+      own connection and returns the rows of the ExtractedEntities as plain tuples to the main process.
+    * With the start method fork (Linux) the loaded resources (pattern, known entities, failures, modifier) are shared
+      copy-on-write with the main process, else they are loaded again by each worker. """
+
+# ## Imports
+import multiprocessing.pool
+import configuration
+import database
+from information_extraction import prepare_resources
+from information_extraction.extraction import extract_entities
+from orm_handling import orm
+from orm_handling.bulk_writer import BulkWriter
+from orm_handling.pipeline import get_process_pool
+
+# ## Set Variables
+worker_ie_mode = None   # ie_mode of the worker process (set by init_worker)
+
+
+# ## Functions
+def get_pool(ie_mode: str, workers: int) -> multiprocessing.pool.Pool:
+    """ Function starts the worker processes.
+
+    Parameters
+    ----------
+    ie_mode: str
+        selected ie_mode (COMPETENCES, TOOLS or COMPETENCES AND TOOLS)
+    workers: int
+        Number of worker processes
+
+    Returns
+    -------
+    pool: Pool
+        process pool with initialized workers """
+    return get_process_pool(workers, init_worker, (ie_mode, configuration.config_obj))
+
+
+def init_worker(ie_mode: str, config_obj: object, copied: bool) -> None:
+    """ Initializer of each worker process: set ie_mode and the configurations, load the resources (only if the memory
+    of the main process is not shared) and create an own connection to the input data. """
+
+    # Set global
+    global worker_ie_mode
+
+    worker_ie_mode = ie_mode
+    configuration.config_obj = config_obj
+    if copied:
+        prepare_resources.set_ie_resources()
+    database.set_input_conn()
+
+
+def extract_range(id_range: tuple) -> tuple:
+    """ Function extracts the entities of all ExtractionUnits of an id range in a worker process.
+
+    Parameters
+    ----------
+    id_range: tuple
+        (id of the last ExtractionUnit before the range, id of the last ExtractionUnit in the range, number of
+        ExtractionUnits)
+
+    Returns
+    -------
+    result: tuple
+        (id of the last ExtractionUnit in the range, number of processed ExtractionUnits, rows of the
+        ExtractedEntities as plain tuples) """
+
+    start_id, until_id, nr_eus = id_range
+    writer = BulkWriter()
+    extraction_units = orm.load_batch('e', database.session, start_id, until_id)
+    with database.session.no_autoflush:
+        for eu in extraction_units:
+            extract_entities(eu, worker_ie_mode)
+            writer.collect(eu, 'e')
+    # nothing is written by the workers
+    database.session.expunge_all()
+    database.session.rollback()
+    return until_id, len(extraction_units), writer.to_tuples()
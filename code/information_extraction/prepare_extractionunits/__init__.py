@@ -7,10 +7,10 @@ from orm_handling.models import ExtractionUnits, ClassifyUnits
 from information_extraction.models import TextToken
 
 
-def generate_extraction_units(classify_unit: ClassifyUnits, ie_mode: str) -> None:
+def generate_extraction_units(classify_unit: ClassifyUnits, ie_mode: str, sentences: list = None) -> None:
     """Main-Function for ExtractionUnit generation.
             * Step 1: Split ClassifyUnit into sentences.
-            * Step 2: Set lexical data (pos-tag, lemma) for each token of sentence.
+            * Step 2: Normalize sentence and set lexical data (pos-tag, lemma) for each token of sentence (one pass).
             * Step 3: Store token with lexical data as TextToken object and adds to token array.
             * Step 4: Annotate token as known, fail or modifier.
             * Step 5: Store element as ExtractionUnit object.
@@ -21,25 +21,25 @@ def generate_extraction_units(classify_unit: ClassifyUnits, ie_mode: str) -> Non
                     Receives an object from class ClassifyUnits.
                 ie_mode: str
                     Receives an string with selected ie_mode.
+                sentences: list
+                    Receives the annotated sentences of the paragraph (convert_extractionunits.annotate_paragraphs).
+                    If None, the paragraph is annotated here.
 
             Returns:
             -------
                 None"""
 
     position_index = 0
+    # sentences of the existing children (for the duplicate check)
+    known_sentences = {child.sentence for child in classify_unit.children}
 
-    # split each ClassifyUnit into sentences
-    sentences = convert_extractionunits.split_into_sentences(classify_unit.paragraph)
+    # split each ClassifyUnit into normalized sentences with lexical data
+    if sentences is None:
+        sentences = convert_extractionunits.annotate_paragraphs([classify_unit.paragraph])[0]
 
     # iterate over each sentence
-    for sentence in sentences:
+    for sentence, token, postags, lemmata in sentences:
         token_array = list()
-        # normalize sentence
-        sentence = convert_extractionunits.normalize_sentence(sentence)
-        # set lexical data
-        token = convert_extractionunits.get_token(sentence)
-        postags = convert_extractionunits.get_pos_tags(sentence)
-        lemmata = convert_extractionunits.get_lemmata(sentence)
 
         # collect all lexical data for one token and stores them in an TextToken-object
         for i, item in enumerate(token):
@@ -57,10 +57,11 @@ def generate_extraction_units(classify_unit: ClassifyUnits, ie_mode: str) -> Non
         token_array = convert_extractionunits.annotate_token(token_array, ie_mode)
 
         # Check if eu contains more than one string and if child does not exists
-        if len(sentence) > 1 and not (any(sentence == v.sentence for v in classify_unit.children)):
+        if len(sentence) > 1 and sentence not in known_sentences:
             eu = ExtractionUnits(paragraph=classify_unit.paragraph, sentence=sentence, token_array=token_array,
                                  position_index=position_index, token=token, pos_tags=postags, lemmata=lemmata)
             classify_unit.children.append(eu)
+            known_sentences.add(sentence)
             position_index += 1
             token_array = list()
 
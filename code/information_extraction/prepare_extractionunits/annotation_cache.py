@@ -0,0 +1,155 @@
+""" Script contains the AnnotationCache. Job ads repeat a lot (boilerplate paragraphs and sentences), therefore the
+    results of the spaCy annotation are stored in an own SQLite file and reused in later batches and runs.
+        * key: md5 hash of the text (paragraph or normalized sentence), the kind of the entry and the signature of the
+          pipeline (model name + version, spaCy version, components, CACHE_VERSION)
+        * value: the annotation as json (sentences with tokens, POS-tags and lemmata)
+    The number of entries is bounded (max_entries): the least recently used (lru) or least frequently used (lfu)
+    entries are evicted. New entries of a flush are evicted last (with lfu they have no hits yet). Lookups are read from the file, new entries and usage counters are written with flush(). """
+
+# ## Imports
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+# ## Set Variables
+CACHE_VERSION = 1   # increase, if the annotation code changes (old entries are not used anymore)
+
+
+# Class AnnotationCache stores the annotations of paragraphs and sentences in a SQLite file
+class AnnotationCache:
+
+    # init-function to set values, works as constructor
+    def __init__(self, path: str, max_entries: int, eviction: str, signature: str):
+        """ Opens (or creates) the cache file.
+
+        Parameters
+        ----------
+        path: str
+            Path of the SQLite file of the cache.
+        max_entries: int
+            Maximum number of stored entries.
+        eviction: str
+            'lru' (least recently used) or 'lfu' (least frequently used) entries are removed first.
+        signature: str
+            Signature of the spaCy pipeline, part of each key (entries of other models are not found). """
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS annotations (key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                                'hits INTEGER NOT NULL DEFAULT 0, last_used INTEGER NOT NULL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS ix_annotations_last_used ON annotations (last_used)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS ix_annotations_hits ON annotations (hits, last_used)')
+        self.connection.commit()
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.signature = f'{signature}|{CACHE_VERSION}'
+        # logical clock for lru: increased with each flush
+        self.tick = self.connection.execute('SELECT COALESCE(MAX(last_used), 0) FROM annotations').fetchone()[0] + 1
+        self.pending = dict()   # key -> value (json) of new entries
+        self.used = dict()      # key -> number of hits since the last flush
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def get(self, kind: str, text: str):
+        """ Function returns the cached annotation of a text or None.
+
+        Parameters
+        ----------
+        kind: str
+            kind of the entry, e.g. 'sentence'
+        text: str
+            annotated text
+
+        Returns
+        -------
+        value: list or None
+            annotation as stored with put() (tuples are returned as lists) """
+
+        return self.get_many(kind, [text]).get(text)
+
+    def get_many(self, kind: str, texts: list) -> dict:
+        """ Function returns the cached annotations of several texts (one query per 500 texts).
+
+        Parameters
+        ----------
+        kind: str
+            kind of the entries, e.g. 'paragraph'
+        texts: list
+            annotated texts
+
+        Returns
+        -------
+        found: dict
+            text -> annotation of all texts found in the cache """
+
+        keys = {self.__key(kind, text): text for text in texts}
+        found = dict()
+        key_list = list(keys)
+        for i in range(0, len(key_list), 500):
+            chunk = key_list[i:i + 500]
+            rows = self.connection.execute(f'SELECT key, value FROM annotations WHERE key IN '
+                                           f'({", ".join("?" * len(chunk))})', chunk).fetchall()
+            for key, value in rows:
+                found[keys[key]] = json.loads(value)
+                self.used[key] = self.used.get(key, 0) + 1
+        # entries of this run which are not flushed yet
+        for key, text in keys.items():
+            if text not in found and key in self.pending:
+                found[text] = json.loads(self.pending[key])
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(keys) - len(found)
+        return found
+
+    def put(self, kind: str, text: str, value) -> None:
+        """ Function stores the annotation of a text (written with the next flush).
+
+        Parameters
+        ----------
+        kind: str
+            kind of the entry, e.g. 'sentence'
+        text: str
+            annotated text
+        value: list
+            annotation (json serializable) """
+
+        self.pending[self.__key(kind, text)] = json.dumps(value, ensure_ascii=False)
+        self.stats['stores'] += 1
+
+    def flush(self) -> None:
+        """ Function writes the new entries and the usage counters and removes entries above max_entries. """
+
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO annotations (key, value, hits, last_used) '
+                                        'VALUES (?, ?, 0, ?)',
+                                        [(key, value, self.tick) for key, value in self.pending.items()])
+            self.connection.executemany('UPDATE annotations SET hits = hits + ?, last_used = ? WHERE key = ?',
+                                        [(hits, self.tick, key) for key, hits in self.used.items()])
+            size = self.connection.execute('SELECT COUNT(*) FROM annotations').fetchone()[0]
+            if size > self.max_entries:
+                # lfu: entries inserted with this flush (no hits yet) are protected (else they are removed first)
+                order = 'last_used' if self.eviction == 'lru' else '(hits = 0 AND last_used = :tick), hits, last_used'
+                self.connection.execute(f'DELETE FROM annotations WHERE key IN (SELECT key FROM annotations '
+                                        f'ORDER BY {order} LIMIT :limit)',
+                                        {'tick': self.tick, 'limit': size - self.max_entries})
+                self.stats['evictions'] += size - self.max_entries
+        self.pending = dict()
+        self.used = dict()
+        self.tick += 1
+
+    def close(self) -> dict:
+        """ Function writes the pending entries and closes the cache file.
+
+        Returns
+        -------
+        stats: dict
+            counters of the cache (hits, misses, stores, evictions and hit_rate) """
+
+        self.flush()
+        self.connection.close()
+        lookups = self.stats['hits'] + self.stats['misses']
+        self.stats['hit_rate'] = self.stats['hits'] / lookups if lookups else 0.0
+        return self.stats
+
+    # Private function: stable key of a text (independent of the python hash seed)
+    def __key(self, kind: str, text: str) -> str:
+        return hashlib.md5(f'{self.signature}|{kind}|{text}'.encode('utf-8')).hexdigest()
@@ -1,23 +1,178 @@
 """Script contains several functions used to preprocess the passed texts, objects, strings etc."""
 
 # ## Imports
-import spacy
 import re
+import json
+import copy
+from timeit import default_timer as timer
+import configuration
+import logger
 from information_extraction.models import TextToken
-from information_extraction.prepare_resources import get_entities, get_no_entities, get_modifier
+from .annotation_cache import AnnotationCache
+from information_extraction.prepare_resources import get_entities, get_no_entities, get_modifier, EntityLexicon
 from information_extraction.prepare_resources.convert_entities import normalize_entities
 
-# load nlp-model for sentence detection, pos tagger and lemmatizer
-nlp = spacy.load("de_core_news_sm")
+# nlp-model for sentence detection, pos tagger and lemmatizer (loaded on first use, see get_nlp)
+nlp = None
+# persistent cache of the annotations (opened on first use, see get_annotation_cache)
+annotation_cache = None
 
 # set variables
-known_entities = dict()
-no_entities = dict()
-modifier = dict()
+known_entities = EntityLexicon()
+no_entities = EntityLexicon()
+modifier = EntityLexicon()
+annotation_stats = {'reused': 0, 'parsed': 0, 'cached': 0,    # sentences from the paragraph Doc / parsed / cache
+                    'cached_paragraphs': 0}                   # paragraphs from the cache (their sentences: cached)
 
 
 # ## Functions
-def split_into_sentences(content: str) -> list:
+def get_nlp():
+    """Function returns the spaCy model and loads it on first use, so runs without Information Extraction do not
+        load spaCy at all. The pipeline is set in ie_config/spacy of config.yaml:
+            * model: name of the spaCy model (default: de_core_news_sm)
+            * disable: components that are not loaded (default: ner, not used for the extraction)
+            * senter: the parser is not loaded, sentences are detected by the senter of the model (or the rule-based
+              sentencizer, if the model has none). Faster, but the sentence boundaries can differ.
+        The load time and the used components are logged.
+
+        Returns:
+        --------
+        Language
+            loaded spaCy model"""
+
+    # set global
+    global nlp
+
+    if nlp is None:
+        import spacy    # imported on first use (the import alone takes several seconds)
+
+        spacy_config = __get_spacy_config()
+        start = timer()
+        exclude = list(spacy_config['disable'])
+        if spacy_config['senter']:
+            exclude.append('parser')
+        nlp = spacy.load(spacy_config['model'], exclude=exclude)
+        if spacy_config['senter']:
+            if 'senter' in nlp.disabled:
+                nlp.enable_pipe('senter')
+            elif 'senter' not in nlp.pipe_names and 'sentencizer' not in nlp.pipe_names:
+                nlp.add_pipe('sentencizer', first=True)
+        if logger.log_ie is not None:
+            logger.log_ie.info(f'spaCy model {spacy_config["model"]} ({nlp.meta.get("version")}) loaded in '
+                               f'{timer() - start:.2f}s. Pipeline: {", ".join(nlp.pipe_names)}.')
+
+    return nlp
+
+
+# Private function to get the spaCy settings (default values, if no configuration is set, e.g. in tests)
+def __get_spacy_config() -> dict:
+    if configuration.config_obj is None:
+        return copy.deepcopy(configuration.Configurations.spacy_defaults)
+    return configuration.config_obj.get_spacy_config()
+
+
+def get_annotation_cache():
+    """Function returns the annotation cache (ie_config/annotation_cache in config.yaml) and opens it on first use.
+        The signature of the loaded spaCy pipeline is part of each key, so entries of other models or components are
+        not used.
+
+        Returns:
+        --------
+        AnnotationCache
+            opened cache or None, if the cache is not enabled"""
+
+    # set global
+    global annotation_cache
+
+    if annotation_cache is None and configuration.config_obj is not None:
+        cache_config = configuration.config_obj.get_annotation_cache_config()
+        if cache_config['enabled']:
+            import spacy
+            meta = get_nlp().meta
+            signature = json.dumps([meta.get('lang'), meta.get('name'), meta.get('version'), spacy.__version__,
+                                    get_nlp().pipe_names])
+            annotation_cache = AnnotationCache(cache_config['path'], cache_config['max_entries'],
+                                               cache_config['eviction'], signature)
+    return annotation_cache
+
+
+def close_annotation_cache():
+    """Function writes the pending entries of the annotation cache and closes it.
+
+        Returns:
+        --------
+        dict
+            counters of the cache (hits, misses, stores, evictions, hit_rate) or None, if the cache is not used"""
+
+    # set global
+    global annotation_cache
+
+    if annotation_cache is None:
+        return None
+    stats = annotation_cache.close()
+    annotation_cache = None
+    return stats
+
+
+def annotate_paragraphs(contents: list) -> list:
+    """Get ExtractionUnits:
+        +++ Step 1-3 (batch): Split the paragraphs of a batch into sentences and get their tokens, POS-tags and
+        lemmata. +++
+        Paragraphs found in the annotation cache (or already annotated in this batch) are not parsed again, the
+        others are parsed together with parse_paragraphs and stored in the cache.
+
+        Parameters:
+        -----------
+        contents: list
+            Receives the contents of the ClassifyUnit-Objects
+
+        Returns:
+        --------
+        list
+            for each content a list of tuples (normalized sentence, list of token, list of POS-tags, list of lemma)"""
+
+    cache = get_annotation_cache()
+    # reuse_doc false: each sentence is parsed on its own (without the context of the paragraph)
+    reuse_doc = __get_spacy_config()['reuse_doc']
+    kind = 'paragraph' if reuse_doc else 'paragraph_sentences'
+
+    annotations = cache.get_many(kind, contents) if cache is not None else dict()
+    annotation_stats['cached_paragraphs'] += len(annotations)
+    annotation_stats['cached'] += sum(len(sentences) for sentences in annotations.values())
+    missing = [content for content in dict.fromkeys(contents) if content not in annotations]
+    for content, doc in zip(missing, parse_paragraphs(missing)):
+        annotations[content] = [annotate_sentence(sentence, span if reuse_doc else None)
+                                for sentence, span in get_sentence_spans(content, doc)]
+        if cache is not None:
+            cache.put(kind, content, annotations[content])
+    if cache is not None:
+        cache.flush()
+
+    # cached values are lists (json)
+    return [[tuple(sentence) for sentence in annotations[content]] for content in contents]
+
+
+def parse_paragraphs(contents: list) -> list:
+    """Get ExtractionUnits:
+        +++ Step 1 (batch): Apply the spaCy pipeline to the paragraphs of all ClassifyUnits of a batch at once. +++
+        nlp.pipe processes the texts in batches of batch_size (and in n_process processes), which is much faster
+        than one nlp() call per ClassifyUnit. Both values are set in ie_config/spacy of config.yaml.
+
+        Parameters:
+        -----------
+        contents: list
+            Receives the contents of the ClassifyUnit-Objects
+
+        Returns:
+        --------
+        list
+            list of spaCy Docs in the order of the contents"""
+
+    spacy_config = __get_spacy_config()
+    return list(get_nlp().pipe(contents, batch_size=spacy_config['batch_size'], n_process=spacy_config['n_process']))
+
+
+def split_into_sentences(content: str, doc=None) -> list:
     """Get ExtractionUnits:
         +++ Step 1: Split Paragraph into Sentences. Take use of SentenceRecognizer from Spacy.+++
 
@@ -25,34 +180,63 @@ def split_into_sentences(content: str) -> list:
         -----------
         content: str
             Receives the content of an ClassifyUnit-Object
+        doc: Doc
+            Receives the already parsed content (parse_paragraphs). If None, the content is parsed here.
 
         Returns:
         --------
         list
             list of sentences from the ClassifyUnit-Content"""
 
+    # returns list with sentences from ClassifyUnit
+    return [sentence for sentence, span in get_sentence_spans(content, doc)]
+
+
+def get_sentence_spans(content: str, doc=None) -> list:
+    """Get ExtractionUnits:
+        +++ Step 1: Split Paragraph into Sentences (see split_into_sentences) and keep the parsed tokens. +++
+
+        Parameters:
+        -----------
+        content: str
+            Receives the content of an ClassifyUnit-Object
+        doc: Doc
+            Receives the already parsed content (parse_paragraphs). If None, the content is parsed here.
+
+        Returns:
+        --------
+        list
+            list of tuples (sentence, Span of the sentence in the Doc). The Span is None, if the sentence does not
+            start and end at token boundaries of the Doc."""
+
     extractionunits = list()
 
     # Construction from class and apply the SentenceRecognizer
-    list_extractionunits = nlp(content)
+    list_extractionunits = doc if doc is not None else get_nlp()(content)
 
     for eu in list_extractionunits.sents:
         # Paragraphs with list items will be separated as single sentences
-        splitted = __split_list_items(str(eu))
-        extractionunits.extend(splitted)
+        splitted = __split_list_items(str(eu), eu.start_char)
+        for sentence, start_char in splitted:
+            span = list_extractionunits.char_span(start_char, start_char + len(sentence))
+            extractionunits.append((sentence, span))
 
     # returns list with sentences from ClassifyUnit
     return extractionunits
 
 
-# Private function to split list items into single sentences
-def __split_list_items(sentence: str) -> list:
+# Private function to split list items into single sentences, returns tuples (sentence, char offset in the paragraph)
+def __split_list_items(sentence: str, start_char: int = 0) -> list:
     extractionunits = list()
     # split sentence at empty lines
     splitted_eu = __split_at_empty_line(sentence)
     # regex for match any existing list item in the sentence
     list_item_regex = re.compile(r"^[0-9][\.| ]?|^[\+|\-|\*]")
+    line_start = start_char
     for string in splitted_eu:
+        # char offset of the stripped string
+        begin = line_start + len(string) - len(string.lstrip())
+        line_start += len(string) + 1   # next line starts after the line break
         # remove whitespaces, tabstops etc.
         string = string.strip()
         # compare regex with given sentence
@@ -60,9 +244,10 @@ def __split_list_items(sentence: str) -> list:
         if m:
             # if regex matches, the list item is removed from the sentence
             string = string[m.end():]
+            begin += m.end() + len(string) - len(string.lstrip())
             string = string.strip()
         if len(string) > 0 & __contains_only_word_characters(string):
-            extractionunits.append(string)
+            extractionunits.append((string, begin))
 
     # returns the sentence without any list items
     return extractionunits
@@ -144,6 +329,47 @@ def normalize_sentence(sentence: str) -> str:
     return sentence
 
 
+def annotate_sentence(sentence: str, span=None) -> tuple:
+    """Get ExtractionUnits:
+                +++ Step 2 and 3: Normalize the sentence and get tokens, POS-tags and lemmata in one pass. +++
+                If normalize_sentence does not change the sentence, the tokens of its Span in the paragraph Doc are
+                used (no further nlp() call). Otherwise (or without Span) the normalized sentence is parsed once,
+                unless it is found in the annotation cache.
+
+                Parameters:
+                -----------
+                sentence: str
+                    Receives sentence as potential ExtractionUnit.
+                span: Span
+                    Receives the Span of the sentence in the paragraph Doc (get_sentence_spans), optional.
+
+                Returns:
+                --------
+                tuple
+                    (normalized sentence, list of token, list of POS-tags, list of lemma)"""
+
+    normalized = normalize_sentence(sentence)
+    if span is None or normalized != sentence:
+        cache = get_annotation_cache()
+        annotation = cache.get('sentence', normalized) if cache is not None else None
+        if annotation is not None:
+            annotation_stats['cached'] += 1
+            return (normalized, *annotation)
+        span = get_nlp()(normalized)
+        annotation_stats['parsed'] += 1
+    else:
+        cache = None
+        annotation_stats['reused'] += 1
+
+    tokens = [token.text for token in span]
+    pos_tags = [token.pos_ for token in span]
+    lemmata = [token.lemma_ for token in span]
+    if cache is not None:
+        cache.put('sentence', normalized, [tokens, pos_tags, lemmata])
+
+    return normalized, tokens, pos_tags, lemmata
+
+
 def get_token(sentence: str) -> list:
     """Get ExtractionUnits:
                 +++ Step 3: Get lexical data from tokens. +++
@@ -159,7 +385,7 @@ def get_token(sentence: str) -> list:
                     list of token"""
     tokens = list()
 
-    pre_token = nlp(sentence)
+    pre_token = get_nlp()(sentence)
     for token in pre_token:
         tokens.append(token.text)
 
@@ -181,7 +407,7 @@ def get_pos_tags(sentence: str) -> list:
                     list of POS-tags for each token"""
     pos_tags = list()
 
-    pre_pos_tags = nlp(sentence)
+    pre_pos_tags = get_nlp()(sentence)
     for token in pre_pos_tags:
         pos_tags.append(token.pos_)
 
@@ -203,7 +429,7 @@ def get_lemmata(sentence: str) -> list:
                     list of lemma for each token"""
     lemmata = list()
 
-    pre_lemmata = nlp(sentence)
+    pre_lemmata = get_nlp()(sentence)
     for token in pre_lemmata:
         lemmata.append(token.lemma_)
 
@@ -230,86 +456,55 @@ def annotate_token(token: list, ie_mode: str) -> 'list[TextToken]':
     no_entities = get_no_entities(ie_mode)
     modifier = get_modifier()
 
+    # each lemma is normalized once
+    lemmata = [normalize_entities(t.lemma) for t in token]
+
     # call different methods depending on the list
     if known_entities:
-        token = __annotate_entities(token)
+        token = __annotate_entities(token, lemmata)
     if no_entities:
-        token = __annotate_negatives(token)
+        token = __annotate_negatives(token, lemmata)
     # modifier only used by competence extraction
     if ie_mode != 'TOOLS' and modifier:
-        token = __annotate_modifier(token)
+        token = __annotate_modifier(token, lemmata)
 
     return token
 
 
 # Private funtion to annotate token as known entity
-def __annotate_entities(token: list) -> 'list[TextToken]':
+def __annotate_entities(token: list, lemmata: list) -> 'list[TextToken]':
 
+    # one pass over the lemmata: length of the longest known entity starting at each token
+    # (single word, e.g. 'wlan', or multi token, e.g. 'software deployment')
+    longest = known_entities.get_automaton().longest_matches(lemmata)
     for i in range(len(token)):
-        # each token will be normalized
-        lemma = normalize_entities(token[i].lemma)
-        # search all occurrences of the normalized token in list
-        matched_entities = [value for key, value in known_entities.items() if hash(lemma) == key]
-        for known_entity in matched_entities:
-            if known_entity.is_single_word:
-                # if known_entity is single word (e.g. 'wlan'), token the token also consists of only one
-                token[i].set_ie_token(True)
-                continue
-            matches = False
-            # otherwise it will be a multi token (e.g. 'software deployment')
-            for j in range(len(known_entity.lemma_array)):
-                # each following token is considered
-                if len(token) <= i + j:
-                    matches = False
-                    break
-                matches = hash(known_entity.lemma_array[j]) == (hash(normalize_entities(token[i + j].lemma)))
-                if not matches:
-                    break
-            if matches:
-                token[i].set_ie_token(True)
-                token[i].tokensToCompleteInformationEntity = len(known_entity.lemma_array) - 1
+        if longest[i]:
+            token[i].set_ie_token(True)
+            token[i].tokensToCompleteInformationEntity = longest[i] - 1
 
     return token
 
 
 # Private function to annotate token as known extraction fail
-def __annotate_negatives(token: list) -> 'list[TextToken]':
+def __annotate_negatives(token: list, lemmata: list) -> 'list[TextToken]':
 
     for i in range(len(token)):
-        # each token will be normalized
-        lemma = normalize_entities(token[i].lemma)
         # check if list contains normalized token
-        if hash(lemma) in no_entities.keys():
+        if lemmata[i] in no_entities:
             token[i].set_no_token(True)
 
     return token
 
 
 # Private function to annotate token as modifier
-def __annotate_modifier(token: list) -> 'list[TextToken]':
+def __annotate_modifier(token: list, lemmata: list) -> 'list[TextToken]':
 
+    # one pass over the lemmata: length of the longest modifier starting at each token
+    # (single word, e.g. 'erforderlich', or multi token, e.g. 'ideal aber kein bedingung')
+    longest = modifier.get_automaton().longest_matches(lemmata)
     for i in range(len(token)):
-        # each token will be normalized
-        lemma = normalize_entities(token[i].lemma)
-        # search all occurrences of the normalized token in dict
-        matched_modifier = [value for key, value in modifier.items() if hash(lemma) == key]
-        for mod in matched_modifier:
-            if mod.is_single_word:
-                # if modifier is single word (e.g. 'erforderlich'), token the token also consists of only one
-                token[i].set_modifier_token(True)
-                continue
-            matches = False
-            # otherwise it will be a multi token (e.g. 'ideal aber kein bedingung')
-            for j in range(len(mod.lemma_array)):
-                # each following token is considered
-                if len(token) <= i + j:
-                    matches = False
-                    break
-                matches = hash(mod.lemma_array[j]) == hash(normalize_entities(token[i + j].lemma))
-                if not matches:
-                    break
-            if matches:
-                token[i].set_modifier_token(True)
-                token[i].tokensToCompleteModifier = len(mod.lemma_array) - 1
+        if longest[i]:
+            token[i].set_modifier_token(True)
+            token[i].tokensToCompleteModifier = longest[i] - 1
 
     return token
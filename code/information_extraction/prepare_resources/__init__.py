@@ -1,17 +1,27 @@
 """Script to load list with known entities, extraction fails, modifiers and pattern from resource files."""
 
 # ## Imports
+import hashlib
+import os
+import configuration
 from information_extraction.models import Pattern
 from information_extraction.prepare_resources import connection_resources
+from information_extraction.prepare_resources.entity_lexicon import EntityLexicon
+from information_extraction.prepare_resources.pattern_matcher import PatternMatcher
 
 # ## Set variables
-competences = dict()
-no_competences = dict()
-modifier = dict()
+competences = EntityLexicon()
+no_competences = EntityLexicon()
+modifier = EntityLexicon()
 comp_pattern = list()
-tools = dict()
-no_tools = dict()
+tools = EntityLexicon()
+no_tools = EntityLexicon()
 tool_pattern = list()
+all_entities = EntityLexicon()      # competences and tools (ie_mode 'COMPETENCES AND TOOLS')
+all_no_entities = EntityLexicon()   # no_competences and no_tools
+comp_matcher = PatternMatcher(list())   # compiled pattern (ie_mode 'COMPETENCES', 'TOOLS' and both)
+tool_matcher = PatternMatcher(list())
+all_matcher = PatternMatcher(list())
 
 possible_comppounds = dict()
 splitted_compounds = dict()
@@ -27,7 +37,7 @@ def set_ie_resources() -> None:
 
     # set globals
     global competences, no_competences, modifier, comp_pattern, tools, no_tools, tool_pattern, possible_comppounds, \
-        splitted_compounds
+        splitted_compounds, all_entities, all_no_entities, comp_matcher, tool_matcher, all_matcher
 
     # fill variables with content
     # variables for competences
@@ -41,6 +51,17 @@ def set_ie_resources() -> None:
     no_tools = connection_resources.read_failures('no_tools')
     tool_pattern = connection_resources.read_pattern_from_file('tool_pattern')
 
+    # combined lexicons are built once (not with each lookup)
+    all_entities = EntityLexicon.merge(competences, tools)
+    all_no_entities = EntityLexicon.merge(no_competences, no_tools)
+    # automata for the annotation of multi word entities and modifiers are built once
+    for lexicon in (competences, tools, all_entities, modifier):
+        lexicon.get_automaton()
+    # pattern are compiled once
+    comp_matcher = PatternMatcher(comp_pattern)
+    tool_matcher = PatternMatcher(tool_pattern)
+    all_matcher = PatternMatcher(comp_pattern + tool_pattern)
+
     # variables for compounds
     possible_comppounds = connection_resources.read_compounds('pos')
     splitted_compounds = connection_resources.read_compounds('split')
@@ -59,27 +80,34 @@ def get_ie_pattern(ie_mode: str) -> 'list[Pattern]':
         return all_pattern
 
 
-def get_entities(ie_mode: str) -> dict:
+def get_pattern_matcher(ie_mode: str) -> PatternMatcher:
+    if ie_mode == 'TOOLS':
+        return tool_matcher
+    elif ie_mode == 'COMPETENCES':
+        return comp_matcher
+    elif ie_mode == 'COMPETENCES AND TOOLS':
+        return all_matcher
+
+
+def get_entities(ie_mode: str) -> EntityLexicon:
     if ie_mode == 'TOOLS':
         return tools
     elif ie_mode == 'COMPETENCES':
         return competences
     elif ie_mode == 'COMPETENCES AND TOOLS':
-        all_entities = dict(list(competences.items()) + list(tools.items()))
         return all_entities
 
 
-def get_no_entities(ie_mode: str) -> dict:
+def get_no_entities(ie_mode: str) -> EntityLexicon:
     if ie_mode == 'TOOLS':
         return no_tools
     elif ie_mode == 'COMPETENCES':
         return no_competences
     elif ie_mode == 'COMPETENCES AND TOOLS':
-        all_entities = dict(list(no_competences.items()) + list(no_tools.items()))
-        return all_entities
+        return all_no_entities
 
 
-def get_modifier() -> dict:
+def get_modifier() -> EntityLexicon:
     return modifier
 
 
@@ -91,3 +119,21 @@ def get_compounds(comp_type: str) -> dict:
     elif comp_type == 'all':
         all_compounds = dict(list(possible_comppounds.items()) + list(splitted_compounds.items()))
         return all_compounds
+
+
+def get_fingerprint() -> str:
+    """Function to identify the loaded resources (stored with the checkpoints of the information extraction).
+    Uses the path, size and modification date of each resource file.
+
+            Returns:
+            -------
+                str with md5 hash of the resource files"""
+
+    paths = [configuration.config_obj.get_competences_path(), configuration.config_obj.get_no_competences_path(),
+             configuration.config_obj.get_modifier_path(), configuration.config_obj.get_comppattern_path(),
+             configuration.config_obj.get_tool_path(), configuration.config_obj.get_no_tools_path(),
+             configuration.config_obj.get_toolpattern_path(), configuration.config_obj.get_pos_comps_path(),
+             configuration.config_obj.get_split_comps_path()]
+    stats = [f'{path}|{os.path.getsize(path)}|{os.path.getmtime(path)}' if os.path.exists(path) else path
+             for path in paths]
+    return hashlib.md5('\n'.join(stats).encode()).hexdigest()
@@ -6,13 +6,14 @@ import configuration
 import logger
 from information_extraction.models import Pattern, PatternToken, MatchedEntity, Modifier
 from information_extraction.prepare_resources import convert_entities
+from information_extraction.prepare_resources.entity_lexicon import EntityLexicon
 
 
 # ## Functions
 
-def read_known_entities(extraction_type: str) -> dict:
+def read_known_entities(extraction_type: str) -> EntityLexicon:
     # set variables
-    entities = dict()
+    entities = EntityLexicon()
     switch = {
         "COMPETENCES": configuration.config_obj.get_competences_path(),
         "TOOLS": configuration.config_obj.get_tool_path(),
@@ -49,9 +50,9 @@ def read_known_entities(extraction_type: str) -> dict:
                                    ie_type=extraction_type, label=set())
                 if not ie.is_single_word:
                     ie.set_lemma_array(entity)
-                    entity = ' '.join(entity).strip()
-                    ie.set_full_expression(entity)
-                entities[hash(entity[0])] = ie
+                    ie.set_full_expression(' '.join(entity).strip())
+                # indexed by the first lemma (entities with the same first lemma are all kept)
+                entities.add(entity, ie)
                 continue
             else:
                 continue
@@ -66,9 +67,9 @@ def read_known_entities(extraction_type: str) -> dict:
     return entities
 
 
-def read_modifier() -> dict:
+def read_modifier() -> EntityLexicon:
     # set variables
-    entities = dict()
+    entities = EntityLexicon()
     path = configuration.config_obj.get_modifier_path()
 
     logger.log_ie.info(f'Read entities from file: ' + path)
@@ -97,7 +98,7 @@ def read_modifier() -> dict:
                 modifier = Modifier(start_lemma=entity[0], is_single_word=len(entity) == 1)
                 if not modifier.is_single_word:
                     modifier.set_lemma_array(entity)
-                entities[hash(entity[0])] = modifier
+                entities.add(entity, modifier)
                 continue
             else:
                 continue
@@ -112,7 +113,7 @@ def read_modifier() -> dict:
     return entities
 
 
-def read_failures(extraction_type: str) -> dict:
+def read_failures(extraction_type: str) -> EntityLexicon:
     """Creates a connection to the requested file and reads its contents.
 
             Parameters:
@@ -122,11 +123,11 @@ def read_failures(extraction_type: str) -> dict:
 
             Returns:
             -------
-                list
-                    list with content from file"""
+                EntityLexicon
+                    lexicon with content from file"""
 
     # set variables
-    entities = dict()
+    entities = EntityLexicon()
     switch = {
         "no_competences": configuration.config_obj.get_no_competences_path(),
         "no_tools": configuration.config_obj.get_no_tools_path(),
@@ -159,7 +160,7 @@ def read_failures(extraction_type: str) -> dict:
             # if return is empty, go to next line
             if entity[0]:
                 # add line to list without spaces
-                entities[hash(entity[0])] = entity
+                entities.add(entity, entity)
                 continue
             else:
                 continue
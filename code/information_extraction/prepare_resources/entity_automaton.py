@@ -0,0 +1,83 @@
+"""Script contains the EntityAutomaton: Aho-Corasick automaton over the lemma sequences of a lexicon (e.g. known
+entities or modifiers), used to find all entries of a token array in one left-to-right pass."""
+
+
+class EntityAutomaton:
+    """Aho-Corasick automaton on lemma level. Each state is a node of the trie of the lemma sequences, the fail link
+    points to the longest proper suffix which is also a node of the trie, the output link to the next suffix which
+    is a complete lemma sequence. A token array is scanned once, the cost is linear in its length (plus the number of
+    matches) and independent of the size of the lexicon."""
+
+    # init-function to set values, works as constructor
+    def __init__(self, expressions):
+        """Builds the trie and the fail and output links.
+
+                Parameters:
+                ----------
+                    expressions: iterable
+                        Receives the normalized lemma sequences (tuples or lists of str) of the lexicon."""
+
+        self.goto = [dict()]    # state -> {lemma: next state}
+        self.depth = [0]        # state -> number of lemmata of a complete sequence ending in the state (0 = none)
+        self.fail = [0]         # state -> longest proper suffix state
+        self.output = [0]       # state -> next suffix state with depth > 0 (0 = none)
+
+        # trie of the lemma sequences
+        for expression in expressions:
+            state = 0
+            for lemma in expression:
+                next_state = self.goto[state].get(lemma)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][lemma] = next_state
+                    self.goto.append(dict())
+                    self.depth.append(0)
+                    self.fail.append(0)
+                    self.output.append(0)
+                state = next_state
+            if expression:
+                self.depth[state] = len(expression)
+
+        # fail and output links (breadth-first, the links of shorter suffixes are known before)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for lemma, next_state in self.goto[state].items():
+                fail = self.fail[state]
+                while fail and lemma not in self.goto[fail]:
+                    fail = self.fail[fail]
+                fail = self.goto[fail].get(lemma, 0)
+                self.fail[next_state] = fail
+                self.output[next_state] = fail if self.depth[fail] else self.output[fail]
+                queue.append(next_state)
+
+    def __len__(self) -> int:
+        return len(self.goto)
+
+    def longest_matches(self, lemmata: list) -> list:
+        """Function finds the entries of the lexicon in a sequence of lemmata.
+
+                Parameters:
+                ----------
+                    lemmata: list
+                        Receives the normalized lemmata of the tokens.
+
+                Returns:
+                -------
+                    list with the number of lemmata of the longest entry starting at each position (0 = no entry)"""
+
+        longest = [0] * len(lemmata)
+        goto = self.goto
+        state = 0
+        for end, lemma in enumerate(lemmata):
+            while state and lemma not in goto[state]:
+                state = self.fail[state]
+            state = goto[state].get(lemma, 0)
+            # all entries ending with the current lemma
+            match = state if self.depth[state] else self.output[state]
+            while match:
+                length = self.depth[match]
+                start = end - length + 1
+                if length > longest[start]:
+                    longest[start] = length
+                match = self.output[match]
+        return longest
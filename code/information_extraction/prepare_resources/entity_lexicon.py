@@ -0,0 +1,99 @@
+"""Script contains the EntityLexicon: known entities, extraction fails or modifiers indexed by their first lemma."""
+
+# ## Imports
+from information_extraction.prepare_resources.entity_automaton import EntityAutomaton
+
+# ## Set variables
+no_entries = tuple()    # returned for lemmata without entries
+
+
+class EntityLexicon:
+    """Lexicon of the entries of a resource file (e.g. MatchedEntity or Modifier objects), indexed by the normalized
+    first lemma. A lookup is a single dict access and returns all entries starting with the lemma, so multi word
+    entries with the same first lemma (e.g. 'software deployment' and 'software entwicklung') are all kept.
+    Entries with the same lemma sequence are stored once."""
+
+    # init-function to set values, works as constructor
+    def __init__(self):
+        self.index = dict()         # normalized first lemma -> list of entries
+        self.expressions = dict()   # lemma sequence -> stored entry (for the duplicate check and merge)
+        self.size = 0               # number of stored entries
+        self.automaton = None       # EntityAutomaton of the lemma sequences (built on first use, see get_automaton)
+
+    def add(self, lemmata: list, entry) -> bool:
+        """Function adds an entry to the lexicon.
+
+                Parameters:
+                ----------
+                    lemmata: list
+                        Receives the normalized lemmata of the entry (the first one is the key).
+                    entry: object
+                        Receives the entry, e.g. a MatchedEntity.
+
+                Returns:
+                -------
+                    bool, False if an entry with the same lemmata is already stored"""
+
+        expression = tuple(lemmata)
+        if expression in self.expressions:
+            return False
+        self.expressions[expression] = entry
+        self.index.setdefault(lemmata[0], list()).append(entry)
+        self.size += 1
+        self.automaton = None
+        return True
+
+    def get(self, lemma: str):
+        """Function returns all entries starting with the given (normalized) lemma.
+
+                Parameters:
+                ----------
+                    lemma: str
+                        Receives the normalized lemma of a token.
+
+                Returns:
+                -------
+                    list with entries (empty tuple if there is none)"""
+
+        return self.index.get(lemma, no_entries)
+
+    def get_automaton(self) -> EntityAutomaton:
+        """Function returns the EntityAutomaton of the stored lemma sequences (built once, rebuilt after add).
+
+                Returns:
+                -------
+                    EntityAutomaton to find all entries of a token array in one pass"""
+
+        if self.automaton is None:
+            self.automaton = EntityAutomaton(self.expressions)
+        return self.automaton
+
+    def __contains__(self, lemma) -> bool:
+        return lemma in self.index
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        for entries in self.index.values():
+            yield from entries
+
+    @staticmethod
+    def merge(*lexicons: 'EntityLexicon') -> 'EntityLexicon':
+        """Function combines several lexicons (e.g. competences and tools) into a new one. Entries with the same lemma
+        sequence are stored once (the entry of the first lexicon is kept).
+
+                Parameters:
+                ----------
+                    lexicons: EntityLexicon
+                        Receives the lexicons to combine.
+
+                Returns:
+                -------
+                    EntityLexicon with the entries of all lexicons"""
+
+        merged = EntityLexicon()
+        for lexicon in lexicons:
+            for expression, entry in lexicon.expressions.items():
+                merged.add(list(expression), entry)
+        return merged
@@ -0,0 +1,178 @@
+"""Script contains the PatternMatcher: the extraction patterns compiled once into constraints with precomputed sets,
+interned POS tags and flags, grouped by the constraint of their first token."""
+
+# ## Imports
+from information_extraction.models import Pattern, PatternToken
+
+# ## Set variables
+# kinds of constraints (same order as in TextToken.is_equals_pattern_token: only the first given attribute is compared)
+TOKEN, POS, NOT_POS, LEMMA, MODIFIER, IE, ANY = range(7)
+pos_ids = dict()    # interned POS tags: pos tag -> id
+
+
+def intern_pos(pos_tag: str) -> int:
+    """Function returns the id of a POS tag (new ids for unknown tags).
+
+            Parameters:
+            ----------
+                pos_tag: str
+                    Receives a POS tag.
+
+            Returns:
+            -------
+                int with the id of the POS tag"""
+
+    pos_id = pos_ids.get(pos_tag)
+    if pos_id is None:
+        pos_id = pos_ids[pos_tag] = len(pos_ids)
+    return pos_id
+
+
+class CompiledToken:
+    """Constraint of a PatternToken. The '|'-separated alternatives are split once into a set (POS tags as ids),
+    a leading '-' (negation) becomes the kind NOT_POS."""
+
+    # init-function to set values, works as constructor
+    def __init__(self, pattern_token: PatternToken):
+        self.ie_token = bool(pattern_token.ie_token)
+        self.modifier_token = bool(pattern_token.modifier_token)
+        self.values = frozenset()
+
+        if pattern_token.token is not None:
+            self.kind = TOKEN
+            self.values = frozenset(pattern_token.token.split('|'))
+        elif pattern_token.pos_tag is not None:
+            pattern_pos = pattern_token.pos_tag.split('|')
+            if pattern_pos[0].startswith('-'):
+                self.kind = NOT_POS
+                self.values = frozenset(intern_pos(pos[1:]) for pos in pattern_pos)
+            else:
+                # is_equals_pattern_token returns after the first alternative (match or not), so only it counts
+                self.kind = POS
+                self.values = frozenset([intern_pos(pattern_pos[0])])
+        elif pattern_token.lemma is not None:
+            if pattern_token.modifier_token:
+                self.kind = MODIFIER
+            else:
+                # a negated lemma ('-' + suffix) never matches a lemma in is_equals_pattern_token
+                self.kind = LEMMA
+                self.values = frozenset(lemma for lemma in pattern_token.lemma.split('|') if not lemma.startswith('-'))
+        elif pattern_token.ie_token:
+            self.kind = IE
+        else:
+            self.kind = ANY
+
+    def matches(self, token, pos_id: int) -> bool:
+        """Function compares the constraint with a TextToken (same result as TextToken.is_equals_pattern_token).
+
+                Parameters:
+                ----------
+                    token: TextToken
+                        Receives the token of the ExtractionUnit.
+                    pos_id: int
+                        Receives the id of the POS tag of the token.
+
+                Returns:
+                -------
+                    bool if the token fulfills the constraint"""
+
+        kind = self.kind
+        if kind == TOKEN:
+            return token.token in self.values
+        if kind == POS:
+            return pos_id in self.values
+        if kind == NOT_POS:
+            return pos_id not in self.values
+        if kind == LEMMA:
+            return token.lemma in self.values
+        if kind == MODIFIER:
+            return bool(token.modifier_token)
+        if kind == IE:
+            return bool(token.ie_token)
+        return True
+
+
+class PatternMatcher:
+    """Matcher for a list of extraction patterns. Each pattern is compiled once, the patterns are grouped by the
+    constraint of their first token (token, lemma or POS tag), so for each position of a sentence only the patterns
+    whose first token matches are tried."""
+
+    # init-function to set values, works as constructor
+    def __init__(self, pattern: 'list[Pattern]'):
+        self.pattern = pattern
+        self.compiled = [[CompiledToken(t) for t in p.pattern_token] for p in pattern]
+        self.by_token = dict()      # token -> indices of the pattern starting with this token
+        self.by_lemma = dict()      # lemma -> indices of the pattern starting with this lemma
+        self.by_pos = dict()        # pos id -> indices of the pattern starting with this POS tag
+        self.other = list()         # indices of the pattern with another first constraint (tried at each position)
+
+        for index, compiled in enumerate(self.compiled):
+            if not compiled:
+                continue
+            first = compiled[0]
+            if first.kind == TOKEN:
+                group = self.by_token
+            elif first.kind == LEMMA:
+                group = self.by_lemma
+            elif first.kind == POS:
+                group = self.by_pos
+            else:
+                self.other.append(index)
+                continue
+            for value in first.values:
+                group.setdefault(value, list()).append(index)
+
+    def match(self, tokens: list) -> list:
+        """Function finds the matches of all patterns in a sentence. The result is the same as comparing each
+        pattern at each position with TextToken.is_equals_pattern_token (as in ie_jobs.extract before), also in the
+        same order (by pattern, then by position). Pattern with a conf between 0.0 and 0.5 are skipped.
+
+                Parameters:
+                ----------
+                    tokens: list
+                        Receives the TextTokens of an ExtractionUnit.
+
+                Returns:
+                -------
+                    list with tuples (pattern, entity_pointer) of the matches"""
+
+        pos = [intern_pos(t.pos_tag) for t in tokens]
+        size = len(tokens)
+        found = list()
+        for i in range(size):
+            token = tokens[i]
+            candidates = self.by_token.get(token.token, ()), self.by_lemma.get(token.lemma, ()), \
+                self.by_pos.get(pos[i], ()), self.other
+            for group in candidates:
+                for index in group:
+                    p = self.pattern[index]
+                    # same positions and conf condition as before
+                    if i >= size - p.get_size() or not (p.conf == 0.0 or p.conf >= 0.5):
+                        continue
+                    entity_pointer = self.__match_at(index, tokens, pos, i)
+                    if entity_pointer is not None:
+                        found.append((index, i, entity_pointer))
+        found.sort()
+        return [(self.pattern[index], entity_pointer) for index, i, entity_pointer in found]
+
+    # Private function: compares a pattern with the tokens starting at position i, returns the entity pointer or None
+    def __match_at(self, index: int, tokens: list, pos: list, i: int):
+        pointer = self.pattern[index].extraction_pointer[0]
+        entity_pointer = 0
+        required_for_entity = 0
+        required_for_modifier = 0
+        for c, constraint in enumerate(self.compiled[index]):
+            v = i + required_for_modifier + required_for_entity
+            # tokens behind the end of the sentence are skipped (not compared)
+            if (v + c) >= len(tokens):
+                continue
+            token = tokens[v + c]
+            if not constraint.matches(token, pos[v + c]):
+                return None
+            if pointer == c:
+                entity_pointer = v + c
+            if constraint.ie_token:
+                required_for_entity = token.tokensToCompleteInformationEntity
+            if constraint.modifier_token:
+                required_for_modifier = token.tokensToCompleteModifier
+        return entity_pointer
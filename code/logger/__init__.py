@@ -8,12 +8,14 @@
 from __future__ import absolute_import
 from pathlib import Path
 import logging
+import psutil
 
 # ## Set Variables
 log_clf = None
 log_match = None
 log_ie = None
 log_main = None
+peak_rss = 0        # highest sampled resident set size (bytes) of the current step
 
 
 # ## Functions
@@ -62,7 +64,16 @@ def set_infos(spec_logger: logging.Logger, step: str, mode: str) -> None:
     mode: str
         String with the value 'start' or 'finish'"""
 
+    # Set global
+    global peak_rss
+
     try:
+        # reset the memory peak at the start of a step and report it at the end
+        if mode == 'start':
+            peak_rss = 0
+        track_memory()
+        if mode == 'finish':
+            log_main.info(f'{step} peak RSS: {peak_rss / 2 ** 20:.1f} MB.')
         log_main.info(f'{step} about to {mode}. Further information in {spec_logger}.')
         spec_logger.info(f'\n\n******************************** {step} {mode}ed. ********************************\n')
         print(f'{step} {mode}ed.')
@@ -70,5 +81,23 @@ def set_infos(spec_logger: logging.Logger, step: str, mode: str) -> None:
         log_main.warning(f'Error {e} is raised. Continue with program and ignore logging/printing error.')
 
 
+# Sample memory usage of the process
+def track_memory() -> float:
+    """ Samples the resident set size (RSS) of the process and updates the peak of the current step.
+    Called once per batch, so the peak is measured at batch granularity.
+
+    Returns
+    -------
+    rss: float
+        current RSS in MB """
+
+    # Set global
+    global peak_rss
+
+    rss = psutil.Process().memory_info().rss
+    peak_rss = max(peak_rss, rss)
+    return rss / 2 ** 20
+
+
 if '__main__' == __name__:
     main()
@@ -43,6 +43,7 @@
 
     usage: main.py [-h] [--classification] [--extraction] [--matching]
                [--input_path INPUT_PATH] [--db_mode {overwrite,append}]
+               [--resume] [--output_path OUTPUT_PATH] [--workers WORKERS]
 
     classify jobads and extract/match information
 
@@ -53,6 +54,13 @@
     --matching
     --input_path INPUT_PATH
     --db_mode {overwrite,append}
+    --resume              continue classification/extraction after the last checkpoint (table pipeline_progress)
+                          of an interrupted run, the output tables are not dropped
+    --output_path OUTPUT_PATH
+                          write the results (classify_units, extraction_units, extracted_entities) into a separate
+                          database, the input database is only read (opened read-only and immutable)
+    --workers WORKERS     number of worker processes for the classification and the information extraction
+                          (default 1, 0: all cores)
 
 CLI-example: python main.py --classification --input_path "C:\absolute_path\quenfo_py_data\sqlite\orm\input_database.db" --db_mode overwrite """
 
@@ -186,7 +194,10 @@ def get_application_parser() -> argparse.ArgumentParser:
         Parser contains:
             a. the three tool parts as options: classification, extraction, matching (if non is given, call all parts)
             b. input_path argument (use string format!)
-            c. db_mode (options: overwrite or append) """
+            c. db_mode (options: overwrite or append)
+            d. resume (continue after the last checkpoint of an interrupted run)
+            e. output_path (separate database for the results, created if it does not exist)
+            f. workers (number of processes for the classification and the information extraction) """
 
     # ## create parser
     application_parser = argparse.ArgumentParser(description='classify jobads and extract/match information')
@@ -197,6 +208,9 @@ def get_application_parser() -> argparse.ArgumentParser:
     application_parser.add_argument('--input_path', type=__file_path)
     application_parser.add_argument('--db_mode', choices=['overwrite', 'append'],
                                     default='overwrite')
+    application_parser.add_argument('--resume', action="store_true")
+    application_parser.add_argument('--output_path', type=__output_path)
+    application_parser.add_argument('--workers', type=int, default=1)
     # ## set default function
     application_parser.set_defaults(func=manage_app)
     return application_parser
@@ -209,6 +223,13 @@ def __file_path(path: str) -> str:
         raise argparse.ArgumentTypeError(f"Readable_file:{path} is not a valid file")
 
 
+def __output_path(path: str) -> str:
+    if os.path.isdir(Path(path).parent.absolute()) and not os.path.isdir(Path(path)):
+        return path
+    else:
+        raise argparse.ArgumentTypeError(f"Writable_file:{path} is not a valid file path")
+
+
 # ########## START & FINISH PROGRAM ##########
 
 if __name__ == '__main__':
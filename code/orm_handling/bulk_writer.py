@@ -0,0 +1,96 @@
+""" Script contains the BulkWriter. Instead of passing every processed object to the unit-of-work of the session
+    (session.add() + relationship cascades + flush), the BulkWriter collects the result rows of one batch and writes
+    them via executemany (bulk_insert_mappings). The written objects are never read back, therefore they are removed
+    from the identity map afterwards. """
+
+# ## Imports
+import itertools
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+
+# Class BulkWriter collects the result rows of a batch and writes them at once
+class BulkWriter:
+    # Set switch-variable for the relationship which contains the results of each table_type
+    switch_children = {
+        'cu': 'children',               # JobAds -> ClassifyUnits
+        'eu': 'children',               # ClassifyUnits -> ExtractionUnits
+        'e': 'children_extracted',      # ExtractionUnits -> ExtractedEntity
+    }
+
+    # init-function to set values, works as constructor
+    def __init__(self):
+        self.inserts = dict()   # mapped class -> list of rows (dicts) to insert
+
+    def collect(self, output: object, table_type: str) -> None:
+        """ Function collects the rows of all children of the passed parent object as insert-rows with the id of the
+        parent as foreign key. The parents of orm.load_batch() have no stored children (only unprocessed parents are
+        loaded), therefore all children are new.
+
+        Parameters
+        ----------
+        output: object
+            parent object (e.g. a jobad) with its generated children
+        table_type: str
+            Keyword of the database table the children are written to ('cu', 'eu' or 'e'). """
+
+        for child in getattr(output, self.switch_children.get(table_type)):
+            mapper = inspect(child).mapper
+            column_keys = [attr.key for attr in mapper.column_attrs]
+            # collect all set columns and connect the child to its parent
+            row = {key: getattr(child, key) for key in column_keys if key != 'id' and getattr(child, key) is not None}
+            row['parent_id'] = output.id
+            self.inserts.setdefault(mapper.class_, list()).append(row)
+
+    def flush(self, session: Session) -> int:
+        """ Function writes all collected rows via executemany and clears the identity map of the session.
+        The commit is still done by the caller (orm.pass_output).
+
+        Parameters
+        ----------
+        session: Session
+            Session object, generated in module database. Contains the database path.
+
+        Returns
+        -------
+        row_nrs: int
+            Number of written rows. """
+
+        row_nrs = 0
+        for mapped_class, rows in self.inserts.items():
+            session.bulk_insert_mappings(mapped_class, rows)
+            row_nrs += len(rows)
+        # rows are written, the orm-objects are not needed anymore --> skip flush of pending objects
+        session.expunge_all()
+        self.inserts = dict()
+        return row_nrs
+
+    def to_tuples(self) -> list:
+        """ Function returns the collected rows as plain tuples (compact transfer from worker processes to the writing
+        main process). Consecutive rows with the same columns are grouped (order of the rows is kept), so missing
+        columns keep their defaults.
+
+        Returns
+        -------
+        row_groups: list
+            list of tuples (mapped class, column keys, list of value tuples) """
+
+        row_groups = list()
+        for mapped_class, rows in self.inserts.items():
+            for keys, group in itertools.groupby(rows, key=tuple):
+                row_groups.append((mapped_class, keys, [tuple(row.values()) for row in group]))
+        return row_groups
+
+    def add_tuples(self, row_groups: list) -> None:
+        """ Function adds the rows of to_tuples() (e.g. returned by a worker process) to the collected rows.
+
+        Parameters
+        ----------
+        row_groups: list
+            list of tuples (mapped class, column keys, list of value tuples) """
+
+        for mapped_class, keys, values in row_groups:
+            self.inserts.setdefault(mapped_class, list()).extend(dict(zip(keys, row)) for row in values)
+
+    def is_empty(self) -> bool:
+        return not self.inserts
@@ -5,18 +5,23 @@
         c. TrainData            --> Traindata (already in paragraphs and classified)
         d. ClassifyUnits_Train  --> contains each Traindata paragraph (preprocessed and classified)
         e. ExtrationUnits       --> preprocessed and splitted sentences from paragraphs
-        f. InformationEntity    --> extracted entities"""
+        f. InformationEntity    --> extracted entities
+        g. PipelineProgress     --> checkpoints (last committed id) of each processing stage"""
 
 # ## Imports
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import String, Integer, Column, Sequence, PickleType, ForeignKey, Boolean
+from sqlalchemy import String, Integer, Column, Sequence, ForeignKey, Boolean
 from sqlalchemy.orm import relationship
 import itertools
-from sqlalchemy.ext.mutable import MutableList
+from .token_encoding import TokenArrayType, LemmaArrayType
 
 # get Base connection
 Base = declarative_base()
 
+# Schema of the input table (JobAds). Translated to the main database if input and output are the same file, else the
+# input database is attached read-only with this name (see database/connection.py)
+input_schema = 'input_db'
+
 
 # ## Define Classes
 
@@ -26,6 +31,7 @@ Base = declarative_base()
 class JobAds(Base):
     """ Checks and sets all JobAds values. Defines tablename, columnnames and makes values reachable. """
     __tablename__ = 'jobads'  # Tablename for matching with db table
+    __table_args__ = {'schema': input_schema}  # read-only input, output tables only reference the id
     id = Column(Integer, Sequence('id'), primary_key=True)  # Columns to query
     postingID = Column('postingID')
     jahrgang = Column('jahrgang')
@@ -56,7 +62,7 @@ class ClassifyUnits(Base):
     classID = Column('classID', Integer)
     paragraph = Column('paragraph', String(225))
     parent_id = Column(Integer, ForeignKey(
-        'jobads.id'))  # ClassifyUnits have a parent-child relationship as a child with JobAds.
+        input_schema + '.jobads.id'))  # ClassifyUnits have a parent-child relationship as a child with JobAds.
     parent = relationship("JobAds", back_populates="children")  # ForeignKey to connect both Classes
     children = relationship("ExtractionUnits", back_populates="parent")  # Each CU is parent of ExtractionUnits
     featureunits = list()  # Set featureunit
@@ -162,7 +168,7 @@ class ExtractionUnits(Base):
     paragraph = Column('paragraph', String(225))
     position_index = Column('position_index', Integer)
     sentence = Column('sentence', String(225))
-    token_array = Column("token_array", MutableList.as_mutable(PickleType), default=[])
+    token_array = Column("token_array", TokenArrayType, default=[])  # compact encoding, see token_encoding.py
 
     # Set lexical data
     token = list()
@@ -189,7 +195,7 @@ class InformationEntity:
     start_lemma = Column("start_lemma", String(225))  # start_lemma: first string
     is_single_word = Column("is_single_word", Boolean)  # single word entity?
     full_expression = Column("full_expression", String(225))  # multi word entity -> full expression as string
-    lemma_array = Column("lemma_array", MutableList.as_mutable(PickleType), default=[])
+    lemma_array = Column("lemma_array", LemmaArrayType, default=[])  # compact encoding, see token_encoding.py
     modifier = Column("modifier", String(225))  # used modifier
     first_index = int
 
@@ -214,3 +220,22 @@ class InformationEntity:
 
     def set_first_index(self, first_index: int):
         self.first_index = first_index
+
+
+# *** PROGRESS MODEL ***
+
+
+# class PipelineProgress
+class PipelineProgress(Base):
+    """ Checkpoint of a processing stage. Stores the last committed id of the stage together with the configuration
+    hash and the model fingerprint used while processing, so an interrupted run can be resumed (--resume). """
+    __tablename__ = 'pipeline_progress'  # Tablename for matching with db table
+    stage = Column('stage', String(10), primary_key=True)  # table_type of the written table: 'cu', 'eu' or 'e'
+    last_id = Column('last_id', Integer)  # id of the last processed parent (JobAd, ClassifyUnit or ExtractionUnit)
+    config_hash = Column('config_hash', String(32))
+    model_fingerprint = Column('model_fingerprint', String(32))
+    updated = Column('updated', String(26))  # timestamp of the last checkpoint
+
+    # Name the objects
+    def __repr__(self):
+        return "(%s, %s)" % (self.stage, self.last_id)
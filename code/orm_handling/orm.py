@@ -3,7 +3,9 @@
 
 # ## Imports
 from information_extraction.models import ExtractedEntity
-from .models import ClassifyUnits, ClassifyUnits_Train, TrainingData, JobAds, ExtractionUnits, InformationEntity
+from .models import ClassifyUnits, ClassifyUnits_Train, TrainingData, JobAds, ExtractionUnits, InformationEntity, \
+    PipelineProgress
+from .bulk_writer import BulkWriter
 from training.train_models import Model
 import sqlalchemy
 import database
@@ -12,78 +14,35 @@ import datetime
 import time
 import os
 import configuration
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, exists
 import logger
-from sqlalchemy import inspect
+from sqlalchemy import Index, MetaData, Table, BLANK_SCHEMA, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 # ## Set Variables
-is_created = None
 drop_once_c = None
 drop_once_eu = None
 drop_once_e = None
+bulk_writer = BulkWriter()
+
+# Set switch-variables for the output tables of each table_type and their indexes (created together with the tables)
+switch_table = {
+    'cu': ClassifyUnits,
+    'eu': ExtractionUnits,
+    'e': ExtractedEntity,
+}
+switch_indexes = {
+    'cu': [Index('ix_classify_units_classID_id', ClassifyUnits.classID, ClassifyUnits.id),  # cus of search_type
+           Index('ix_classify_units_parent_id', ClassifyUnits.parent_id)],  # children of jobads
+    'eu': [Index('ix_extraction_units_parent_id', ExtractionUnits.parent_id)],  # children of cus
+    'e': [Index('ix_extracted_entities_parent_id', ExtractedEntity.parent_id)],  # children of eus
+}
 
 
 # ## Functions
 
 # Function to query the data from the db table
-def get_jobads(current_pos: int) -> list:
-    """ Function manages the data query and instantiates the Schema for the class JobAds in models.py
-
-    Parameters
-    ----------
-    current_pos: int
-        The integer contains the current position in database (rownr)
-
-    Returns
-    -------
-    jobads: list
-        Data contains the orm-objects from class JobAds 
-    
-    Raises
-    ------
-    sqlalchemy.exc.OperationalError
-        If changes in db are not possible, OperationalError is raised to continue with creation of table """
-
-    # Set global
-    global drop_once_c
-
-    # Get Configuration Settings from config.yaml file 
-    fetch_size = configuration.config_obj.get_c_fetch_size()  # Number of JobAds to fetch in one query
-    db_mode = configuration.config_obj.get_mode()  # db_mode: append data or overwrite it
-
-    # load the jobads
-    # job_ads = database.session.query(JobAds).slice(current_pos, (current_pos+fetch_size)).all()            # 0:02:26.691769 bei 2500 JobAds and 0:16:07.362719 bei 9593
-    job_ads = database.session.query(JobAds).order_by('id').offset(current_pos).limit(fetch_size).all()      # 0:02:25.670638 bei 2500 JobAds and 0:14:19.315887 bei 9593
-    # job_ads = database.session.query(JobAds).where(current_pos<(current_pos+fetch_size)).all()             # 0:02:21.205672 bei 2500 JobAds and 0:13:37.800832 bei 9593
-
-    try:
-        # delete the handles from jobads to classifyunits or create new table
-        if db_mode == 'overwrite':
-            if drop_once_c is None:
-                try:
-                    ClassifyUnits.__table__.create(database.engine)
-                except sqlalchemy.exc.OperationalError as err:
-                    database.session.query(ClassifyUnits).delete()
-                drop_once_c = 'filled'
-            else:
-                pass
-        # load all related classify units for appending
-        else:
-            if inspect(database.engine).has_table(
-                    ClassifyUnits.__tablename__):  # if table does exist, get related units
-                database.session.query(ClassifyUnits).filter(ClassifyUnits.parent_id == JobAds.id).all()
-            else:  # else: create classifyunits table
-                ClassifyUnits.__table__.create(database.engine)  # for case that table does exist, but is empty
-    except sqlalchemy.exc.OperationalError:
-        logger.log_clf.info(f'Table classify_unit does not exist --> create new one')
-        ClassifyUnits.__table__.create(database.engine)
-
-    pass_output(database.session)
-
-    return job_ads
-
-
 def get_traindata() -> list:
     """ Function manages the data query and instantiates the Schema for the class TrainingData in models.py
 
@@ -112,111 +71,139 @@ def get_traindata() -> list:
     return traindata
 
 
-def get_classify_units(current_pos: int) -> list:
-    """ Function manages the data query and instantiates the Schema for the class ClassifyUnits in models.py
+def prepare_output(table_type: str) -> None:
+    """ Function prepares the output table of table_type before a batch is loaded:
+        a. overwrite mode: reset the table once per run (drop and create)
+        b. append mode: make sure table and indexes exist
 
     Parameters
     ----------
-    current_pos: int
-        The integer contains the current position in database (rownr)
-
-    Returns
-    -------
-    classify_units: list
-        Data contains the orm-objects from class ClassifyUnits
-
-    Raises
-    ------
-    sqlalchemy.exc.OperationalError
-        If changes in db are not possible, OperationalError is raised to continue with creation of table """
+    table_type: str
+        Keyword of the output table: 'cu', 'eu' or 'e'. """
 
-    # Set global
-    global drop_once_eu
+    # Set globals
+    global drop_once_c, drop_once_eu, drop_once_e
 
-    # Get Configuration Settings from config.yaml file
-    fetch_size = configuration.config_obj.get_ie_fetch_size()  # Number of ClassifyUnits to fetch in one query
     db_mode = configuration.config_obj.get_mode()  # db_mode: append data or overwrite it
-    search_type = configuration.config_obj.get_search_type()
+    if db_mode != 'overwrite':
+        prepare_table(table_type)
+    elif table_type == 'cu' and drop_once_c is None:
+        reset_table('cu')
+        drop_once_c = 'filled'
+    elif table_type == 'eu' and drop_once_eu is None:
+        reset_table('eu')
+        drop_once_eu = 'filled'
+    elif table_type == 'e' and drop_once_e is None:
+        reset_table('e')
+        drop_once_e = 'filled'
+
+
+def load_batch(table_type: str, session: Session, last_id: int, until_id: int = None) -> list:
+    """ Function loads the next batch of parents for the output table of table_type via keyset pagination (seek via
+    primary key instead of offset). The children are loaded with one additional query for the whole batch (selectin)
+    instead of one lazy load per parent. The session is passed, so the prefetch thread can load with its own session.
+        a. 'cu': JobAds, in append mode only JobAds without ClassifyUnits (anti-join via classify_units.parent_id)
+        b. 'eu': ClassifyUnits of search_type, in append mode only ClassifyUnits without ExtractionUnits
+        c. 'e': ExtractionUnits, in append mode only ExtractionUnits behind the last ExtractionUnit with extracted
+           entities (watermark). Most eus contain no entity, so an anti-join would load them again in every run.
 
-    # load the cus
-    classify_units = database.session.query(ClassifyUnits).order_by('id').filter(
-        ClassifyUnits.classID == search_type).offset(current_pos).limit(fetch_size).all()
-
-    try:
-        # delete the handles from classifyunits to extractionunits or create new table
-        if db_mode == 'overwrite':
-            if drop_once_eu is None:
-                try:
-                    ExtractionUnits.__table__.create(database.engine)
-                except sqlalchemy.exc.OperationalError as err:
-                    database.session.query(ExtractionUnits).delete()
-                drop_once_eu = 'filled'
-            else:
-                pass
-        # load all related extractionunits for appending
-        else:
-            if inspect(database.engine).has_table(
-                    ExtractionUnits.__tablename__):  # if table does exist, get related units
-                database.session.query(ExtractionUnits).filter(ExtractionUnits.parent_id == ClassifyUnits.id).all()
-            else:  # else: create extractionunit table
-                ExtractionUnits.__table__.create(database.engine)
-    except sqlalchemy.exc.OperationalError:
-        logger.log_ie.info(f'table extraction_units does not exist --> create new one')
-        ExtractionUnits.__table__.create(database.engine)
-
-    pass_output(database.session)
-
-    return classify_units
+    Parameters
+    ----------
+    table_type: str
+        Keyword of the output table: 'cu', 'eu' or 'e'.
+    session: Session
+        Session object used for the query.
+    last_id: int
+        The integer contains the id of the last processed parent (cursor). If None, the query starts at the beginning.
+    until_id: int
+        Id of the last parent of an id range (see get_id_ranges), None: no upper bound.
 
+    Returns
+    -------
+    parents: list
+        orm-objects (JobAds, ClassifyUnits or ExtractionUnits) with loaded children """
 
-def get_extraction_units() -> list:
-    """ Function manages the data query and instantiates the Schema for the class ExtractionUnits in models.py
+    query, parent, children, fetch_size = __get_parent_query(table_type, session)
+    if last_id is not None:
+        query = query.filter(parent.id > last_id)
+    query = query.options(selectinload(children)).order_by(parent.id)
+    # id range: all parents of the range (number of parents is given by get_id_ranges)
+    if until_id is not None:
+        return query.filter(parent.id <= until_id).all()
+    return query.limit(fetch_size).all()
 
-        Returns
-        -------
-        extraction_units: list
-            Data contains the orm-objects from class ExtractionUnits
 
-        Raises
-        ------
-        sqlalchemy.exc.OperationalError
-            If changes in db are not possible, OperationalError is raised to continue with creation of table """
+def get_id_ranges(table_type: str, last_id: int, query_limit: int) -> list:
+    """ Function splits the parents to process into id ranges of fetch_size parents (shards for the worker processes).
+    Only the ids are read (via the primary key index), the ranges are processed with load_batch(until_id).
+    ExtractionUnits ('e') of the same ClassifyUnit are never split into different ranges (a range can contain more
+    than fetch_size ExtractionUnits).
 
-    # Set global
-    global drop_once_e
+    Parameters
+    ----------
+    table_type: str
+        Keyword of the output table: 'cu', 'eu' or 'e'.
+    last_id: int
+        The integer contains the id of the last processed parent (cursor). If None, the ranges start at the beginning.
+    query_limit: int
+        Number of parents to process, the last range is completed (like the batches of the serial processing).
 
-    # Get Configuration Settings from config.yaml file
+    Returns
+    -------
+    id_ranges: list
+        list of tuples (last_id of the previous range, id of the last parent in the range, number of parents) """
+
+    query, parent, children, fetch_size = __get_parent_query(table_type, database.session)
+    # group: ranges end at the border of a group (ClassifyUnit of the ExtractionUnits), else every id is a group
+    group = ExtractionUnits.parent_id if table_type == 'e' else parent.id
+    query = query.with_entities(parent.id, group)
+    if last_id is not None:
+        query = query.filter(parent.id > last_id)
+
+    id_ranges = list()
+    range_start = last_id
+    nr_parents = 0
+    previous_id, previous_group = None, None
+    for current_id, current_group in query.order_by(parent.id).yield_per(10000):
+        # range is full and the group changes --> close the range with the previous id
+        if nr_parents >= fetch_size and current_group != previous_group:
+            id_ranges.append((range_start, previous_id, nr_parents))
+            range_start = previous_id
+            nr_parents = 0
+            if len(id_ranges) * fetch_size >= query_limit:
+                return id_ranges
+        nr_parents += 1
+        previous_id, previous_group = current_id, current_group
+    if nr_parents > 0:
+        id_ranges.append((range_start, previous_id, nr_parents))
+    return id_ranges
+
+
+# Private function to build the query for the parents of table_type (with the filters of the db_mode)
+def __get_parent_query(table_type: str, session: Session):
     db_mode = configuration.config_obj.get_mode()  # db_mode: append data or overwrite it
-
-    # load the eus
-    extraction_units = database.session.query(ExtractionUnits).order_by('id').all()
-
-    try:
-        # delete the handles from extractionunits to extractions or create new table
-        if db_mode == 'overwrite':
-            if drop_once_e is None:
-                try:
-                    ExtractedEntity.__table__.create(database.engine)
-                except sqlalchemy.exc.OperationalError as err:
-                    database.session.query(ExtractedEntity).delete()
-                drop_once_e = 'filled'
-            else:
-                pass
-        # load all related InformationEntity for appending
-        else:
-            if inspect(database.engine).has_table(
-                    ExtractedEntity.__tablename__):  # if table does exist, get related units
-                database.session.query(ExtractedEntity).filter(
-                    ExtractedEntity.parent_id == ExtractionUnits.id).all()
-            else:  # else: create extractionunit table
-                ExtractedEntity.__table__.create(database.engine)
-    except sqlalchemy.exc.OperationalError:
-        logger.log_ie.info(f'table extracted_entities does not exist --> create new one')
-        ExtractedEntity.__table__.create(database.engine)
-
-    pass_output(database.session)
-
-    return extraction_units
+    if table_type == 'cu':
+        fetch_size = configuration.config_obj.get_c_fetch_size()  # Number of JobAds to fetch in one query
+        parent, children = JobAds, JobAds.children
+        query = session.query(JobAds)
+        if db_mode != 'overwrite':
+            query = query.filter(~exists().where(ClassifyUnits.parent_id == JobAds.id))
+    elif table_type == 'eu':
+        fetch_size = configuration.config_obj.get_ie_fetch_size()  # Number of ClassifyUnits to fetch in one query
+        search_type = configuration.config_obj.get_search_type()
+        parent, children = ClassifyUnits, ClassifyUnits.children
+        query = session.query(ClassifyUnits).filter(ClassifyUnits.classID == search_type)
+        if db_mode != 'overwrite':
+            query = query.filter(~exists().where(ExtractionUnits.parent_id == ClassifyUnits.id))
+    else:
+        fetch_size = configuration.config_obj.get_ie_fetch_size()  # Number of ExtractionUnits to fetch in one query
+        parent, children = ExtractionUnits, ExtractionUnits.children_extracted
+        query = session.query(ExtractionUnits)
+        if db_mode != 'overwrite':
+            watermark = session.query(func.max(ExtractedEntity.parent_id)).scalar()
+            if watermark is not None:
+                query = query.filter(ExtractionUnits.id > watermark)
+    return query, parent, children, fetch_size
 
 
 def handle_td_changes(model: Model) -> None:
@@ -306,22 +293,172 @@ def get_length(table_type: str) -> int:
     Returns
     -------
     row_nrs: int
-        Integer with the count of all JobAds or ClassfiyUnits in table. """
+        Integer with the count of all JobAds, ClassfiyUnits or ExtractionUnits in table. """
     row_nrs = int()
     if table_type.__eq__('ad'):
         row_nrs = database.session.query(func.count(JobAds.id)).scalar()
     elif table_type.__eq__('cu'):
         row_nrs = database.session.query(func.count(ClassifyUnits.id)).scalar()
+    elif table_type.__eq__('eu'):
+        row_nrs = database.session.query(func.count(ExtractionUnits.id)).scalar()
     return row_nrs
 
 
-def pass_output(session: Session):
+def get_start_id(table_type: str, start_pos: int) -> int:
+    """ The function translates the start_pos (row number) from config.yaml into a cursor for keyset pagination.
+    The offset is only used once here, all following batches are loaded via the id of the last processed row.
+
+    Parameters
+    ----------
+    table_type: str
+        Keyword with selected database-table ('ad' or 'cu').
+    start_pos: int
+        Row number where to start the query.
+
+    Returns
+    -------
+    start_id: int
+        Id of the row before start_pos or None if the query starts at the beginning of the table. """
+    if start_pos <= 0:
+        return None
+    if table_type.__eq__('ad'):
+        query = database.session.query(JobAds.id)
+        max_query = database.session.query(func.max(JobAds.id))
+    else:
+        search_type = configuration.config_obj.get_search_type()
+        query = database.session.query(ClassifyUnits.id).filter(ClassifyUnits.classID == search_type)
+        max_query = database.session.query(func.max(ClassifyUnits.id))
+    start_id = query.order_by('id').offset(start_pos - 1).limit(1).scalar()
+    # start_pos is behind the last row --> set cursor to the last id, so nothing is loaded
+    if start_id is None:
+        start_id = max_query.scalar()
+    return start_id
+
+
+def get_checkpoint(table_type: str, config_hash: str, model_fingerprint: str) -> int:
+    """ The function loads the checkpoint of a stage from table pipeline_progress (used with --resume).
+    The checkpoint is only valid, if the stored config_hash and model_fingerprint match the current ones.
+
+    Parameters
+    ----------
+    table_type: str
+        Keyword of the stage (table the stage writes to): 'cu', 'eu' or 'e'.
+    config_hash: str
+        Hash of the configuration values of the stage.
+    model_fingerprint: str
+        Fingerprint of the used model (classification) or resources (information extraction).
+
+    Returns
+    -------
+    last_id: int
+        Id of the last committed parent or None if no valid checkpoint exists. """
+    PipelineProgress.__table__.create(database.engine, checkfirst=True)
+    progress = database.session.query(PipelineProgress).get(table_type)
+    if progress is None:
+        logger.log_main.info(f'No checkpoint for stage {table_type} found. Start at start_pos.')
+        return None
+    if progress.config_hash != config_hash or progress.model_fingerprint != model_fingerprint:
+        logger.log_main.warning(f'Checkpoint {progress} was created with other configurations or another model. '
+                                f'Start at start_pos.')
+        return None
+    logger.log_main.info(f'Resume stage {table_type} after id {progress.last_id} (checkpoint of {progress.updated}).')
+    return progress.last_id
+
+
+def set_checkpoint(table_type: str, last_id: int, config_hash: str, model_fingerprint: str,
+                   session: Session = None) -> None:
+    """ The function stores the checkpoint of a stage in table pipeline_progress. The statement is executed in the
+    current transaction, so the checkpoint is committed together with the batch in pass_output().
+
+    Parameters
+    ----------
+    table_type: str
+        Keyword of the stage (table the stage writes to): 'cu', 'eu' or 'e'.
+    last_id: int
+        Id of the last processed parent in the current batch.
+    config_hash: str
+        Hash of the configuration values of the stage.
+    model_fingerprint: str
+        Fingerprint of the used model (classification) or resources (information extraction).
+    session: Session
+        Session of the writing thread (BatchPipeline), default is database.session. """
+    if session is None:
+        session = database.session
+    values = {'stage': table_type, 'last_id': last_id, 'config_hash': config_hash,
+              'model_fingerprint': model_fingerprint, 'updated': str(datetime.datetime.now())}
+    statement = sqlite_insert(PipelineProgress.__table__).values(**values)
+    statement = statement.on_conflict_do_update(index_elements=['stage'], set_=values)
+    session.execute(statement)
+
+
+def resume_stage(table_type: str, config_hash: str, model_fingerprint: str, start_id: int) -> int:
+    """ The function decides where a stage starts.
+        a. --resume is set and a valid checkpoint exists: continue after the checkpoint, the output table is kept
+        b. else: start at start_id and delete the checkpoints of this stage and all following stages (their parents
+           are generated again)
+
+    Parameters
+    ----------
+    table_type: str
+        Keyword of the stage (table the stage writes to): 'cu', 'eu' or 'e'.
+    config_hash: str
+        Hash of the configuration values of the stage.
+    model_fingerprint: str
+        Fingerprint of the used model (classification) or resources (information extraction).
+    start_id: int
+        Cursor derived from start_pos in config.yaml.
+
+    Returns
+    -------
+    last_id: int
+        Cursor (id of the last processed parent) to start the stage with. """
+    if configuration.config_obj.get_resume():
+        checkpoint_id = get_checkpoint(table_type, config_hash, model_fingerprint)
+        if checkpoint_id is not None:
+            __set_resumed(table_type)
+            return checkpoint_id
+    __reset_checkpoints(table_type)
+    return start_id
+
+
+# Private function to delete the checkpoints of a stage and all following stages
+def __reset_checkpoints(table_type: str):
+    stages = ['cu', 'eu', 'e']
+    PipelineProgress.__table__.create(database.engine, checkfirst=True)
+    database.session.query(PipelineProgress).filter(
+        PipelineProgress.stage.in_(stages[stages.index(table_type):])).delete(synchronize_session=False)
+    database.session.commit()
+
+
+# Private function to mark the output table of a resumed stage as already prepared (no drop in overwrite mode)
+def __set_resumed(table_type: str):
+
+    # Set globals
+    global drop_once_c, drop_once_eu, drop_once_e
+
+    if table_type == 'cu':
+        drop_once_c = 'filled'
+    elif table_type == 'eu':
+        drop_once_eu = 'filled'
+    elif table_type == 'e':
+        drop_once_e = 'filled'
+    prepare_table(table_type)
+
+
+def pass_output(session: Session, writer: BulkWriter = None):
     """ The session.commit() statement commits all adds to the current session.
+    If rows were collected by the bulk_writer, they are written via executemany before the commit.
 
     Parameters
     ----------
     session: Session
-        Session object, generated in module database. Contains the database path. """
+        Session object, generated in module database. Contains the database path.
+    writer: BulkWriter
+        BulkWriter with the collected rows, default is the bulk_writer of this module. """
+    writer = writer or bulk_writer
+    if not writer.is_empty():
+        row_nrs = writer.flush(session)
+        logger.log_main.debug(f'{row_nrs} rows written via bulk_writer.')
     session.commit()
 
 
@@ -336,61 +473,104 @@ def close_session(session: Session):
 
 
 # Function to manage session adding
-def create_output(session: Session, output: object, table_type: str):
-    """ Function checks if table to store output in already exists. Else the table is dropped and created again.
-    The session.add(object) statement adds the passed object to the current session.
+def create_output(session: Session, output: object, table_type: str, writer: BulkWriter = None):
+    """ The output tables are prepared by prepare_output() (called by the loaders or the BatchPipeline).
+    The session.add(object) statement adds the passed object to the current session. If bulk_write is set in
+    config.yaml, the rows of the children are collected by the bulk_writer instead and written in pass_output().
 
     Parameters
     ----------
     table_type: str
-        Name of the database table to create.
+        Keyword of the database table the children are written to ('cu', 'eu' or 'e').
     session: Session
         Session object, generated in module database. Contains the database path. 
     output: object
-        output object --> contains the jobad """
+        output object --> contains the jobad
+    writer: BulkWriter
+        BulkWriter which collects the rows, default is the bulk_writer of this module (own writer per batch in the
+        BatchPipeline) """
 
-    # db_mode: append data or overwrite it
-    db_mode = configuration.config_obj.get_mode()
-    
-    if db_mode == "overwrite":
-        __check_once(table_type)
-        session.add(output)
+    # bulk_write: collect rows for executemany or use unit-of-work of the session
+    bulk_write = configuration.config_obj.get_database_config()['bulk_write']
+
+    if bulk_write:
+        (writer or bulk_writer).collect(output, table_type)
     else:
         session.add(output)
 
 
-# Private function to check if needed table already exists, else drop it and create a new empty table
-def __check_once(table_type: str):
-
-    # Set global
-    global is_created
-
-    # Set switch-variable for db-table and logger
-    switch_table = {
-        'cu': ClassifyUnits,
-        'eu': ExtractionUnits,
-        'e': InformationEntity,
-        # 'me': MatchedEntity
-    }
-    switch_logger = {
-        'cu': logger.log_clf,
-        'eu': logger.log_ie,
-        'e': logger.log_ie,
-        # 'me': logger.log_m,
-    }
-
-    # Set variable
-    table_name = switch_table.get(table_type)
-    log_name = switch_logger.get(table_type)
-
-    if is_created is None:
-        try:
-            table_name.__table__.create(database.engine)
-        except sqlalchemy.exc.OperationalError:
-            log_name.info(f'Table {table_name} does already exist. Will be dropped, because of overwrite mode.')
-            table_name.__table__.drop(database.engine)
-            table_name.__table__.create(database.engine)
-            pass
-        is_created = 'checked'
-    else:
-        pass
+# *** TABLE LIFECYCLE ***
+
+def __get_output_table(table_type: str) -> Table:
+    """ Function returns the table to be created for table_type. The foreign key of the ClassifyUnits references the
+    JobAds in input_schema, but sqlite omits foreign keys into another schema. If the JobAds are in the same database
+    (no --output_path), the table is copied with an unqualified foreign key (jobads.id). An attached input database can
+    not be referenced by a foreign key.
+
+    Parameters
+    ----------
+    table_type: str
+        Keyword of the output table: 'cu', 'eu' or 'e'.
+
+    Returns
+    -------
+    table: Table
+        Table object of the output table. """
+    table = switch_table.get(table_type).__table__
+    if table_type == 'cu' and not database.input_attached:
+        metadata = MetaData()
+        JobAds.__table__.to_metadata(metadata, schema=None)
+        table = table.to_metadata(metadata, referred_schema_fn=lambda *args: BLANK_SCHEMA)
+    return table
+
+
+def prepare_table(table_type: str) -> None:
+    """ Function makes sure the output table of table_type and its indexes exist (append mode or resumed stage).
+    Indexes are only created if missing, so older databases get them with the next run.
+
+    Parameters
+    ----------
+    table_type: str
+        Keyword of the output table: 'cu', 'eu' or 'e'. """
+    table = __get_output_table(table_type)
+    table.create(database.engine, checkfirst=True)
+    for index in switch_indexes.get(table_type):
+        index.create(database.engine, checkfirst=True)
+
+
+def reset_table(table_type: str) -> None:
+    """ Function resets the output table of table_type in overwrite mode. The table is dropped and created again
+    (with its indexes) instead of deleting all rows, so no free pages are left in the database file.
+
+    Parameters
+    ----------
+    table_type: str
+        Keyword of the output table: 'cu', 'eu' or 'e'. """
+    table = __get_output_table(table_type)
+    table.drop(database.engine, checkfirst=True)
+    table.create(database.engine)
+    logger.log_main.info(f'Table {table.name} is reset (drop and create), because of overwrite mode.')
+
+
+def finish_stage(table_types: list) -> None:
+    """ Function is called at the end of a stage. Depending on the database settings in config.yaml:
+        a. analyze: update the statistics of the written tables for the query planner (ANALYZE)
+        b. vacuum: rebuild the database file to free unused pages (VACUUM, needs time and disk space on big dbs)
+
+    Parameters
+    ----------
+    table_types: list
+        Keywords of the output tables written in the stage ('cu', 'eu' or 'e'). """
+    database_config = configuration.config_obj.get_database_config()
+    if not (database_config['analyze'] or database_config['vacuum']):
+        return
+    # commit the last batch, VACUUM can not run inside a transaction
+    database.session.commit()
+    with database.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        if database_config['analyze']:
+            for table_type in table_types:
+                conn.execute(text(f'ANALYZE {switch_table.get(table_type).__tablename__}'))
+            logger.log_main.info(f'ANALYZE done for tables {table_types}.')
+        if database_config['vacuum']:
+            conn.execute(text('VACUUM'))
+            logger.log_main.info(f'VACUUM done.')
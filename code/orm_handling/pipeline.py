@@ -0,0 +1,288 @@
+""" Script contains the BatchPipeline. It loads the parents of a stage batch by batch (keyset pagination) and writes
+    the generated children together with the checkpoint of the stage.
+        a. prefetch (database config in config.yaml): a reader thread loads batch N+1 and a writer thread commits batch
+           N-1 while batch N is processed in the main thread. Both threads use their own session, the loaded objects
+           are detached from the reader session before they are passed on. The bounded queues (queue_size) limit the
+           number of batches in memory.
+        b. no prefetch: load, process and commit are done one after another with database.session.
+    The counters (read/write time and the time the main thread waited for the threads) are logged by close().
+    For the worker processes (--workers) the script contains get_process_pool() and write_parallel(): the workers
+    process id ranges of parents and return the rows, the main process is the only writer. """
+
+# ## Imports
+import gc
+import multiprocessing.pool
+import threading
+import queue
+from timeit import default_timer as timer
+from sqlalchemy.orm import sessionmaker
+import configuration
+import database
+import logger
+from . import orm
+from .bulk_writer import BulkWriter
+
+
+# Class BatchPipeline streams the parents of a stage and writes the results
+class BatchPipeline:
+
+    # init-function to set values, works as constructor
+    def __init__(self, table_type: str, last_id: int, config_hash: str, model_fingerprint: str):
+        """ Prepares the output table of the stage and starts the reader and writer thread (if prefetch is set).
+
+        Parameters
+        ----------
+        table_type: str
+            Keyword of the output table of the stage: 'cu', 'eu' or 'e'.
+        last_id: int
+            Id of the last processed parent (cursor). If None, the stream starts at the beginning.
+        config_hash: str
+            Hash of the configuration values of the stage (stored with each checkpoint).
+        model_fingerprint: str
+            Fingerprint of the used model or resources (stored with each checkpoint). """
+
+        database_config = configuration.config_obj.get_database_config()
+        self.table_type = table_type
+        self.last_id = last_id
+        self.config_hash = config_hash
+        self.model_fingerprint = model_fingerprint
+        self.prefetch = database_config['prefetch']
+        self.bulk_write = database_config['bulk_write']
+        self.stats = {'batches': 0, 'parents': 0, 'read': 0.0, 'write': 0.0, 'wait_read': 0.0, 'wait_write': 0.0,
+                      'writer_idle': 0.0}
+        self.errors = list()    # exceptions of the threads, raised again in the main thread
+        self.start_time = timer()
+
+        # prepare the output table once (reset in overwrite mode) before any thread accesses it
+        orm.prepare_output(table_type)
+        orm.pass_output(database.session)
+
+        if self.prefetch:
+            self.stop = threading.Event()
+            self.read_queue = queue.Queue(maxsize=database_config['queue_size'])
+            self.write_queue = queue.Queue(maxsize=database_config['queue_size'])
+            self.reader = threading.Thread(target=self.__read, name=f'reader_{table_type}', daemon=True)
+            self.writer = threading.Thread(target=self.__write, name=f'writer_{table_type}', daemon=True)
+            self.reader.start()
+            self.writer.start()
+
+    def __iter__(self):
+        """ Yields the batches of parents (orm-objects with loaded children). """
+        last_id = self.last_id
+        while True:
+            start = timer()
+            if self.prefetch:
+                batch = self.read_queue.get()
+                self.stats['wait_read'] += timer() - start
+                if batch is None:
+                    self.__raise_errors()
+                    return
+            else:
+                batch = orm.load_batch(self.table_type, database.session, last_id)
+                self.stats['read'] += timer() - start
+                if len(batch) == 0:
+                    return
+                last_id = batch[-1].id
+            self.stats['batches'] += 1
+            self.stats['parents'] += len(batch)
+            yield batch
+
+    def submit(self, batch: list) -> int:
+        """ Function passes a processed batch to the output. The checkpoint of the stage is written in the same
+        transaction as the children.
+
+        Parameters
+        ----------
+        batch: list
+            processed parents of the batch (with generated children)
+
+        Returns
+        -------
+        last_id: int
+            Id of the last parent in the batch (cursor). """
+
+        last_id = batch[-1].id
+        start = timer()
+        if self.prefetch:
+            self.__raise_errors()
+            # collect the rows in the main thread, the writer thread only executes them
+            writer = BulkWriter()
+            if self.bulk_write:
+                for parent in batch:
+                    writer.collect(parent, self.table_type)
+                batch = None
+            self.write_queue.put((last_id, writer, batch))
+            self.stats['wait_write'] += timer() - start
+        else:
+            for parent in batch:
+                orm.create_output(database.session, parent, self.table_type)
+            orm.set_checkpoint(self.table_type, last_id, self.config_hash, self.model_fingerprint)
+            orm.pass_output(database.session)
+            # batch is committed --> drop the processed objects from the session
+            database.session.expunge_all()
+            self.stats['write'] += timer() - start
+        return last_id
+
+    def close(self) -> dict:
+        """ Function stops the reader, waits until all submitted batches are written and logs the counters.
+
+        Returns
+        -------
+        stats: dict
+            counters of the pipeline (times in seconds) """
+
+        if self.prefetch:
+            self.stop.set()
+            self.write_queue.put(None)
+            self.writer.join()
+            self.reader.join()
+            self.__raise_errors()
+
+        runtime = timer() - self.start_time
+        self.stats['runtime'] = runtime
+        logger.log_main.info(
+            f'BatchPipeline {self.table_type} (prefetch: {self.prefetch}): {self.stats["parents"]} parents in '
+            f'{self.stats["batches"]} batches, {self.stats["parents"] / max(runtime, 1e-9):.1f} parents/s. '
+            f'Read {self.stats["read"]:.2f}s (main thread waited {self.stats["wait_read"]:.2f}s), '
+            f'write {self.stats["write"]:.2f}s (main thread waited {self.stats["wait_write"]:.2f}s, '
+            f'writer idle {self.stats["writer_idle"]:.2f}s), runtime {runtime:.2f}s.')
+        return self.stats
+
+    # Private function of the reader thread: load the batches with an own session
+    def __read(self):
+        session = sessionmaker(bind=database.engine)()
+        last_id = self.last_id
+        try:
+            while not self.stop.is_set():
+                start = timer()
+                batch = orm.load_batch(self.table_type, session, last_id)
+                # detach the objects (processed in the main thread) and end the read transaction
+                session.expunge_all()
+                session.rollback()
+                self.stats['read'] += timer() - start
+                if len(batch) == 0:
+                    break
+                last_id = batch[-1].id
+                self.__put(batch)
+        except Exception as err:
+            self.errors.append(err)
+        finally:
+            session.close()
+            self.__put(None)  # end of stream
+
+    # Private function: put into the bounded read queue, give up if the pipeline is closed
+    def __put(self, batch):
+        while True:
+            try:
+                self.read_queue.put(batch, timeout=0.1)
+                return
+            except queue.Full:
+                if self.stop.is_set():
+                    return
+
+    # Private function of the writer thread: write the batches with an own session
+    def __write(self):
+        session = sessionmaker(bind=database.engine)()
+        while True:
+            start = timer()
+            item = self.write_queue.get()
+            self.stats['writer_idle'] += timer() - start
+            if item is None:
+                break
+            # after an error the remaining batches are not written (the checkpoint stays at the last written batch)
+            if self.errors:
+                continue
+            last_id, writer, parents = item
+            start = timer()
+            try:
+                if parents is not None:
+                    session.add_all(parents)
+                orm.set_checkpoint(self.table_type, last_id, self.config_hash, self.model_fingerprint, session)
+                orm.pass_output(session, writer)
+                session.expunge_all()
+            except Exception as err:
+                session.rollback()
+                self.errors.append(err)
+            self.stats['write'] += timer() - start
+        session.close()
+
+    # Private function: raise the first exception of the threads in the main thread
+    def __raise_errors(self):
+        if self.errors:
+            if self.prefetch:
+                self.stop.set()
+            raise self.errors[0]
+
+
+# ## Functions
+def get_process_pool(workers: int, initializer, initargs: tuple) -> multiprocessing.pool.Pool:
+    """ Function starts the worker processes. With the start method fork (Linux) the objects of the main process (e.g.
+    model, patterns and lexicons) are not copied, but shared copy-on-write. They are frozen before (gc.freeze), so the
+    garbage collector of the workers does not touch (and copy) their pages. Without fork (e.g. Windows) the initargs
+    are pickled to each worker. No transaction of database.session may be open while forking.
+
+    Parameters
+    ----------
+    workers: int
+        Number of worker processes
+    initializer: function
+        function called in each worker process with initargs (the last argument is True, if the workers do not share
+        the memory of the main process, e.g. to load the resources again)
+    initargs: tuple
+        arguments for initializer
+
+    Returns
+    -------
+    pool: Pool
+        process pool with initialized workers """
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    gc.freeze()
+    pool = context.Pool(workers, initializer=initializer,
+                        initargs=initargs + (context.get_start_method() != 'fork',))
+    gc.unfreeze()
+    return pool
+
+
+def write_parallel(table_type: str, pool: multiprocessing.pool.Pool, worker_function, id_ranges: list,
+                   config_hash: str, model_fingerprint: str):
+    """ Generator passes the id ranges to the worker processes and writes the returned rows. The results are returned in
+    the order of the id ranges (imap), so each commit contains the rows of one range together with the checkpoint and
+    --resume continues after the last written range.
+
+    Parameters
+    ----------
+    table_type: str
+        Keyword of the output table of the stage: 'cu', 'eu' or 'e'.
+    pool: Pool
+        process pool (get_process_pool)
+    worker_function: function
+        function of the workers: gets an id range and returns (id of the last parent, number of parents, rows of
+        BulkWriter.to_tuples())
+    id_ranges: list
+        id ranges of orm.get_id_ranges()
+    config_hash: str
+        Hash of the configuration values of the stage (stored with each checkpoint).
+    model_fingerprint: str
+        Fingerprint of the used model or resources (stored with each checkpoint).
+
+    Yields
+    ------
+    result: tuple
+        (id of the last parent in the range, number of parents, number of written rows) """
+
+    try:
+        for until_id, nr_parents, row_groups in pool.imap(worker_function, id_ranges):
+            writer = BulkWriter()
+            writer.add_tuples(row_groups)
+            orm.set_checkpoint(table_type, until_id, config_hash, model_fingerprint)
+            nr_rows = writer.flush(database.session)
+            database.session.commit()
+            yield until_id, nr_parents, nr_rows
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
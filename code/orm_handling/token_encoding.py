@@ -0,0 +1,188 @@
+""" Script contains the compact column types for the lexical data of ExtractionUnits and InformationEntities.
+    Instead of pickling whole TextToken objects, the values are stored as delimited strings:
+        a. token_array: one record per token with token, lemma, pos tag, a bitmask for the flags
+           (ie/no/modifier token) and the number of tokens to complete an entity/modifier
+        b. lemma_array: the lemmata of an entity
+    Old databases with pickled values can still be read (see additional_scripts/migrate_token_arrays.py). """
+
+# ## Imports
+import pickle
+from collections.abc import Sequence
+from sqlalchemy.types import TypeDecorator, Text
+
+# ## Set Variables
+TOKEN_SEP = '\x1e'      # separates the tokens (record separator)
+FIELD_SEP = '\x1f'      # separates the fields of a token (unit separator)
+
+# Bitmask for the flags of a TextToken
+IE_TOKEN = 1
+NO_TOKEN = 2
+MODIFIER_TOKEN = 4
+TOKEN_NONE = 8          # token string is None (e.g. end token)
+POS_NONE = 16           # pos tag is None
+LEMMA_NONE = 32         # lemma is None
+
+
+# ## Functions
+def __clean(value: str) -> str:
+    # separators must not appear inside a value
+    return value.replace(TOKEN_SEP, ' ').replace(FIELD_SEP, ' ')
+
+
+def encode_tokens(token_array: list) -> str:
+    """ Function encodes a list of TextToken objects as delimited string.
+
+    Parameters
+    ----------
+    token_array: list
+        list of TextToken objects
+
+    Returns
+    -------
+    encoded: str
+        one record per token: token, lemma, pos_tag, flags, tokensToCompleteInformationEntity, tokensToCompleteModifier """
+
+    records = list()
+    for t in token_array:
+        flags = (IE_TOKEN if t.ie_token else 0) | (NO_TOKEN if t.no_token else 0) | \
+                (MODIFIER_TOKEN if t.modifier_token else 0) | (TOKEN_NONE if t.token is None else 0) | \
+                (POS_NONE if t.pos_tag is None else 0) | (LEMMA_NONE if t.lemma is None else 0)
+        records.append(FIELD_SEP.join((__clean(t.token or ''), __clean(t.lemma or ''), __clean(t.pos_tag or ''),
+                                       str(flags), str(t.tokensToCompleteInformationEntity),
+                                       str(t.tokensToCompleteModifier))))
+    return TOKEN_SEP.join(records)
+
+
+def decode_tokens(encoded: str) -> list:
+    """ Function decodes the delimited string of encode_tokens() into TextToken objects.
+
+    Parameters
+    ----------
+    encoded: str
+        delimited string
+
+    Returns
+    -------
+    token_array: list
+        list of TextToken objects """
+
+    # import here: information_extraction.models depends on orm_handling.models
+    from information_extraction.models import TextToken
+
+    token_array = list()
+    if not encoded:
+        return token_array
+    for record in encoded.split(TOKEN_SEP):
+        token, lemma, pos_tag, flags, ie_rest, mod_rest = record.split(FIELD_SEP)
+        flags = int(flags)
+        t = TextToken(None if flags & TOKEN_NONE else token, None if flags & LEMMA_NONE else lemma,
+                      None if flags & POS_NONE else pos_tag)
+        # only set values differing from the class defaults
+        if flags & IE_TOKEN:
+            t.ie_token = True
+        if flags & NO_TOKEN:
+            t.no_token = True
+        if flags & MODIFIER_TOKEN:
+            t.modifier_token = True
+        if ie_rest != '0':
+            t.tokensToCompleteInformationEntity = int(ie_rest)
+        if mod_rest != '0':
+            t.tokensToCompleteModifier = int(mod_rest)
+        token_array.append(t)
+    return token_array
+
+
+def encode_lemmata(lemma_array: list) -> str:
+    """ Function encodes the lemmata of an entity as delimited string. lemma_array can contain TextToken objects,
+    then their lemma is stored.
+
+    Parameters
+    ----------
+    lemma_array: list
+        list of lemmata (str) or TextToken objects
+
+    Returns
+    -------
+    encoded: str
+        delimited string """
+    return FIELD_SEP.join(__clean(getattr(lemma, 'lemma', lemma) or '') for lemma in lemma_array)
+
+
+def decode_lemmata(encoded: str) -> list:
+    """ Function decodes the delimited string of encode_lemmata() into a list of lemmata.
+
+    Parameters
+    ----------
+    encoded: str
+        delimited string
+
+    Returns
+    -------
+    lemma_array: list
+        list of lemmata (str) """
+    return encoded.split(FIELD_SEP) if encoded else list()
+
+
+# ## Classes
+class LazyTokenArray(Sequence):
+    """ Read-only list of TextToken objects. The stored string is only decoded, when the tokens are accessed
+    (e.g. by the pattern matching), so loading ExtractionUnits stays cheap. """
+
+    def __init__(self, encoded: str):
+        self.encoded = encoded
+        self.tokens = None
+
+    def __decoded(self) -> list:
+        if self.tokens is None:
+            self.tokens = decode_tokens(self.encoded)
+            self.encoded = None
+        return self.tokens
+
+    def __getitem__(self, index):
+        return self.__decoded()[index]
+
+    def __len__(self):
+        return len(self.__decoded())
+
+    def __repr__(self):
+        return repr(self.__decoded())
+
+
+class TokenArrayType(TypeDecorator):
+    """ Column type for ExtractionUnits.token_array (list of TextToken objects). """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, LazyTokenArray) and value.encoded is not None:
+            return value.encoded
+        return encode_tokens(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # not migrated database: pickled list of TextToken objects
+        if isinstance(value, bytes):
+            return pickle.loads(value)
+        return LazyTokenArray(value)
+
+
+class LemmaArrayType(TypeDecorator):
+    """ Column type for InformationEntity.lemma_array (list of lemmata). """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode_lemmata(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # not migrated database: pickled list of lemmata
+        if isinstance(value, bytes):
+            return pickle.loads(value)
+        return decode_lemmata(value)
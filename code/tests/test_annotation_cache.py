@@ -0,0 +1,61 @@
+import unittest
+import os
+import tempfile
+from information_extraction.prepare_extractionunits.annotation_cache import AnnotationCache
+
+
+class TestAnnotationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'cache.db')
+        self.annotation = [['Kenntnisse', 'in', 'Java'], ['NOUN', 'ADP', 'PROPN'], ['Kenntnis', 'in', 'Java']]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_persistence(self):
+        cache = AnnotationCache(self.path, 10, 'lru', 'model-1')
+        self.assertIsNone(cache.get('sentence', 'Kenntnisse in Java'))
+        cache.put('sentence', 'Kenntnisse in Java', self.annotation)
+        cache.close()
+
+        cache = AnnotationCache(self.path, 10, 'lru', 'model-1')
+        self.assertEqual(cache.get('sentence', 'Kenntnisse in Java'), self.annotation)
+        self.assertIsNone(cache.get('paragraph', 'Kenntnisse in Java'))
+        stats = cache.close()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+        # entries of another model are not used
+        cache = AnnotationCache(self.path, 10, 'lru', 'model-2')
+        self.assertIsNone(cache.get('sentence', 'Kenntnisse in Java'))
+        cache.close()
+
+    def test_eviction(self):
+        # lru: a is used least recently, lfu: b is used least frequently (the new entry d is not evicted)
+        for eviction, kept in (('lru', ['b', 'c', 'd']), ('lfu', ['a', 'c', 'd'])):
+            path = os.path.join(self.tmp_dir.name, f'{eviction}.db')
+            cache = AnnotationCache(path, 3, eviction, 'model-1')
+            for text in ('a', 'b', 'c'):
+                cache.put('sentence', text, self.annotation)
+                cache.flush()
+            # a is used twice, b and c once (later)
+            cache.get('sentence', 'a')
+            cache.get('sentence', 'a')
+            cache.flush()
+            cache.get('sentence', 'b')
+            cache.flush()
+            cache.get('sentence', 'c')
+            cache.flush()
+            cache.put('sentence', 'd', self.annotation)
+            stats = cache.close()
+            self.assertEqual(stats['evictions'], 1, f'Wrong number of evictions with {eviction}.')
+
+            cache = AnnotationCache(path, 3, eviction, 'model-1')
+            self.assertEqual(sorted(cache.get_many('sentence', ['a', 'b', 'c', 'd'])), kept,
+                             f'Wrong entries evicted with {eviction}.')
+            cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import os
+import tempfile
+from sqlalchemy.exc import OperationalError
+import database
+from database import connection
+from configuration.config_model import Configurations
+import information_extraction.models  # registers all orm-models (needed for the relationships)
+from orm_handling.models import JobAds, ClassifyUnits
+from orm_handling import orm
+
+
+class TestConnectionProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'profile_test.db')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_pragmas_applied(self):
+        for profile, pragmas in connection.profiles.items():
+            session, engine = connection.create_connection(os.path.join(self.tmp_dir.name, f'{profile}.db'), profile)
+            active = connection.get_pragmas(engine)
+            # no journal_mode in the profile: sqlite default (rollback journal)
+            self.assertEqual(active['journal_mode'], pragmas.get('journal_mode', 'delete').lower(),
+                             f"Wrong journal_mode in {profile}.")
+            self.assertEqual(active['cache_size'], pragmas['cache_size'], f"Wrong cache_size in {profile}.")
+            session.close()
+            engine.dispose()
+
+    def test_safe_keeps_journal_mode(self):
+        # the default profile does not change the database file (WAL would persist and create -wal/-shm files)
+        session, engine = connection.create_connection(self.db_path, 'safe')
+        with engine.begin() as conn:
+            conn.exec_driver_sql('CREATE TABLE test (id INTEGER)')
+        self.assertEqual(connection.get_pragmas(engine)['journal_mode'], 'delete')
+        self.assertFalse(os.path.exists(self.db_path + '-wal'))
+        session.close()
+        engine.dispose()
+
+    def test_unknown_profile(self):
+        # only exact profile names are accepted (no substring match like bulk for bulk-load)
+        for profile, expected in (('bulk', 'safe'), ('load', 'safe'), (None, 'safe'), ('bulk-load', 'bulk-load')):
+            config = Configurations.__new__(Configurations)
+            config.database_config = {'profile': profile}
+            config.set_database_config()
+            self.assertEqual(config.get_database_config()['profile'], expected)
+
+    def test_page_size_only_for_new_db(self):
+        session, engine = connection.create_connection(self.db_path, 'bulk-load')
+        with engine.begin() as conn:
+            conn.exec_driver_sql('CREATE TABLE test_table (id INTEGER PRIMARY KEY)')
+        engine.dispose()
+        session, engine = connection.create_connection(self.db_path, 'safe')
+        self.assertEqual(connection.get_pragmas(engine)['page_size'], connection.profiles['bulk-load']['page_size'])
+        engine.dispose()
+
+    def test_attach_input_read_only(self):
+        input_path = os.path.join(self.tmp_dir.name, 'input.db')
+        session, engine = connection.create_connection(input_path)
+        with engine.begin() as conn:
+            conn.exec_driver_sql('CREATE TABLE jobads (id INTEGER PRIMARY KEY, postingID TEXT, jahrgang TEXT, '
+                                 'language TEXT, content TEXT)')
+            conn.exec_driver_sql("INSERT INTO jobads VALUES (1, 'p1', '2018', 'de', 'text')")
+        engine.dispose()
+        session, engine = connection.create_connection(self.db_path, 'safe', attach_path=input_path)
+        ClassifyUnits.__table__.create(engine)
+        jobad = session.query(JobAds).one()
+        self.assertEqual(jobad.content, 'text')
+        jobad.children.append(ClassifyUnits(classID=1, paragraph='text', featureunits=list(), featurevector=list()))
+        session.commit()
+        with engine.begin() as conn:
+            # results are in the output database, the input database is read-only
+            self.assertEqual(conn.exec_driver_sql('SELECT parent_id FROM main.classify_units').scalar(), 1)
+            with self.assertRaises(OperationalError):
+                conn.exec_driver_sql("INSERT INTO input_db.jobads VALUES (2, 'p2', '2018', 'de', 'text')")
+        session.close()
+        engine.dispose()
+
+    def test_foreign_key_without_output_path(self):
+        # input and output in the same database --> classify_units references jobads (sqlite omits cross-schema keys)
+        globals_before = (database.engine, database.input_attached)
+        session, engine = connection.create_connection(self.db_path)
+        with engine.begin() as conn:
+            conn.exec_driver_sql('CREATE TABLE jobads (id INTEGER PRIMARY KEY, postingID TEXT, jahrgang TEXT, '
+                                 'language TEXT, content TEXT)')
+            conn.exec_driver_sql("INSERT INTO jobads VALUES (1, 'p1', '2018', 'de', 'text')")
+        database.engine, database.input_attached = engine, False
+        try:
+            orm.prepare_table('cu')
+        finally:
+            database.engine, database.input_attached = globals_before
+        with engine.begin() as conn:
+            foreign_keys = conn.exec_driver_sql('PRAGMA foreign_key_list(classify_units)').fetchall()
+        self.assertEqual([(key[2], key[3], key[4]) for key in foreign_keys], [('jobads', 'parent_id', 'id')])
+        jobad = session.query(JobAds).one()
+        jobad.children.append(ClassifyUnits(classID=1, paragraph='text', featureunits=list(), featurevector=list()))
+        session.commit()
+        self.assertEqual(session.query(ClassifyUnits.parent_id).scalar(), 1)
+        session.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import random
+from information_extraction.models import MatchedEntity, TextToken
+from information_extraction.prepare_resources.entity_lexicon import EntityLexicon
+from information_extraction.prepare_extractionunits import convert_extractionunits
+
+
+class TestEntityLexicon(unittest.TestCase):
+
+    def setUp(self):
+        self.lexicon = EntityLexicon()
+        for line in ('software', 'software deployment', 'software entwicklung', 'software deployment', 'java'):
+            lemmata = line.split(' ')
+            entity = MatchedEntity(start_lemma=lemmata[0], is_single_word=len(lemmata) == 1, ie_type='TOOLS',
+                                   label=set())
+            if not entity.is_single_word:
+                entity.set_lemma_array(lemmata)
+            self.lexicon.add(lemmata, entity)
+
+    def test_lookup(self):
+        # entries with the same first lemma are all kept, duplicates are stored once
+        self.assertEqual(len(self.lexicon), 4)
+        self.assertEqual(len(self.lexicon.get('software')), 3)
+        self.assertEqual(len(self.lexicon.get('python')), 0)
+        self.assertIn('java', self.lexicon)
+        # entries in both lexicons are stored once
+        other = EntityLexicon()
+        other.add(['java'], 'java (other)')
+        other.add(['python'], 'python')
+        merged = EntityLexicon.merge(self.lexicon, other)
+        self.assertEqual(len(merged.get('java')), 1)
+        self.assertIs(merged.get('java')[0], self.lexicon.get('java')[0])
+        self.assertEqual(len(merged.get('software')), 3)
+        self.assertEqual(len(merged), 5)
+        self.assertEqual(len(list(merged)), 5)
+
+    def test_annotate_entities(self):
+        convert_extractionunits.known_entities = self.lexicon
+        tokens = [TextToken(lemma, lemma, 'NN') for lemma in ('software', 'entwicklung', 'und', 'java')]
+        tokens = convert_extractionunits.__dict__['__annotate_entities'](tokens, [t.lemma for t in tokens])
+        self.assertEqual([t.ie_token for t in tokens], [True, False, False, True])
+        self.assertEqual(tokens[0].tokensToCompleteInformationEntity, 1)
+
+    def test_automaton(self):
+        # overlapping entries: longest entry starting at each position
+        automaton = self.lexicon.get_automaton()
+        self.assertEqual(automaton.longest_matches(['software', 'deployment', 'software', 'java', 'python']),
+                         [2, 0, 1, 1, 0])
+
+        # compare with the lookup of all entries starting at each position
+        random.seed(1)
+        lexicon = EntityLexicon()
+        for _ in range(300):
+            lemmata = [random.choice('abcde') for _ in range(random.randint(1, 4))]
+            lexicon.add(lemmata, lemmata)
+        automaton = lexicon.get_automaton()
+        for _ in range(200):
+            lemmata = [random.choice('abcdef') for _ in range(random.randint(0, 12))]
+            expected = [max([len(entry) for entry in lexicon.get(lemmata[i]) if lemmata[i:i + len(entry)] == entry],
+                            default=0) for i in range(len(lemmata))]
+            self.assertEqual(automaton.longest_matches(lemmata), expected, f'Wrong matches for {lemmata}.')
+
+
+if __name__ == '__main__':
+    unittest.main()
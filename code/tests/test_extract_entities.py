@@ -0,0 +1,124 @@
+import unittest
+import os
+import tempfile
+import configuration
+import database
+import information_extraction
+import logger
+from configuration.config_model import Configurations
+from information_extraction import prepare_resources
+from information_extraction.extraction import extract_entities
+from information_extraction.models import ExtractedEntity, Modifier, Pattern, PatternToken, TextToken
+from information_extraction.prepare_resources.entity_lexicon import EntityLexicon
+from information_extraction.prepare_resources.pattern_matcher import PatternMatcher
+from orm_handling.bulk_writer import BulkWriter
+from orm_handling import orm
+from orm_handling.models import ExtractionUnits, PipelineProgress
+
+
+class TestExtractEntities(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        logger.main()
+        # configuration of an extraction in overwrite mode (only the used values)
+        self.globals = (configuration.config_obj, database.session, database.engine, orm.drop_once_e)
+        config = Configurations.__new__(Configurations)
+        config.input_path = os.path.join(self.tmp_dir.name, 'extract.db')
+        config.output_path = None
+        config.db_mode = 'overwrite'
+        config.ie_fetch_size = 2
+        config.expand_coordinates = True
+        config.database_config = None
+        config.set_database_config()
+        configuration.config_obj = config
+        database.set_input_conn()
+        self.session, self.engine = database.session, database.engine
+        for table in (ExtractionUnits.__table__, ExtractedEntity.__table__, PipelineProgress.__table__):
+            table.create(self.engine)
+        # resources: two pattern, a known competence and a modifier
+        self.resources = {key: getattr(prepare_resources, key) for key in
+                          ('comp_matcher', 'competences', 'no_competences', 'modifier')}
+        pattern = [Pattern([PatternToken(None, 'kenntnis', None, False), PatternToken(None, 'in', None, False),
+                            PatternToken(None, None, 'NE', False)], [2], 'kenntnisse in NE', 1),
+                   Pattern([PatternToken(None, 'erfahrung', None, False), PatternToken(None, 'mit', None, False),
+                            PatternToken(None, None, 'ADJA', False), PatternToken(None, None, 'NN', False)],
+                           [2, 3], 'erfahrung mit ADJA NN', 2)]
+        competences = EntityLexicon()
+        competences.add(['java'], 'java')
+        modifier = EntityLexicon()
+        modifier.add(['gut'], Modifier(start_lemma='gut', is_single_word=True))
+        prepare_resources.comp_matcher = PatternMatcher(pattern)
+        prepare_resources.competences = competences
+        prepare_resources.no_competences = EntityLexicon()
+        prepare_resources.modifier = modifier
+
+    def tearDown(self):
+        configuration.config_obj, database.session, database.engine, orm.drop_once_e = self.globals
+        for key, value in self.resources.items():
+            setattr(prepare_resources, key, value)
+        self.session.close()
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def add_eu(self, words: list, parent_id: int = None) -> ExtractionUnits:
+        tokens, lemmata, pos_tags = (list(values) for values in zip(*words))
+        sentence = ' '.join(tokens)
+        eu = ExtractionUnits(sentence, 0, sentence, [TextToken(*word) for word in words], tokens, lemmata, pos_tags)
+        eu.parent_id = parent_id
+        self.session.add(eu)
+        return eu
+
+    def test_extracted_entities_written(self):
+        self.add_eu([('Kenntnisse', 'kenntnis', 'NN'), ('in', 'in', 'APPR'), ('Java', 'java', 'NE'), ('.', '.', '$.')])
+        self.add_eu([('Erfahrung', 'erfahrung', 'NN'), ('mit', 'mit', 'APPR'), ('guter', 'gut', 'ADJA'),
+                     ('Softwareentwicklung', 'softwareentwicklung', 'NN'), ('.', '.', '$.')])
+        self.session.commit()
+
+        writer = BulkWriter()
+        found = list()
+        # as in information_extraction.extract: no autoflush, the rows are written by the BulkWriter
+        with self.session.no_autoflush:
+            for eu in self.session.query(ExtractionUnits).order_by(ExtractionUnits.id).all():
+                found.extend(extract_entities(eu, 'COMPETENCES'))
+                writer.collect(eu, 'e')
+        writer.flush(self.session)
+        self.session.commit()
+
+        # only the known competence reaches a conf of 0.5
+        self.assertEqual([e.start_lemma for e in found], ['java'])
+        rows = [(e.parent_id, e.start_lemma, e.is_single_word, e.pattern, e.lemma_array, e.conf)
+                for e in self.session.query(ExtractedEntity).order_by(ExtractedEntity.id).all()]
+        self.assertEqual(rows, [(1, 'java', True, 'kenntnisse in NE', [], 1.0),
+                                (2, 'gut', False, 'erfahrung mit ADJA NN', [], None),
+                                (2, 'gut', False, 'erfahrung mit ADJA NN', ['softwareentwicklung'], 0.0)])
+
+    def test_same_result_with_workers(self):
+        # eus of several cus (the id ranges of the workers end at the border of a cu)
+        for parent_id in range(1, 6):
+            self.add_eu([('Kenntnisse', 'kenntnis', 'NN'), ('in', 'in', 'APPR'), ('Java', 'java', 'NE'),
+                         ('.', '.', '$.')], parent_id)
+            self.add_eu([('Erfahrung', 'erfahrung', 'NN'), ('mit', 'mit', 'APPR'), ('guter', 'gut', 'ADJA'),
+                         ('Softwareentwicklung', 'softwareentwicklung', 'NN'), ('.', '.', '$.')], parent_id)
+            self.add_eu([('Kenntnisse', 'kenntnis', 'NN'), ('in', 'in', 'APPR'), ('SAP', 'sap', 'NE'),
+                         ('.', '.', '$.')], parent_id)
+        self.session.commit()
+
+        rows = dict()
+        for workers in (1, 2):
+            orm.drop_once_e = None  # overwrite mode: the table is reset by each run
+            if workers == 1:
+                information_extraction.__dict__['__extract_serial']('COMPETENCES', None, 15, 'hash', 'fingerprint')
+            else:
+                information_extraction.__dict__['__extract_parallel']('COMPETENCES', None, 15, 'hash', 'fingerprint',
+                                                                      workers)
+            rows[workers] = [(e.parent_id, e.start_lemma, e.is_single_word, e.pattern, e.lemma_array, e.conf,
+                              e.modifier, e.full_expression)
+                             for e in self.session.query(ExtractedEntity).order_by(ExtractedEntity.id).all()]
+            self.session.commit()
+        self.assertEqual(len(rows[1]), 20)
+        self.assertEqual(rows[2], rows[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
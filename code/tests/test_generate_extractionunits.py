@@ -1,5 +1,7 @@
 import unittest
 
+import spacy
+import configuration
 from information_extraction.prepare_resources import convert_entities
 from information_extraction.prepare_extractionunits import convert_extractionunits
 
@@ -37,6 +39,19 @@ class TestGenerateExtractionUnits(unittest.TestCase):
         self.assertEqual(convert_extractionunits.normalize_sentence(case7), output7)
         self.assertIsInstance(convert_extractionunits.normalize_sentence(case7), str)
 
+    def test_annotate_paragraphs_without_config(self):
+        # no configuration (e.g. tests): the default values of ie_config/spacy are used
+        config_obj, nlp = configuration.config_obj, convert_extractionunits.nlp
+        try:
+            configuration.config_obj = None
+            convert_extractionunits.nlp = spacy.blank('de')
+            convert_extractionunits.nlp.add_pipe('sentencizer')
+            annotations = convert_extractionunits.annotate_paragraphs(['Wir suchen einen Entwickler. Mit Erfahrung.'])
+        finally:
+            configuration.config_obj, convert_extractionunits.nlp = config_obj, nlp
+        self.assertEqual(len(annotations), 1)
+        self.assertEqual([sentence[0] for sentence in annotations[0]], ['Wir suchen einen Entwickler.', 'Mit Erfahrung.'])
+
     """def test_get_entities_list(self):
         self.assertIsInstance(connection_resources.get_entities_from_file("tools"), list)"""
 
@@ -81,6 +96,26 @@ class TestGenerateExtractionUnits(unittest.TestCase):
         self.assertEqual(convert_extractionunits.split_into_sentences(test_input), test_output)
         self.assertIsInstance(convert_extractionunits.split_into_sentences(test_input), list)
 
+    def test_annotate_sentence(self):
+        test_input = "Ihre Aufgaben:\n" \
+                     "  + Entwicklung von Software  in Java\n" \
+                     "1. Betreuung der Kunden UND Partner\n" \
+                     "- Kenntnisse in SQL ,Python"
+        doc = convert_extractionunits.get_nlp()(test_input)
+        sentence_spans = convert_extractionunits.get_sentence_spans(test_input, doc)
+
+        # sentence boundaries of the paragraph Doc are the same as from split_into_sentences
+        self.assertEqual([sentence for sentence, span in sentence_spans],
+                         convert_extractionunits.split_into_sentences(test_input))
+        for sentence, span in sentence_spans:
+            self.assertEqual(span.text, sentence)
+            # same token texts as parsing the (normalized) sentence on its own (POS-tags and lemmata of the tagger
+            # can differ with the context of the paragraph)
+            normalized, tokens, pos_tags, lemmata = convert_extractionunits.annotate_sentence(sentence, span)
+            self.assertEqual((normalized, tokens), convert_extractionunits.annotate_sentence(sentence)[:2])
+            self.assertEqual(len(pos_tags), len(tokens))
+            self.assertEqual(len(lemmata), len(tokens))
+
 
 if __name__ == '__main__':
     unittest.main()
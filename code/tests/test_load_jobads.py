@@ -11,7 +11,7 @@ database.set_input_conn()
 database.set_train_conn()
 start_pos = 0
  
-### TODO: Die Funktionen aus orm.py austesten. Die erste hier test_table_data kann für get_jobads genutzt wrden.
+### TODO: Die Funktionen aus orm.py austesten. Die erste hier test_table_data kann für load_batch genutzt wrden.
 class TestGetJobAds(unittest.TestCase):
     def test_table_data(self):
         job_ads = database.session.query(JobAds)
@@ -19,12 +19,13 @@ class TestGetJobAds(unittest.TestCase):
 
     def test_create_new_table(self):
         if database.session.query(ClassifyUnits) is None:
-            orm_handling.orm.get_jobads(start_pos)
+            orm_handling.orm.prepare_output('cu')
             self.assertIsNotNone(database.session.query(ClassifyUnits), "Table classify_units in database does not "
                                                                           "exist.")
 
     def test_type_of_jobads(self):
-        output = orm_handling.orm.get_jobads(start_pos)
+        orm_handling.orm.prepare_output('cu')
+        output = orm_handling.orm.load_batch('cu', database.session, start_pos)
         self.assertIsInstance(output, list)
         if not any(isinstance(item, JobAds) for item in output):
             print("List is not type JobAds.")
@@ -14,12 +14,12 @@ class TestLoadTablesFromDB(unittest.TestCase):
 
     def test_create_new_table(self):
         if database.session.query(ClassifyUnits) is None:
-            orm_handling.orm.get_jobads()
+            orm_handling.orm.prepare_output('cu')
             self.assertIsNotNone(database.session.query(ClassifyUnits), "Table classify_units in database does not "
                                                                         "exist.")
 
     def test_type_of_jobads(self):
-        output = orm_handling.orm.get_jobads()
+        output = orm_handling.orm.load_batch('cu', database.session, None)
         self.assertIsInstance(output, list)
         if not any(isinstance(item, JobAds) for item in output):
             print("List is not type JobAds.")
@@ -27,17 +27,17 @@ class TestLoadTablesFromDB(unittest.TestCase):
 
     def test_create_new_table(self):
         if database.session.query(ExtractionUnits) is None:
-            get_classify_units()
+            orm_handling.orm.prepare_output('eu')
             self.assertIsNotNone(database.session.query(ExtractionUnits), "Table extraction_units in database does "
                                                                             "not exist.")
 
         if database.session.query(InformationEntity) is None:
-            get_classify_units()
+            orm_handling.orm.prepare_output('e')
             self.assertIsNotNone(database.session.query(InformationEntity), "Table extractions in database does "
                                                                               "not exist.")
 
     def test_type_of_classify_units(self):
-        output = orm_handling.orm.get_classify_units()
+        output = orm_handling.orm.load_batch('eu', database.session, None)
         self.assertIsInstance(output, list)
         if not any(isinstance(item, ClassifyUnits) for item in output):
             print("List is not type ClassifyUnits.")"""
@@ -0,0 +1,59 @@
+import unittest
+import os
+import pickle
+import tempfile
+import numpy as np
+from scipy.sparse import random as sparse_random
+from sklearn.preprocessing import normalize
+from training.knnclassifier.sparse_knn import SparseKNN
+from training.knnclassifier.lsh_knn import LSHKNN
+
+
+class TestLSHKNN(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        self.train = normalize(sparse_random(300, 80, density=0.1, format='csr', random_state=rng))
+        self.classes = np.array([f'{c}\n' for c in rng.randint(1, 7, 300)])
+        self.queries = normalize(sparse_random(50, 80, density=0.1, format='csr', random_state=rng))
+
+    def test_one_bucket_is_exact(self):
+        # no hyperplanes: all traindata rows are candidates
+        sparse_knn = SparseKNN(n_neighbors=5, weights='distance').fit(self.train, self.classes)
+        lsh_knn = LSHKNN(n_neighbors=5, weights='distance', lsh_tables=1, lsh_bits=0).fit(self.train, self.classes)
+        distances, indices = lsh_knn.kneighbors(self.queries)
+        expected_distances, expected_indices = sparse_knn.kneighbors(self.queries)
+        np.testing.assert_array_equal(indices, expected_indices)
+        np.testing.assert_allclose(distances, expected_distances, atol=1e-12)
+        np.testing.assert_array_equal(lsh_knn.predict(self.queries), sparse_knn.predict(self.queries))
+
+    def test_same_vector_is_found(self):
+        # a traindata row is always in the bucket of the same vector
+        lsh_knn = LSHKNN(n_neighbors=3, lsh_tables=2, lsh_bits=12, lsh_probes=0).fit(self.train, self.classes)
+        indices = lsh_knn.kneighbors(self.train[:40], return_distance=False)
+        self.assertEqual(indices[:, 0].tolist(), list(range(40)))
+
+    def test_saved_index(self):
+        lsh_knn = LSHKNN(n_neighbors=3, lsh_tables=4, lsh_bits=6).fit(self.train, self.classes)
+        expected = lsh_knn.kneighbors(self.queries, return_distance=False)
+        with tempfile.TemporaryDirectory() as folder:
+            index_path = lsh_knn.save_index(os.path.join(folder, 'model_knn'))
+            self.assertTrue(os.path.exists(index_path))
+            # a new index of the same model path replaces the old index file
+            other_knn = LSHKNN(n_neighbors=3, lsh_tables=2, lsh_bits=6).fit(self.train, self.classes)
+            other_path = other_knn.save_index(os.path.join(folder, 'model_knn'))
+            self.assertEqual(os.listdir(folder), [os.path.basename(other_path)])
+            index_path = lsh_knn.save_index(os.path.join(folder, 'model_knn'))
+            self.assertEqual(os.listdir(folder), [os.path.basename(index_path)])
+            # the pickled model does not contain the index, it is loaded from the index file
+            loaded = pickle.loads(pickle.dumps(lsh_knn))
+            self.assertIsNone(loaded.index_)
+            np.testing.assert_array_equal(loaded.kneighbors(self.queries, return_distance=False), expected)
+            # missing index file: the index is rebuilt
+            loaded = pickle.loads(pickle.dumps(lsh_knn))
+            os.remove(index_path)
+            np.testing.assert_array_equal(loaded.kneighbors(self.queries, return_distance=False), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import random
+from information_extraction.models import Pattern, PatternToken, TextToken
+from information_extraction.prepare_resources.pattern_matcher import PatternMatcher
+
+
+# Former matching in ie_jobs.extract: each pattern at each position with TextToken.is_equals_pattern_token
+def match_pattern(pattern: list, eu_tokens: list) -> list:
+    found = list()
+    for p in pattern:
+        if p.conf == 0.0 or p.conf >= 0.5:
+            for i in range(0, len(eu_tokens) - p.get_size()):
+                match = False
+                entity_pointer = 0
+                required_for_entity = 0
+                required_for_modifier = 0
+                for c in range(p.get_size()):
+                    v = i + required_for_modifier + required_for_entity
+                    if (v + c) >= len(eu_tokens):
+                        continue
+                    token = eu_tokens[v + c]
+                    pattern_token = p.get_token_at_index(c)
+                    match = token.is_equals_pattern_token(pattern_token)
+                    if not match:
+                        break
+                    if p.extraction_pointer[0] == c:
+                        entity_pointer = v + c
+                    if pattern_token.ie_token:
+                        required_for_entity = token.tokensToCompleteInformationEntity
+                    if pattern_token.modifier_token:
+                        required_for_modifier = token.tokensToCompleteModifier
+                if match:
+                    found.append((p, entity_pointer))
+    return found
+
+
+class TestPatternMatcher(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(1)
+        self.words = ['kenntnisse', 'erfahrung', 'in', 'mit', 'java', 'sql', 'und', 'gut', 'sehr']
+        self.pos = ['NN', 'ADJA', 'APPR', 'KON', 'NE', 'ADV']
+
+    def alternatives(self, values: list, negation: bool) -> str:
+        chosen = random.sample(values, random.randint(1, 3))
+        if negation and random.random() < 0.4:
+            chosen = ['-' + value if random.random() < 0.7 else value for value in chosen]
+        return '|'.join(chosen)
+
+    def random_pattern(self, id: int) -> Pattern:
+        token_list = list()
+        for _ in range(random.randint(1, 4)):
+            kind = random.choice(['token', 'lemma', 'pos', 'ie', 'any', 'importance'])
+            token, lemma, pos_tag = None, None, None
+            if kind == 'token':
+                token = self.alternatives(self.words, False)
+            elif kind == 'lemma':
+                lemma = self.alternatives(self.words, True)
+            elif kind == 'pos':
+                pos_tag = self.alternatives(self.pos, True)
+            elif kind == 'importance':
+                lemma = 'IMPORTANCE'
+            pattern_token = PatternToken(token=token, lemma=lemma, pos_tag=pos_tag,
+                                         ie_token=kind == 'ie' or random.random() < 0.1)
+            if kind == 'importance':
+                pattern_token.modifier_token = True
+            token_list.append(pattern_token)
+        pointer = random.randrange(len(token_list))
+        pattern = Pattern(token_list, list(range(pointer, min(pointer + random.randint(1, 2), len(token_list)))),
+                          f'pattern {id}', id)
+        pattern.conf = random.choice([0.0, 0.0, 0.3, 0.8])
+        return pattern
+
+    def random_tokens(self) -> list:
+        tokens = list()
+        for _ in range(random.randint(0, 15)):
+            word = random.choice(self.words)
+            token = TextToken(word, word, random.choice(self.pos))
+            if random.random() < 0.3:
+                token.set_ie_token(True)
+                token.tokensToCompleteInformationEntity = random.randint(0, 2)
+            if random.random() < 0.2:
+                token.set_modifier_token(True)
+                token.tokensToCompleteModifier = random.randint(0, 2)
+            tokens.append(token)
+        return tokens
+
+    def test_equivalence(self):
+        pattern = [self.random_pattern(id) for id in range(200)]
+        matcher = PatternMatcher(pattern)
+        matches = 0
+        for _ in range(300):
+            tokens = self.random_tokens()
+            expected = match_pattern(pattern, tokens)
+            self.assertEqual(matcher.match(tokens), expected,
+                             f'Different matches for {[t.string_representation() for t in tokens]}.')
+            matches += len(expected)
+        self.assertGreater(matches, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import os
+import random
+import re
+import tempfile
+from training.regexclassifier import gen_regex
+from training.regexclassifier.regex_classifier import RegexClassifier
+
+
+# Former regex_predictor.gen_classes: each pattern with re.match on the lowercased and escaped paragraph
+def gen_classes(para: str, class_list: list, pattern_list: list) -> list:
+    predicted = [int(class_nr) if re.match(pattern, re.escape(para.lower())) else None
+                 for class_nr, pattern in zip(class_list, pattern_list)]
+    return list(dict.fromkeys(filter(None, predicted)))
+
+
+class TestRegexClassifier(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(1)
+        self.words = ['kenntnisse', 'erfahrung', 'bewerbung', 'unternehmen', 'team', 'java', 'gehalt', 'wir']
+
+    def random_pattern(self) -> str:
+        kind = random.choice(['contains', 'start', 'two', 'alternatives', 'group', 'space'])
+        first, second = random.sample(self.words, 2)
+        if kind == 'contains':
+            return f'.*{first}.*'
+        if kind == 'start':
+            return first
+        if kind == 'two':
+            return f'.*{first}.*{second}'
+        if kind == 'alternatives':
+            return f'.*({first}|{second})'
+        if kind == 'group':
+            # backreference: kept as a single pattern
+            return f'.*({first}).*\\1'
+        # spaces of the paragraph are escaped
+        return f'.*{first}\\\\ {second}'
+
+    def test_same_as_re(self):
+        class_list = [str(random.randint(0, 6)) for _ in range(40)]
+        pattern_list = [self.random_pattern() for _ in range(40)]
+        regex_clf = RegexClassifier(class_list, pattern_list)
+        paras = [' '.join(random.choice(self.words + ['und', 'Sie', '(m/w/d)', '+'])
+                          for _ in range(random.randint(0, 12))).capitalize() for _ in range(300)]
+        expected = [set(gen_classes(para, class_list, pattern_list)) for para in paras]
+        self.assertEqual(regex_clf.predict_batch(paras), expected)
+        self.assertEqual([regex_clf.predict(para) for para in paras], expected)
+        self.assertTrue(any(expected))
+
+    def test_read_file_twice(self):
+        # each call returns the patterns of the file only once
+        read_file = gen_regex.__dict__['__read_file']
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'regex.txt')
+            with open(path, 'wb') as f:
+                f.write(b'#class\tpattern\r\n3\t.*kenntnisse.*\r\n4\t.*bewerbung.*\r\n')
+            read_file(path)
+            self.assertEqual(read_file(path), (['3', '4'], ['.*kenntnisse.*', '.*bewerbung.*']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import itertools
+import numpy as np
+from scipy.sparse import random as sparse_random
+from sklearn.neighbors import KNeighborsClassifier
+from classification.predict_classes import knn_predictor, result_merger
+
+
+class TestBatchPrediction(unittest.TestCase):
+
+    def test_merge_batch(self):
+        # all combinations of up to three regex classes and a knn class
+        classes = range(1, 7)
+        reg = [list(r) for n in range(4) for r in itertools.permutations(classes, n)]
+        reg, knn = zip(*[(r, k) for r in reg for k in classes])
+        expected = [result_merger.merge(r, k) if r else k for r, k in zip(reg, knn)]
+        self.assertEqual(result_merger.merge_batch(list(reg), np.array(knn)).tolist(), expected)
+        # regex classes as sets (RegexClassifier)
+        self.assertEqual(result_merger.merge_batch([set(r) for r in reg], np.array(knn)).tolist(), expected)
+
+    def test_decide(self):
+        # decide returns a class only if merge returns this class for every knn class
+        for n in range(4):
+            for reg in itertools.permutations(range(1, 8), n):
+                outcomes = {result_merger.merge(list(reg), knn) if reg else knn for knn in range(9)}
+                predicted = result_merger.decide(set(reg))
+                if predicted is None:
+                    self.assertGreater(len(outcomes), 1, reg)
+                else:
+                    self.assertEqual(outcomes, {predicted}, reg)
+
+    def test_gen_classes_batch(self):
+        # labels of the traindata end with a newline
+        rng = np.random.RandomState(1)
+        train = sparse_random(60, 40, density=0.2, format='csr', random_state=rng)
+        labels = np.array([f'{c}\n' for c in rng.randint(1, 7, 60)])
+        clf = KNeighborsClassifier(n_neighbors=3).fit(train, labels)
+        cus = sparse_random(25, 40, density=0.2, format='csr', random_state=rng)
+        # one prediction per cu (former knn_predictor.gen_classes)
+        expected = [int(clf.predict(cus[i])[0].replace('\n', '')) for i in range(cus.shape[0])]
+        self.assertEqual(knn_predictor.gen_classes_batch(cus, clf).tolist(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from scipy.sparse import random as sparse_random, vstack
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import normalize
+from training.knnclassifier.sparse_knn import SparseKNN
+
+
+class TestSparseKNN(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        self.train = normalize(sparse_random(300, 80, density=0.1, format='csr', random_state=rng))
+        self.classes = np.array([f'{c}\n' for c in rng.randint(1, 7, 300)])
+        queries = normalize(sparse_random(120, 80, density=0.1, format='csr', random_state=rng))
+        # some queries are rows of the traindata (distance 0)
+        self.queries = vstack([queries, self.train[:20]]).tocsr()
+
+    def test_same_as_sklearn(self):
+        for weights in ('uniform', 'distance'):
+            for k in (1, 3, 7):
+                sklearn_knn = KNeighborsClassifier(n_neighbors=k, weights=weights).fit(self.train, self.classes)
+                # memory_mb 0: one query per chunk
+                for memory_mb in (0, 64):
+                    sparse_knn = SparseKNN(n_neighbors=k, weights=weights, memory_mb=memory_mb)
+                    sparse_knn.fit(self.train, self.classes)
+                    np.testing.assert_array_equal(sparse_knn.predict(self.queries),
+                                                  sklearn_knn.predict(self.queries))
+                    distances, indices = sparse_knn.kneighbors(self.queries)
+                    expected_distances, expected_indices = sklearn_knn.kneighbors(self.queries)
+                    np.testing.assert_array_equal(indices, expected_indices)
+                    np.testing.assert_array_equal(distances, expected_distances)
+
+    def test_ties(self):
+        # all traindata rows have the same distance: the first rows are the neighbors
+        sparse_knn = SparseKNN(n_neighbors=3).fit(vstack([self.train[0]] * 10).tocsr(), list('aabbbbbbbb'))
+        self.assertEqual(sparse_knn.kneighbors(self.train[1], return_distance=False).tolist(), [[0, 1, 2]])
+        self.assertEqual(sparse_knn.predict(self.train[1]).tolist(), ['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import pickle
+from information_extraction.models import TextToken
+from orm_handling.token_encoding import encode_tokens, LazyTokenArray, TokenArrayType, LemmaArrayType
+
+
+class TestTokenEncoding(unittest.TestCase):
+
+    def setUp(self):
+        ie = TextToken('Kenntnisse', 'Kenntnis', 'NN')
+        ie.ie_token = True
+        ie.tokensToCompleteInformationEntity = 2
+        mod = TextToken('gute', 'gut', 'ADJA')
+        mod.modifier_token = True
+        mod.tokensToCompleteModifier = 1
+        self.tokens = [TextToken(None, '<root-LEMMA>', '<root-POS>'), mod, ie, TextToken('x', None, None),
+                       TextToken(None, '<end-LEMMA>', '<end-POS>')]
+
+    def test_round_trip(self):
+        decoded = LazyTokenArray(encode_tokens(self.tokens))
+        self.assertEqual(len(decoded), len(self.tokens))
+        for old, new in zip(self.tokens, decoded):
+            for attr in ('token', 'lemma', 'pos_tag', 'ie_token', 'no_token', 'modifier_token',
+                         'tokensToCompleteInformationEntity', 'tokensToCompleteModifier'):
+                self.assertEqual(getattr(old, attr), getattr(new, attr), f"Wrong {attr} after decoding.")
+
+    def test_pickled_values(self):
+        # not migrated databases contain pickled lists
+        token_array = TokenArrayType().process_result_value(pickle.dumps(self.tokens), None)
+        self.assertEqual([t.lemma for t in token_array], [t.lemma for t in self.tokens])
+        self.assertEqual(LemmaArrayType().process_result_value(pickle.dumps(['gut', 'Kenntnis']), None),
+                         ['gut', 'Kenntnis'])
+
+
+if __name__ == '__main__':
+    unittest.main()
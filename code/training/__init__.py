@@ -3,7 +3,7 @@
 # ## Imports
 from training import regexclassifier
 from training.tfidfvectorizer import start_tfidf
-from training.knnclassifier import start_knn
+from training.knnclassifier import start_knn, check_knn_config
 from training.train_models import Model
 from training import helper
 import configuration
@@ -97,7 +97,7 @@ def __check_and_fill_model():
                 and model_tfidf_td_info.name == traindata_name  and model_knn_td_info.name == traindata_name \
                 and model_tfidf_td_info.date == traindata_date and model_knn_td_info.date == traindata_date\
                 and helper.check_configvalues(configuration.config_obj.get_tfidf_config(), model_tfidf) == True \
-                and helper.check_configvalues(configuration.config_obj.get_knn_config(), model_knn) == True \
+                and check_knn_config(model_knn) == True \
                 and helper.check_fitted(model_tfidf, 'model_tfidf') and helper.check_fitted(model_knn, 'model_knn'):
 
                 logger.log_clf.info(f'Matching Model was found. Configurations: TFIDF -> {configuration.config_obj.get_tfidf_config()} \
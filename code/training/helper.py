@@ -7,6 +7,8 @@ import sklearn
 import dill as pickle
 from pathlib import Path
 from training.train_models import SaveModel, TraindataInfo
+from training.knnclassifier.sparse_knn import SparseKNN
+from training.knnclassifier.lsh_knn import LSHKNN
 import inspect
 import os
 import datetime
@@ -142,7 +144,7 @@ def save_model(model: Union[
     # Set right path (from config.yaml) depending on type of model
     if type(model) == sklearn.feature_extraction.text.TfidfVectorizer:
         model_path = configuration.config_obj.get_tfidf_path()
-    elif type(model) == sklearn.neighbors.KNeighborsClassifier:
+    elif type(model) in (sklearn.neighbors.KNeighborsClassifier, SparseKNN, LSHKNN):
         model_path = configuration.config_obj.get_knn_path()
     else:
         print(f'Path for {model} could not be resolved. No model was saved. Check config for path adjustment.')
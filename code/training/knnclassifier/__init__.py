@@ -3,6 +3,7 @@
 # ## Imports
 from scipy.sparse.csr import csr_matrix
 from . import gen_knn
+from .gen_knn import check_knn_config
 from sklearn.neighbors import KNeighborsClassifier 
 import logger
 
@@ -2,11 +2,13 @@
 # ## Imports
 from scipy.sparse.csr import csr_matrix
 from sklearn.neighbors import KNeighborsClassifier 
+from .sparse_knn import SparseKNN
+from .lsh_knn import LSHKNN
 import training 
 import configuration
 
 # ## Function
-def initialize_knn(vectorized_train: csr_matrix, all_classes: list) -> KNeighborsClassifier:
+def initialize_knn(vectorized_train: csr_matrix, all_classes: list) -> 'KNeighborsClassifier, SparseKNN or LSHKNN':
      """ Method to train a knn-classifier with given traindata matrix and classes
 
      Parameters
@@ -19,21 +21,53 @@ def initialize_knn(vectorized_train: csr_matrix, all_classes: list) -> KNeighbor
      
      Returns
      -------
-     clf: sklearn.neighbors.KNeighborsClassifier
-        The saved model. Type: KNeighborsClassifier """
+     clf: sklearn.neighbors.KNeighborsClassifier, SparseKNN or LSHKNN
+        The saved model. Type: KNeighborsClassifier (engine: sklearn), SparseKNN (engine: sparse) or LSHKNN
+        (engine: lsh, the LSH index is saved next to the model) """
 
      # Get Configuration Settings for KNN-Classifier
      config = configuration.config_obj.get_knn_config()
 
      # Instantiate KNNClassifier obj with defined Configuration-Settings
-     knn = KNeighborsClassifier(n_neighbors=config['n_neighbors'], weights=config['weights'], \
-          algorithm=config['algorithm'], leaf_size=config['leaf_size'])
+     if config['engine'] == 'lsh':
+          knn = LSHKNN(n_neighbors=config['n_neighbors'], weights=config['weights'], \
+               algorithm=config['algorithm'], leaf_size=config['leaf_size'], memory_mb=config['memory_mb'], \
+               lsh_tables=config['lsh_tables'], lsh_bits=config['lsh_bits'], lsh_probes=config['lsh_probes'])
+     elif config['engine'] == 'sparse':
+          knn = SparseKNN(n_neighbors=config['n_neighbors'], weights=config['weights'], \
+               algorithm=config['algorithm'], leaf_size=config['leaf_size'], memory_mb=config['memory_mb'])
+     else:
+          knn = KNeighborsClassifier(n_neighbors=config['n_neighbors'], weights=config['weights'], \
+               algorithm=config['algorithm'], leaf_size=config['leaf_size'])
 
      # Fit the knn with the given traindata-matrix and related classes
      clf = knn.fit(vectorized_train, all_classes)
+     if type(clf) == LSHKNN:
+          clf.save_index(configuration.config_obj.get_knn_path())
 
      # save the model
      training.helper.save_model(clf)
 
      # return classifier
-     return clf
\ No newline at end of file
+     return clf
+
+
+def check_knn_config(model_knn: 'KNeighborsClassifier, SparseKNN or LSHKNN') -> bool:
+     """ Method checks if a stored knn-classifier was trained with the current knn_config (same engine and settings).
+
+     Parameters
+     ----------
+     model_knn: sklearn.neighbors.KNeighborsClassifier, SparseKNN or LSHKNN
+          The stored model.
+
+     Returns
+     -------
+     config_bool: bool
+          "True" if engine and settings are the same, "False" if they differentiate. """
+
+     config = configuration.config_obj.get_knn_config()
+     engine = {'sparse': SparseKNN, 'lsh': LSHKNN}.get(config['engine'], KNeighborsClassifier)
+     # only the settings which are parameters of the engine (memory_mb: SparseKNN and LSHKNN, lsh_*: LSHKNN)
+     parameters = engine().get_params()
+     config_values = {key: value for key, value in config.items() if key in parameters}
+     return type(model_knn) == engine and training.helper.check_configvalues(config_values, model_knn)
\ No newline at end of file
@@ -0,0 +1,237 @@
+""" Script contains the LSHKNN: an approximate knn-classifier for large traindata. The traindata is indexed with
+    random-projection LSH (locality sensitive hashing for the cosine similarity): each of the lsh_tables tables hashes
+    a vector to the signs of its projections on lsh_bits random hyperplanes. Only the traindata rows in the same
+    buckets as the query (and in the lsh_probes neighboring buckets with one flipped bit) are candidates, their exact
+    distances are computed (sparse product with the candidates of a chunk of queries) and the nearest candidates are
+    the neighbors. More tables and probes increase the recall,
+    more bits decrease the number of candidates (and the latency).
+    The index (bucket codes and rows of each table and the hyperplanes) is stored in an own .npz file next to the knn
+    model. """
+
+# ## Imports
+import hashlib
+from pathlib import Path
+import numpy as np
+from scipy.sparse import csr_matrix
+from .sparse_knn import SparseKNN, sparse_matmul_to_dense
+
+
+# Class LSHKNN can be used like SparseKNN (fit, kneighbors, predict), the neighbors are searched in the LSH index
+class LSHKNN(SparseKNN):
+
+    # init-function to set values, works as constructor
+    def __init__(self, n_neighbors: int = 5, weights: str = 'uniform', algorithm: str = 'auto', leaf_size: int = 30,
+                 memory_mb: int = 64, lsh_tables: int = 16, lsh_bits: int = 12, lsh_probes: int = 0, seed: int = 0):
+        """ Parameters
+        ----------
+        n_neighbors, weights, algorithm, leaf_size, memory_mb:
+            see SparseKNN (memory_mb also bounds the dense block of the distances to the candidates of a chunk)
+        lsh_tables: int
+            Number of hash tables.
+        lsh_bits: int
+            Number of hyperplanes (bits of the bucket code) per table (at most 62).
+        lsh_probes: int
+            Number of neighboring buckets (one flipped bit, the most uncertain bits first) searched per table.
+        seed: int
+            Seed of the random hyperplanes. """
+
+        super(LSHKNN, self).__init__(n_neighbors, weights, algorithm, leaf_size, memory_mb)
+        self.lsh_tables = lsh_tables
+        self.lsh_bits = lsh_bits
+        self.lsh_probes = lsh_probes
+        self.seed = seed
+        self.index_path = None
+        self.index_ = None
+
+    def get_params(self, deep: bool = True) -> dict:
+        params = super(LSHKNN, self).get_params(deep)
+        params.update({'lsh_tables': self.lsh_tables, 'lsh_bits': self.lsh_bits, 'lsh_probes': self.lsh_probes})
+        return params
+
+    def fit(self, X: csr_matrix, y: list) -> 'LSHKNN':
+        """ Function stores the traindata (see SparseKNN.fit) and builds the LSH index.
+
+        Parameters
+        ----------
+        X: csr_matrix
+            The transformed traindata.
+        y: list
+            The class of each row of X.
+
+        Returns
+        -------
+        self: LSHKNN
+            The fitted classifier. """
+
+        super(LSHKNN, self).fit(X, y)
+        # identifies traindata and settings of the index (stored with the index file)
+        fingerprint = f'{self.train_norms_.tobytes()}|{self.train_t_.shape}|{self.lsh_tables}|{self.lsh_bits}|' \
+                      f'{self.seed}'
+        self.fingerprint_ = hashlib.md5(fingerprint.encode()).hexdigest()
+        self.index_ = self.__build_index()
+        return self
+
+    def save_index(self, model_path: str) -> str:
+        """ Function stores the index next to the knn model (the pickled model does not contain the index). Index
+        files of older models with the same model path are removed.
+
+        Parameters
+        ----------
+        model_path: str
+            Path of the knn model (pickle file).
+
+        Returns
+        -------
+        index_path: str
+            Path of the index file. """
+
+        path = Path(model_path)
+        self.index_path = str(path.with_name(f'{path.name}_lsh_{self.fingerprint_}.npz'))
+        np.savez(self.index_path, fingerprint=self.fingerprint_, codes=self.index_['codes'], order=self.index_['order'],
+                 planes=self.index_['planes'])
+        for stale_path in path.parent.glob(f'{path.name}_lsh_*.npz'):
+            if stale_path.name != Path(self.index_path).name:
+                stale_path.unlink()
+        return self.index_path
+
+    def load_index(self) -> None:
+        """ Function loads the index from the index file (it is rebuilt, if the file is missing, was written by an
+        older version without hyperplanes or does not belong to the traindata and settings of this model). """
+
+        index = self.index_
+        if index is None and self.index_path is not None and Path(self.index_path).exists():
+            with np.load(self.index_path) as stored:
+                if 'planes' in stored.files and str(stored['fingerprint']) == self.fingerprint_:
+                    index = {key: stored[key] for key in ('codes', 'order', 'planes')}
+        if index is None:
+            index = self.__build_index()
+        index['train'] = self.train_t_.T.tocsr()
+        self.index_ = index
+
+    def kneighbors(self, X: csr_matrix, n_neighbors: int = None, return_distance: bool = True):
+        """ Function finds the (approximate) nearest neighbors of each row of X among the candidates of the index.
+        Queries with less than n_neighbors candidates are searched exactly (see SparseKNN.kneighbors).
+
+        Parameters
+        ----------
+        X: csr_matrix
+            The transformed queries.
+        n_neighbors: int
+            Number of neighbors (default: n_neighbors of the classifier).
+        return_distance: bool
+            If True, the distances are returned too.
+
+        Returns
+        -------
+        distances: np.ndarray
+            Euclidean distances of the neighbors (n_queries x n_neighbors, ascending), only if return_distance.
+        indices: np.ndarray
+            Rows of the traindata of the neighbors (n_queries x n_neighbors). """
+
+        if n_neighbors is None:
+            n_neighbors = self.n_neighbors
+        if n_neighbors > self.n_samples_fit_:
+            raise ValueError(f'Expected n_neighbors <= n_samples_fit, but n_neighbors = {n_neighbors}, '
+                             f'n_samples_fit = {self.n_samples_fit_}')
+        if self.index_ is None or 'train' not in self.index_:
+            self.load_index()
+
+        X = csr_matrix(X, dtype=np.float64)
+        distances = np.empty((X.shape[0], n_neighbors), dtype=np.float64)
+        indices = np.empty((X.shape[0], n_neighbors), dtype=np.intp)
+        missing = list()
+        self.candidates_ = 0    # number of candidates (distances computed) of all queries
+        # the dense block of the products (candidates x queries) of a chunk fits into the memory budget
+        chunk_size = max(1, int(self.memory_mb * 1024 * 1024 // (8 * max(self.n_samples_fit_, 1))))
+        for start in range(0, X.shape[0], chunk_size):
+            end = min(start + chunk_size, X.shape[0])
+            found = self.__kneighbors_chunk(X[start:end], n_neighbors, distances[start:end], indices[start:end])
+            missing.extend(start + np.flatnonzero(~found))
+        if missing:
+            # not enough candidates: exact search
+            distances[missing], indices[missing] = super(LSHKNN, self).kneighbors(X[missing], n_neighbors)
+
+        if return_distance:
+            return distances, indices
+        return indices
+
+    # Private function: hyperplanes of all tables (features x (lsh_tables * lsh_bits)), generated from the seed once
+    # per index (float32: only the signs of the projections are used)
+    def __planes(self) -> np.ndarray:
+        random_state = np.random.default_rng(self.seed)
+        return random_state.standard_normal((self.train_t_.shape[0], self.lsh_tables * self.lsh_bits), dtype=np.float32)
+
+    # Private function: projections of the rows of X on the hyperplanes and bucket codes (rows x tables)
+    def __hash(self, X: csr_matrix, planes: np.ndarray):
+        projections = np.asarray(X @ planes).reshape(X.shape[0], self.lsh_tables, self.lsh_bits)
+        powers = np.left_shift(np.int64(1), np.arange(self.lsh_bits, dtype=np.int64))
+        codes = (projections > 0).astype(np.int64) @ powers
+        return projections, codes
+
+    # Private function: sorted bucket codes and the related traindata rows of each table (and the hyperplanes)
+    def __build_index(self) -> dict:
+        planes = self.__planes()
+        _, codes = self.__hash(self.train_t_.T.tocsr(), planes)
+        order = np.argsort(codes, axis=0, kind='stable').T.astype(np.int64)    # tables x traindata
+        return {'codes': np.take_along_axis(codes.T, order, axis=1), 'order': order, 'planes': planes}
+
+    # Private function: sorted values without duplicates (np.unique without its overhead)
+    @staticmethod
+    def __sorted_unique(values: np.ndarray) -> np.ndarray:
+        values = np.sort(values)
+        return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+
+    # Private function: neighbors of a chunk of queries among their candidates (returns False for queries with
+    # less than n_neighbors candidates)
+    def __kneighbors_chunk(self, X: csr_matrix, n_neighbors: int, distances: np.ndarray, indices: np.ndarray):
+        n_queries = X.shape[0]
+        projections, codes = self.__hash(X, self.index_['planes'])
+        # probed codes per table: own bucket and the buckets with one flipped (most uncertain) bit
+        probes = [codes]
+        if self.lsh_probes > 0:
+            uncertain = np.argsort(np.abs(projections), axis=2)[:, :, :self.lsh_probes]
+            for p in range(uncertain.shape[2]):
+                probes.append(np.bitwise_xor(codes, np.left_shift(np.int64(1), uncertain[:, :, p])))
+
+        # candidates: (query, traindata row) of all probed buckets, coded as query * n_samples_fit_ + row
+        pairs = list()
+        for table in range(self.lsh_tables):
+            table_codes = self.index_['codes'][table]
+            for probe in probes:
+                left = np.searchsorted(table_codes, probe[:, table], side='left')
+                right = np.searchsorted(table_codes, probe[:, table], side='right')
+                sizes = right - left
+                queries = np.repeat(np.arange(n_queries), sizes)
+                positions = np.repeat(left - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+                pairs.append(queries * self.n_samples_fit_ + self.index_['order'][table][positions])
+        queries, rows = np.divmod(self.__sorted_unique(np.concatenate(pairs)), self.n_samples_fit_)
+        self.candidates_ += len(rows)
+
+        # exact squared distances of the candidates (products with all candidates of the chunk at once)
+        candidates = self.__sorted_unique(rows)
+        if sparse_matmul_to_dense is not None:
+            products = sparse_matmul_to_dense(self.index_['train'][candidates], X.T.tocsr())
+        else:
+            products = (self.index_['train'][candidates] @ X.T.tocsr()).toarray()
+        products = products[np.searchsorted(candidates, rows), queries]
+        query_norms = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+        squared = np.maximum(query_norms[queries] - 2 * products + self.train_norms_[rows], 0)
+
+        # nearest n_neighbors candidates of each query (the pairs are sorted by query and row, lexsort is stable:
+        # equal distances --> first rows)
+        order = np.lexsort((squared, queries))
+        counts = np.bincount(queries, minlength=n_queries)
+        starts = np.cumsum(counts) - counts
+        rank = np.arange(len(order)) - starts[queries[order]]
+        keep = order[rank < n_neighbors]
+        found = counts >= n_neighbors
+        selected = found[queries[keep]]
+        indices[found] = rows[keep][selected].reshape(-1, n_neighbors)
+        distances[found] = np.sqrt(squared[keep][selected]).reshape(-1, n_neighbors)
+        return found
+
+    # the index is stored in its own file (see save_index), not in the pickled model
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['index_'] = None
+        return state
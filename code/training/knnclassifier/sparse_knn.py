@@ -0,0 +1,181 @@
+""" Script contains the SparseKNN: a knn-classifier for sparse (L2-normalized) tfidf vectors. The distances to the
+    traindata are computed with sparse matrix products (chunk by chunk, bounded by a memory budget), the nearest
+    neighbors are selected with argpartition and the classes are voted with bincount. For L2-normalized vectors the
+    euclidean distance is sqrt(2 - 2 * cosine similarity), so the neighbors are the ones with the highest cosine
+    similarity. The distances are computed in the same order of operations as in sklearn's KNeighborsClassifier
+    (metric minkowski, p=2), so the predictions are the same. Only if several traindata rows have exactly the same
+    distance at the k-th place, the first rows are used (sklearn: depends on the order of its heap). """
+
+# ## Imports
+import numpy as np
+from scipy.sparse import csr_matrix
+try:
+    # newer sklearn versions compute the product of two sparse matrices directly into a dense array
+    # (the same sums in the same order as scipy, but without the sparse result)
+    from sklearn.utils.sparsefuncs import sparse_matmul_to_dense
+except ImportError:
+    sparse_matmul_to_dense = None
+
+
+# Class SparseKNN can be used like a fitted sklearn.neighbors.KNeighborsClassifier (fit, kneighbors, predict)
+class SparseKNN:
+
+    # init-function to set values, works as constructor
+    def __init__(self, n_neighbors: int = 5, weights: str = 'uniform', algorithm: str = 'auto', leaf_size: int = 30,
+                 memory_mb: int = 64):
+        """ Parameters
+        ----------
+        n_neighbors: int
+            Number of neighbors used for the prediction.
+        weights: str
+            'uniform' (each neighbor has the same weight) or 'distance' (weighted by the inverse distance).
+        algorithm: str
+            Not used (same parameters as KNeighborsClassifier, so the knn_config can be compared).
+        leaf_size: int
+            Not used (see algorithm).
+        memory_mb: int
+            Memory budget in MB for the dense distance block of one chunk of queries. """
+
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.memory_mb = memory_mb
+
+    def get_params(self, deep: bool = True) -> dict:
+        # parameters of the classifier (compared with the knn_config, see helper.check_configvalues)
+        return {'n_neighbors': self.n_neighbors, 'weights': self.weights, 'algorithm': self.algorithm,
+                'leaf_size': self.leaf_size, 'memory_mb': self.memory_mb}
+
+    def fit(self, X: csr_matrix, y: list) -> 'SparseKNN':
+        """ Function stores the traindata (transposed, for the products with the queries) and the integer-coded classes.
+
+        Parameters
+        ----------
+        X: csr_matrix
+            The transformed traindata.
+        y: list
+            The class of each row of X.
+
+        Returns
+        -------
+        self: SparseKNN
+            The fitted classifier. """
+
+        X = csr_matrix(X, dtype=np.float64)
+        self.classes_, self.y_codes_ = np.unique(np.asarray(y), return_inverse=True)
+        self.train_t_ = X.T.tocsr()                                 # features x traindata
+        self.train_norms_ = self.__squared_norms(X)                 # squared norms of the traindata
+        self.n_samples_fit_ = X.shape[0]
+        return self
+
+    def kneighbors(self, X: csr_matrix, n_neighbors: int = None, return_distance: bool = True):
+        """ Function finds the nearest neighbors of each row of X.
+
+        Parameters
+        ----------
+        X: csr_matrix
+            The transformed queries.
+        n_neighbors: int
+            Number of neighbors (default: n_neighbors of the classifier).
+        return_distance: bool
+            If True, the distances are returned too.
+
+        Returns
+        -------
+        distances: np.ndarray
+            Euclidean distances of the neighbors (n_queries x n_neighbors, ascending), only if return_distance.
+        indices: np.ndarray
+            Rows of the traindata of the neighbors (n_queries x n_neighbors). """
+
+        if n_neighbors is None:
+            n_neighbors = self.n_neighbors
+        if n_neighbors > self.n_samples_fit_:
+            raise ValueError(f'Expected n_neighbors <= n_samples_fit, but n_neighbors = {n_neighbors}, '
+                             f'n_samples_fit = {self.n_samples_fit_}')
+
+        X = csr_matrix(X, dtype=np.float64)
+        distances = np.empty((X.shape[0], n_neighbors), dtype=np.float64)
+        indices = np.empty((X.shape[0], n_neighbors), dtype=np.intp)
+        for start, end in self.__chunks(X.shape[0]):
+            distances[start:end], indices[start:end] = self.__kneighbors_chunk(X[start:end], n_neighbors)
+
+        if return_distance:
+            return distances, indices
+        return indices
+
+    def predict(self, X: csr_matrix) -> np.ndarray:
+        """ Function predicts the class of each row of X (majority of the neighbors, ties: first class in
+        classes_).
+
+        Parameters
+        ----------
+        X: csr_matrix
+            The transformed queries.
+
+        Returns
+        -------
+        predicted: np.ndarray
+            The predicted class of each row. """
+
+        distances, indices = self.kneighbors(X)
+        n_classes = len(self.classes_)
+        # class of each neighbor, shifted per row to count all rows with one bincount
+        codes = self.y_codes_[indices]
+        if self.weights == 'distance':
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / distances
+            # neighbors with distance 0 (same vector): only they are used
+            inf_mask = np.isinf(weights)
+            inf_row = np.any(inf_mask, axis=1)
+            weights[inf_row] = inf_mask[inf_row]
+            # sum of the weights of each class (summed over the neighbors as in sklearn's weighted_mode)
+            votes = np.stack([np.sum(np.where(codes == c, weights, 0.0), axis=1) for c in range(n_classes)], axis=1)
+        else:
+            # one bincount for all rows (the classes of each row are shifted by row * n_classes)
+            codes = codes + np.arange(indices.shape[0])[:, None] * n_classes
+            votes = np.bincount(codes.ravel(), minlength=indices.shape[0] * n_classes)
+            votes = votes.reshape(indices.shape[0], n_classes)
+
+        return self.classes_[np.argmax(votes, axis=1)]
+
+    # Private function: squared norm of each row, summed in the stored order of the row (as the products)
+    @staticmethod
+    def __squared_norms(X: csr_matrix) -> np.ndarray:
+        squares = csr_matrix((X.data * X.data, X.indices, X.indptr), shape=X.shape)
+        return (squares @ csr_matrix(np.ones((X.shape[1], 1)))).toarray().ravel()
+
+    # Private function: ranges of query rows whose dense distance block fits into the memory budget
+    def __chunks(self, n_queries: int):
+        chunk_size = max(1, int(self.memory_mb * 1024 * 1024 // (2 * 8 * max(self.n_samples_fit_, 1))))
+        for start in range(0, n_queries, chunk_size):
+            yield start, min(start + chunk_size, n_queries)
+
+    # Private function: nearest neighbors of a chunk of queries
+    def __kneighbors_chunk(self, X: csr_matrix, n_neighbors: int):
+        # squared euclidean distances: |x|^2 - 2 x*y + |y|^2
+        if sparse_matmul_to_dense is not None:
+            distances = sparse_matmul_to_dense(X, self.train_t_)
+        else:
+            distances = (X @ self.train_t_).toarray()
+        distances *= -2
+        distances += self.__squared_norms(X)[:, None]
+        distances += self.train_norms_
+        np.maximum(distances, 0, out=distances)
+
+        rows = np.arange(X.shape[0])[:, None]
+        if n_neighbors < self.n_samples_fit_:
+            indices = np.argpartition(distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+            # rows with more than one traindata row at the distance of the k-th neighbor: use the first ones
+            kth = distances[rows[:, 0], indices[:, -1]]
+            for i in np.flatnonzero(np.count_nonzero(distances <= kth[:, None], axis=1) > n_neighbors):
+                closer = np.flatnonzero(distances[i] < kth[i])
+                tied = np.flatnonzero(distances[i] == kth[i])[:n_neighbors - len(closer)]
+                indices[i] = np.concatenate((closer, tied))
+        else:
+            indices = np.tile(np.arange(self.n_samples_fit_), (X.shape[0], 1))
+        # ascending distances, equal distances by row of the traindata
+        order = np.lexsort((indices, distances[rows, indices]), axis=1)
+        indices = indices[rows, order]
+
+        return np.sqrt(distances[rows, indices]), indices
@@ -1,10 +1,10 @@
 # ## Imports
 from . import gen_regex
-import pandas as pd
+from .regex_classifier import RegexClassifier
 import logger
 
 # ## Function
-def call_regex_clf() -> pd.DataFrame():
+def call_regex_clf() -> RegexClassifier:
     # Start extraction of regex pattern and classes from given regex file
     regex_clf = gen_regex.start()
     # Print/Log status
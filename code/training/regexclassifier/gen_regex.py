@@ -1,38 +1,35 @@
-""" Script uses the regex_path to open the regex.txt file and extract pattern/classes. Both are appended to lists and stored in DataFrame. """
+""" Script uses the regex_path to open the regex.txt file and extract pattern/classes. Both are appended to lists and compiled in a RegexClassifier. """
 
 # ## Imports
-import pandas as pd
 from pathlib import Path
 from typing import Union
+from .regex_classifier import RegexClassifier
 import configuration
 import logger
 
-# Set Variables
-regex_clf = pd.DataFrame()
-class_list = list()
-pattern_list = list()
-    
 # ## Functions
-def start() -> pd.DataFrame():
+def start() -> RegexClassifier:
     """ Function to extract regex pattern and classes to fill the regex classifier.
     
     Returns
     -------
-    regex_clf: pd.DataFrame
-        Dataframe with the columns class_nr and pattern. Contains the values for regex_classifier. """
+    regex_clf: RegexClassifier
+        Contains the compiled patterns of each class. """
 
     # Get regex.txt file from config
     regex_path = configuration.config_obj.get_regex_path()
     # Open and read regex-file. Returns the regex_classifier classes and pattern. 
     class_list, pattern_list = __read_file(regex_path)
-    # Store both lists in DataFrame regex_clf
-    regex_clf['class_nr'] = class_list
-    regex_clf['pattern'] = pattern_list
+    # Compile the patterns (grouped by class) in the RegexClassifier
+    regex_clf = RegexClassifier(class_list, pattern_list)
     # Return regex_classifier
     return regex_clf
 
 
 def __read_file(regex_path: str) -> Union[list, list]:
+    # new lists for each call (module-level lists were extended again by each call)
+    class_list = list()
+    pattern_list = list()
     try:
         with open(Path(regex_path), 'rb') as f:
             for line in f.readlines():
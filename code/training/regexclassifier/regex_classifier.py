@@ -0,0 +1,110 @@
+""" Script contains the RegexClassifier: all patterns of the regex.txt file are compiled once (regex module). The
+    patterns of a class are combined to one alternation, so each paragraph is matched once per class. As before, a
+    pattern has to match at the beginning of the lowercased and escaped paragraph (re.match with re.escape). """
+
+# ## Imports
+import re
+import regex
+import logger
+
+
+# Class RegexClassifier contains the compiled patterns of each class and predicts the class(es) of paragraphs
+class RegexClassifier:
+
+    # init-function to set values, works as constructor
+    def __init__(self, class_list: list, pattern_list: list):
+        """ Parameters
+        ----------
+        class_list: list
+            The class of each pattern (as read from regex.txt).
+        pattern_list: list
+            The patterns. """
+
+        self.class_list = list(class_list)
+        self.pattern_list = list(pattern_list)
+        # patterns grouped by class (classes in the order of their first pattern)
+        grouped = dict()
+        for class_nr, pattern in zip(self.class_list, self.pattern_list):
+            try:
+                compiled = regex.compile(pattern)
+                class_nr = int(class_nr)
+            except (regex.error, ValueError) as e:
+                print(f'Regex pattern {pattern} (class {class_nr}) is skipped: {e}')
+                logger.log_clf.warning(f'Regex pattern {pattern} (class {class_nr}) is skipped: {e}')
+                continue
+            # class 0 is never predicted (was filtered like None)
+            if class_nr:
+                grouped.setdefault(class_nr, list()).append((pattern, compiled))
+
+        # compiled: list of (class_nr, [compiled alternation or single patterns])
+        self.compiled = list()
+        default_flags = regex.compile('').flags
+        for class_nr, patterns in grouped.items():
+            # patterns with groups (group numbers, backreferences) or global inline flags are kept on their own,
+            # the others are combined to one alternation
+            combinable = [p for p, c in patterns if c.groups == 0 and c.flags == default_flags]
+            single = [c for p, c in patterns if not (c.groups == 0 and c.flags == default_flags)]
+            if combinable:
+                single.insert(0, regex.compile('|'.join(f'(?:{p})' for p in combinable)))
+            self.compiled.append((class_nr, single))
+
+    @property
+    def empty(self) -> bool:
+        # True if there is no usable pattern
+        return not self.compiled
+
+    def to_string(self) -> str:
+        # patterns and their classes (as in regex.txt), used for the fingerprint of the model
+        return '\n'.join(f'{class_nr}\t{pattern}' for class_nr, pattern in zip(self.class_list, self.pattern_list))
+
+    @staticmethod
+    def prepare(para: str) -> str:
+        """ Function prepares a paragraph once for all patterns: lowercased and escaped (re.escape as before, so the
+        patterns match the same text).
+
+        Parameters
+        ----------
+        para: str
+            The content of a ClassifyUnit.
+
+        Returns
+        -------
+        prepared: str
+            The lowercased and escaped paragraph. """
+
+        return re.escape(para.lower())
+
+    def predict(self, para: str) -> set:
+        """ Function predicts the class(es) of a paragraph.
+
+        Parameters
+        ----------
+        para: str
+            The content of a ClassifyUnit only slightly preprocessed.
+
+        Returns
+        -------
+        predicted: set
+            The classes with at least one matching pattern (empty set: no pattern matches). """
+
+        return self.__predict_prepared(self.prepare(para))
+
+    def predict_batch(self, paras: list) -> list:
+        """ Function predicts the class(es) of several paragraphs.
+
+        Parameters
+        ----------
+        paras: list
+            The contents of the ClassifyUnits.
+
+        Returns
+        -------
+        predicted: list
+            A set of classes for each paragraph. """
+
+        return [self.__predict_prepared(self.prepare(para)) for para in paras]
+
+    # Private function: classes with a match at the beginning of the prepared paragraph
+    def __predict_prepared(self, prepared: str) -> set:
+        return {class_nr for class_nr, patterns in self.compiled
+                if any(pattern.match(prepared) is not None for pattern in patterns)}
@@ -2,14 +2,15 @@
 
 # ## Imports
 import sklearn
-import pandas as pd
+import hashlib
+from training.regexclassifier.regex_classifier import RegexClassifier
 
 # Class Model contains the knnclassifier, tfidfvectorizer and regexclassifier
 class Model():
     # Set Variables
     model_knn = sklearn.neighbors.KNeighborsClassifier()            # Set knn
     vectorizer = sklearn.feature_extraction.text.TfidfVectorizer()  # Set vectorizer
-    regex_clf = pd.DataFrame()                                      # Set regex_clf
+    regex_clf = RegexClassifier([], [])                             # Set regex_clf
     # Set traindata information
     traindata_name = str()
     traindata_date = str()
@@ -28,6 +29,12 @@ class Model():
     def get_regex_clf(self):
         return self.regex_clf
 
+    def get_fingerprint(self) -> str:
+        # identifies the model via used traindata (name + modification date) and the regex patterns
+        # (tfidf and knn parameters are part of the config hash)
+        fingerprint = f'{self.traindata_name}|{self.traindata_date}|{self.regex_clf.to_string()}'
+        return hashlib.md5(fingerprint.encode()).hexdigest()
+
 # DUMPING-Classes (only purpose)
 
 # Class SaveModel to tump the Model